@@ -1,3 +1,11 @@
-__all__ = ("YandexDiskClient",)
+__all__ = (
+    "YandexDiskClient",
+    "LocalDirectoryBackend",
+    "StorageBackend",
+)
 
+# AsyncYandexDiskClient импортируется из cloud_storage.async_yandex:
+# он требует aiohttp, нужный только для SYNCH_ENGINE=asyncio.
 from .yandex import YandexDiskClient
+from .backend import StorageBackend
+from .local import LocalDirectoryBackend
@@ -0,0 +1,240 @@
+import asyncio
+import os
+from typing import AsyncIterator
+
+import aiohttp
+
+from core.log_config import logger
+from core.models import FileEntry
+from cloud_storage.handle_errors import async_handle_errors
+from cloud_storage.retry import NETWORK, RetryPolicy, parse_retry_after
+from cloud_storage.yandex import YandexApiUrl, YandexDiskClient
+
+
+class AsyncYandexDiskClient:
+    """
+    Класс AsyncYandexDiskClient представляет собой асинхронный клиент
+        для работы с Yandex.Disk API на основе aiohttp.
+    В методе __init__ инициализируются те же параметры, что и
+        у YandexDiskClient. Сессия aiohttp с пулом из pool_size соединений
+        создается при первом запросе внутри работающего цикла событий.
+        Ответы 429, 5xx, сетевые ошибки и таймауты повторяются по политике
+        retry_policy, как в RetrySession (см. cloud_storage.retry);
+        все запросы клиента идемпотентны. Счетчик retries содержит число
+        выполненных повторов.
+    Метод close закрывает сессию.
+    Метод request_upload_url возвращает URL для загрузки файла в облако.
+    Метод upload загружает файл в облако.
+    Метод reload заменяет файл в облаке.
+    Метод delete удаляет файл из облака.
+    Метод iter_info постранично получает список файлов в облаке
+        и отдает их асинхронным генератором.
+    Метод get_info возвращает информацию о файлах в облаке.
+    """
+
+    api: YandexApiUrl = YandexApiUrl()
+
+    def __init__(
+        self,
+        local_folder: str,
+        remote_folder: str,
+        token: str,
+        pool_size: int = 10,
+        timeout: float = YandexApiUrl.timeout,
+        upload_timeout: float = 60,
+        page_size: int = 1000,
+        api_host: str | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ):
+        if api_host:
+            self.api = YandexApiUrl(api_host)
+        self.oauth_token: str = token
+        self.remote_path: str = remote_folder
+        self.local_path: str = local_folder
+        self.pool_size: int = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.upload_timeout = aiohttp.ClientTimeout(
+            sock_connect=timeout,
+            sock_read=upload_timeout,
+        )
+        self.page_size: int = page_size
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.retries: int = 0
+        self.headers: dict[str, str] = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"OAuth {token}",
+        }
+        self.__session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self.__session is None or self.__session.closed:
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+            )
+        return self.__session
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def __request(
+        self, method: str, url: str, **kwargs
+    ) -> aiohttp.ClientResponse:
+        attempts: dict[str, int] = {}
+        body = kwargs.get("data")
+        position = body.tell() if hasattr(body, "seek") else None
+
+        while True:
+            error: Exception | None = None
+            retry_after: float | None = None
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+                error_class, error = NETWORK, err
+            else:
+                error_class = self.retry_policy.classify(response.status)
+                if error_class is None:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            attempt = attempts.get(error_class, 0)
+            if attempt >= self.retry_policy.budgets.get(error_class, 0):
+                if error is not None:
+                    raise error
+                return response
+
+            attempts[error_class] = attempt + 1
+            delay = (
+                min(retry_after, self.retry_policy.max_delay)
+                if retry_after is not None
+                else self.retry_policy.backoff(attempt)
+            )
+            if error is None:
+                response.release()
+            if position is not None:
+                body.seek(position)
+            self.retries += 1
+
+            logger.warning(
+                f"Повтор запроса {method} через {delay:.2f} сек. "
+                f"({error_class}, попытка {attempt + 1})"
+            )
+            await asyncio.sleep(delay)
+
+    @async_handle_errors
+    async def request_upload_url(
+        self,
+        file_name: str,
+        upload: bool = False,
+    ) -> str | None:
+        file_path = os.path.join(self.remote_path, file_name)
+        async with await self.__request(
+            "GET",
+            self.api.get_upload_url(file_path, upload),
+            headers=self.headers,
+            timeout=self.timeout,
+        ) as response:
+            if response.status == 200:
+                logger.throttled("upload_url", "URL для загрузки успешно получен")
+                return (await response.json())["href"]
+
+            if response.status == 409:
+                message = (await response.json())["message"]
+                logger.error(f"Файл уже существует, ответ сервера: {message}")
+                return None
+
+            response.raise_for_status()
+
+    async def __put(self, file_name: str, upload: bool) -> None:
+        upload_url = await self.request_upload_url(file_name=file_name, upload=upload)
+
+        if not upload_url:
+            raise aiohttp.ClientError("URL для загрузки не получен")
+
+        file_path = os.path.join(self.local_path, file_name)
+
+        with open(file_path, "rb") as file:
+            async with await self.__request(
+                "PUT",
+                upload_url,
+                data=file,
+                timeout=self.upload_timeout,
+            ) as response:
+                response.raise_for_status()
+
+    @async_handle_errors
+    async def upload(self, file_name: str) -> dict[str, str]:
+        await self.__put(file_name, upload=False)
+
+        logger.throttled("upload", f"Файл {file_name} загружен успешно")
+        return {"status": "Success"}
+
+    @async_handle_errors
+    async def reload(self, file_name: str) -> dict[str, str]:
+        await self.__put(file_name, upload=True)
+
+        logger.throttled("reload", f"Файл {file_name} заменен успешно")
+        return {"status": "Success"}
+
+    @async_handle_errors
+    async def delete(self, file_name: str, missing_ok: bool = False):
+        async with await self.__request(
+            "DELETE",
+            self.api.get_delete_url(file_name, self.remote_path),
+            headers=self.headers,
+            timeout=self.timeout,
+        ) as response:
+            if response.status == 404:
+                # Как и в YandexDiskClient.delete, отсутствующий файл
+                # считается удаленным; неожиданное отсутствие означает,
+                # что список файлов в облаке устарел.
+                logger.throttled(
+                    "delete_missing",
+                    f"Файл {file_name} в облаке уже отсутствует",
+                    "INFO" if missing_ok else "WARNING",
+                )
+                return {"status": "Success"}
+            response.raise_for_status()
+
+        logger.throttled("delete", f"Файл {file_name} удален")
+        return {"status": "Success"}
+
+    async def __get_page(self, offset: int) -> dict:
+        async with await self.__request(
+            "GET",
+            self.api.get_info_url(self.remote_path, self.page_size, offset),
+            headers=self.headers,
+            timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["_embedded"]
+
+    async def iter_info(self) -> AsyncIterator[FileEntry]:
+        # Как и YandexDiskClient.iter_info, исключения aiohttp
+        # не перехватываются.
+        offset = 0
+        while True:
+            page = await self.__get_page(offset)
+            for item in YandexDiskClient.remove_dir(page["items"]):
+                yield item
+
+            offset += self.page_size
+            total: int | None = page.get("total")
+            if len(page["items"]) < self.page_size or (
+                total is not None and offset >= total
+            ):
+                break
+
+        logger.info("Данные о файлах из облака получены")
+
+    @async_handle_errors
+    async def get_info(self) -> list[FileEntry]:
+        return [item async for item in self.iter_info()]
@@ -0,0 +1,69 @@
+from typing import Iterator, Protocol, runtime_checkable
+
+from core.models import FileEntry
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """
+    Класс StorageBackend описывает хранилище, с которым Synchronizer
+        синхронизирует локальную папку (облако или другая папка).
+    Метод iter_info отдает FileEntry для всех файлов хранилища; ошибки
+        получения списка не перехватываются, чтобы прерванный список
+        не приняли за полный.
+    Метод stat возвращает FileEntry одного файла или None.
+    Методы upload, reload, delete, move и copy возвращают
+        {"status": "Success"} при успехе, {"status": "Changed"}, если
+        локальный файл изменился во время передачи, и None при ошибке.
+        upload не перезаписывает существующий файл, reload - заменяет.
+        delete, move и copy могут вернуть {"status": "Pending",
+        "href": ...}, если операция выполняется хранилищем асинхронно;
+        при missing_ok = True отсутствие удаляемого файла ожидаемо
+        и не считается в inconsistencies.
+    Метод wait_operations дожидается асинхронных операций {имя файла:
+        href} и возвращает {имя файла: успех}.
+    Методы prefetch_upload_urls и clear_prefetch сообщают хранилищу
+        очередь предстоящих передач (имя, перезапись), чтобы оно могло
+        подготовить их пакетно, и отменяют ее.
+    Свойства api_calls, retries и prefetch_hits - накопительные счетчики
+        для метрик, inconsistencies - число ответов хранилища, которые
+        противоречат ожидаемому состоянию (файл уже есть или уже удален):
+        после них сохраненный снимок хранилища нужно сверить заново.
+    Метод close освобождает ресурсы хранилища.
+    """
+
+    def iter_info(self) -> Iterator[FileEntry]: ...
+
+    def stat(self, file_name: str) -> FileEntry | None: ...
+
+    def upload(self, file_name: str) -> dict[str, str] | None: ...
+
+    def reload(self, file_name: str) -> dict[str, str] | None: ...
+
+    def delete(
+        self, file_name: str, missing_ok: bool = False
+    ) -> dict[str, str] | None: ...
+
+    def move(self, file_name: str, from_name: str) -> dict[str, str] | None: ...
+
+    def copy(self, file_name: str, from_name: str) -> dict[str, str] | None: ...
+
+    def wait_operations(self, operations: dict[str, str]) -> dict[str, bool]: ...
+
+    def prefetch_upload_urls(self, items: list[tuple[str, bool]]): ...
+
+    def clear_prefetch(self): ...
+
+    @property
+    def api_calls(self) -> int: ...
+
+    @property
+    def retries(self) -> int: ...
+
+    @property
+    def prefetch_hits(self) -> int: ...
+
+    @property
+    def inconsistencies(self) -> int: ...
+
+    def close(self): ...
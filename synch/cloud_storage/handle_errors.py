@@ -1,3 +1,5 @@
+import asyncio
+
 from requests.exceptions import HTTPError, Timeout, RequestException
 
 from core.log_config import logger
@@ -28,3 +30,31 @@ def handle_errors(func):
         return None
 
     return wrapper
+
+
+def async_handle_errors(func):
+    """
+    Функция async_handle_errors - это аналог декоратора handle_errors
+        для корутин, использующих aiohttp. Исключения ClientResponseError,
+        TimeoutError и ClientError логируются с теми же сообщениями,
+        что и в handle_errors, и корутина возвращает None.
+        Отмена задачи (CancelledError) не перехватывается.
+        aiohttp импортируется только при использовании декоратора,
+        поэтому без aiohttp работает синхронный клиент.
+    """
+    from aiohttp import ClientError, ClientResponseError, ServerTimeoutError
+
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except ClientResponseError as http_err:
+            logger.error(f"Возникла HTTP ошибка: {http_err}")
+        except (asyncio.TimeoutError, ServerTimeoutError) as timeout_err:
+            logger.error(f"Превышено время ожидания ответа: {timeout_err}")
+        except ClientError as req_err:
+            logger.error(f"Ошибка запроса: {req_err}")
+        except Exception as err:
+            logger.error(f"Ошибка: {err}")
+        return None
+
+    return wrapper
@@ -0,0 +1,248 @@
+import os
+import threading
+import uuid
+from typing import Iterator
+
+from core.log_config import logger
+from core.models import FileEntry
+from cloud_storage.handle_errors import handle_errors
+from cloud_storage.yandex import STATUS_CHANGED
+from utils.scanner import get_file_info, scan_dir, walk
+
+
+def copy_file_data(source_fd: int, target_fd: int, size: int) -> int:
+    """
+    Функция copy_file_data копирует size байт между открытыми файлами
+        без передачи данных через память процесса: os.copy_file_range
+        (копирование внутри ядра, на NFS и Btrfs - на стороне сервера
+        или без копирования блоков), при его отсутствии или ошибке -
+        os.sendfile, а в остальных случаях - обычным чтением и записью.
+        Возвращает число скопированных байт.
+    """
+
+    copied = 0
+    for method in ("copy_file_range", "sendfile"):
+        if not hasattr(os, method):
+            continue
+        try:
+            while copied < size:
+                if method == "copy_file_range":
+                    count = os.copy_file_range(source_fd, target_fd, size - copied)
+                else:
+                    count = os.sendfile(target_fd, source_fd, copied, size - copied)
+                if count == 0:
+                    return copied
+                copied += count
+            return copied
+        except OSError:
+            # Файловая система не поддерживает копирование в ядре:
+            # продолжаем с той же позиции следующим способом.
+            os.lseek(source_fd, copied, os.SEEK_SET)
+            os.lseek(target_fd, copied, os.SEEK_SET)
+
+    while copied < size:
+        chunk = os.read(source_fd, min(1 << 20, size - copied))
+        if not chunk:
+            break
+        os.write(target_fd, chunk)
+        copied += len(chunk)
+    return copied
+
+
+class LocalDirectoryBackend:
+    """
+    Класс LocalDirectoryBackend представляет собой хранилище StorageBackend
+        в локальной (или смонтированной сетевой, например NAS) папке
+        target_folder: локальная папка local_folder зеркалируется в нее.
+    Файлы копируются функцией copy_file_data без чтения в память процесса
+        во временный файл, которому задается время изменения исходного
+        файла, и затем атомарно переименовываются, поэтому в target_folder
+        не бывает частично записанных файлов. Если исходный файл изменился
+        во время копирования, возвращается статус STATUS_CHANGED.
+    Метод iter_info отдает файлы target_folder (при recursive = True -
+        включая вложенные папки) в порядке обхода, временные файлы
+        пропускаются.
+    Свойство api_calls возвращает число выполненных операций; повторов
+        и подготовки передач у локальной папки нет. Счетчик inconsistencies,
+        как у YandexDiskClient, содержит число расхождений с ожидаемым
+        состоянием: файл уже есть при загрузке, нет при удалении или
+        перемещении.
+    """
+
+    temp_prefix: str = ".synch-"
+
+    def __init__(
+        self,
+        local_folder: str,
+        target_folder: str,
+        recursive: bool = False,
+        scan_workers: int = 1,
+    ):
+        self.local_path: str = local_folder
+        self.remote_path: str = target_folder
+        self.recursive: bool = recursive
+        self.scan_workers: int = scan_workers
+        self.__lock = threading.Lock()
+        self.__calls: int = 0
+        self.inconsistencies: int = 0
+        os.makedirs(target_folder, exist_ok=True)
+
+    def __count(self):
+        with self.__lock:
+            self.__calls += 1
+
+    def __mark_inconsistent(self):
+        with self.__lock:
+            self.inconsistencies += 1
+
+    @property
+    def api_calls(self) -> int:
+        return self.__calls
+
+    @property
+    def retries(self) -> int:
+        return 0
+
+    @property
+    def prefetch_hits(self) -> int:
+        return 0
+
+    def prefetch_upload_urls(self, items: list[tuple[str, bool]]):
+        pass
+
+    def clear_prefetch(self):
+        pass
+
+    def close(self):
+        pass
+
+    def wait_operations(self, operations: dict[str, str]) -> dict[str, bool]:
+        return {file_name: True for file_name in operations}
+
+    def __target(self, file_name: str) -> str:
+        return os.path.join(self.remote_path, file_name)
+
+    def iter_info(self) -> Iterator[FileEntry]:
+        self.__count()
+        # Неполный список файлов привел бы к повторной загрузке файлов
+        # из непрочитанных папок, поэтому он не возвращается вовсе.
+        skipped: set[str] = set()
+        if self.recursive:
+            files = walk(self.remote_path, self.scan_workers, skipped=skipped)
+        else:
+            files, _ = scan_dir(self.remote_path, skipped=skipped)
+        if skipped:
+            raise OSError(f"Не удалось прочитать: {', '.join(sorted(skipped))}")
+
+        for file in files:
+            if not file.name.rsplit("/", 1)[-1].startswith(self.temp_prefix):
+                yield file
+
+    def stat(self, file_name: str) -> FileEntry | None:
+        self.__count()
+        return get_file_info(self.remote_path, file_name)
+
+    def __copy(self, source_path: str, file_name: str, overwrite: bool) -> bool:
+        target_path = self.__target(file_name)
+        target_dir = os.path.dirname(target_path)
+        os.makedirs(target_dir, exist_ok=True)
+        temp_path = os.path.join(
+            target_dir, f"{self.temp_prefix}{uuid.uuid4().hex}.tmp"
+        )
+
+        with open(source_path, "rb") as source:
+            before = os.fstat(source.fileno())
+            try:
+                with open(temp_path, "wb") as target:
+                    copied = copy_file_data(
+                        source.fileno(), target.fileno(), before.st_size
+                    )
+                os.utime(temp_path, ns=(before.st_atime_ns, before.st_mtime_ns))
+                after = os.fstat(source.fileno())
+
+                if (
+                    copied != before.st_size
+                    or after.st_size != before.st_size
+                    or after.st_mtime_ns != before.st_mtime_ns
+                ):
+                    os.remove(temp_path)
+                    return False
+
+                if not overwrite and os.path.exists(target_path):
+                    self.__mark_inconsistent()
+                    raise FileExistsError(f"Файл {file_name} уже существует")
+                os.replace(temp_path, target_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        return True
+
+    def __transfer(self, file_name: str, overwrite: bool) -> dict[str, str]:
+        self.__count()
+        if not self.__copy(
+            os.path.join(self.local_path, file_name), file_name, overwrite
+        ):
+            logger.throttled(
+                "changed", f"Файл {file_name} изменился во время загрузки", "WARNING"
+            )
+            return {"status": STATUS_CHANGED}
+        return {"status": "Success"}
+
+    @handle_errors
+    def upload(self, file_name: str) -> dict[str, str]:
+        result = self.__transfer(file_name, overwrite=False)
+        if result["status"] == "Success":
+            logger.throttled("upload", f"Файл {file_name} загружен успешно")
+        return result
+
+    @handle_errors
+    def reload(self, file_name: str) -> dict[str, str]:
+        result = self.__transfer(file_name, overwrite=True)
+        if result["status"] == "Success":
+            logger.throttled("reload", f"Файл {file_name} заменен успешно")
+        return result
+
+    @handle_errors
+    def delete(self, file_name: str, missing_ok: bool = False) -> dict[str, str]:
+        self.__count()
+        try:
+            os.remove(self.__target(file_name))
+        except FileNotFoundError:
+            if not missing_ok:
+                self.__mark_inconsistent()
+            logger.throttled("delete", f"Файл {file_name} уже отсутствует")
+            return {"status": "Success"}
+
+        logger.throttled("delete", f"Файл {file_name} удален")
+        return {"status": "Success"}
+
+    @handle_errors
+    def move(self, file_name: str, from_name: str) -> dict[str, str]:
+        self.__count()
+        target_path = self.__target(file_name)
+        source_path = self.__target(from_name)
+        if os.path.exists(target_path):
+            self.__mark_inconsistent()
+            raise FileExistsError(f"Файл {file_name} уже существует")
+        if not os.path.exists(source_path):
+            self.__mark_inconsistent()
+            raise FileNotFoundError(f"Файл {from_name} не найден")
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(source_path, target_path)
+
+        logger.throttled("move", f"Файл {from_name} перемещен в {file_name}")
+        return {"status": "Success"}
+
+    @handle_errors
+    def copy(self, file_name: str, from_name: str) -> dict[str, str]:
+        self.__count()
+        if not os.path.exists(self.__target(from_name)):
+            self.__mark_inconsistent()
+            raise FileNotFoundError(f"Файл {from_name} не найден")
+        if not self.__copy(self.__target(from_name), file_name, overwrite=False):
+            raise OSError(f"Файл {from_name} изменился во время копирования")
+
+        logger.throttled("copy", f"Файл {from_name} скопирован в {file_name}")
+        return {"status": "Success"}
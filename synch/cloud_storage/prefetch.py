@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+RequestUrl = Callable[[str, bool], str | None]
+
+
+class UploadUrlPrefetcher:
+    """
+    Класс UploadUrlPrefetcher представляет собой конвейер получения URL
+        для загрузки: пока передаются текущие файлы, URL для следующих
+        depth файлов очереди запрашиваются заранее функцией request
+        в workers потоках.
+    Метод queue добавляет файлы (имя, перезапись) в очередь в порядке
+        их загрузки.
+    Метод take возвращает полученный заранее URL для файла или None,
+        если URL не запрашивался, не получен или получен более ttl секунд
+        назад (устарел). После выдачи URL запрашивается URL для следующего
+        файла очереди.
+    Метод clear отменяет запросы и очищает очередь, например после
+        завершения или остановки цикла синхронизации.
+    Свойства hits и stale возвращают число выданных и устаревших URL.
+    """
+
+    def __init__(
+        self,
+        request: RequestUrl,
+        depth: int,
+        ttl: float = 300,
+        workers: int = 2,
+    ):
+        self.request: RequestUrl = request
+        self.depth: int = depth
+        self.ttl: float = ttl
+        self.__lock = threading.Lock()
+        self.__pending: deque[tuple[str, bool]] = deque()
+        self.__skipped: set[tuple[str, bool]] = set()
+        self.__requested: dict[tuple[str, bool], tuple[float, Future]] = {}
+        self.__pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="synch-upload-url"
+        )
+        self.hits: int = 0
+        self.stale: int = 0
+
+    def __fill(self):
+        while len(self.__requested) < self.depth and self.__pending:
+            key = self.__pending.popleft()
+            if key in self.__skipped:
+                self.__skipped.discard(key)
+            elif key not in self.__requested:
+                self.__requested[key] = (
+                    time.monotonic(),
+                    self.__pool.submit(self.request, *key),
+                )
+
+    def queue(self, items: list[tuple[str, bool]]):
+        with self.__lock:
+            self.__pending.extend(items)
+            self.__fill()
+
+    def take(self, file_name: str, overwrite: bool) -> str | None:
+        key = (file_name, overwrite)
+        with self.__lock:
+            entry = self.__requested.pop(key, None)
+            if entry is None and self.__pending:
+                # Файл загружается раньше своей очереди: URL для него
+                # запрашивать заранее уже не нужно.
+                self.__skipped.add(key)
+            self.__fill()
+
+        if entry is None:
+            return None
+
+        requested_at, future = entry
+        try:
+            href = future.result()
+        except Exception:
+            return None
+
+        if not href:
+            return None
+        with self.__lock:
+            if time.monotonic() - requested_at > self.ttl:
+                self.stale += 1
+                return None
+            self.hits += 1
+        return href
+
+    def clear(self):
+        with self.__lock:
+            self.__pending.clear()
+            self.__skipped.clear()
+            requested, self.__requested = self.__requested, {}
+
+        for _, future in requested.values():
+            future.cancel()
+
+    def shutdown(self):
+        self.clear()
+        self.__pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,228 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import requests
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from urllib3.exceptions import NewConnectionError
+
+from core.log_config import logger
+
+THROTTLE = "throttle"
+SERVER = "server"
+NETWORK = "network"
+
+# Методы, повтор которых после отправки запроса не меняет результат.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Наблюдатель результата запроса: длительность (None, если не учитывается)
+# и класс ошибки (None при успехе).
+Observer = Callable[[float | None, str | None], None]
+
+
+class TokenBucket:
+    """
+    Класс TokenBucket представляет собой ограничитель частоты запросов,
+        общий для всех потоков: не более rate запросов в секунду
+        со всплесками до capacity запросов.
+    Метод acquire ждет, пока не появится свободный токен.
+    Метод pause приостанавливает выдачу токенов на delay секунд,
+        например по заголовку Retry-After ответа 429.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate: float = rate
+        self.capacity: float = capacity or max(rate, 1)
+        self.__tokens: float = self.capacity
+        self.__updated: float = time.monotonic()
+        self.__paused_until: float = 0.0
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(
+                    self.capacity,
+                    self.__tokens + (now - self.__updated) * self.rate,
+                )
+                self.__updated = now
+
+                if now < self.__paused_until:
+                    delay = self.__paused_until - now
+                elif self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                else:
+                    delay = (1 - self.__tokens) / self.rate
+
+            time.sleep(delay)
+
+    def pause(self, delay: float):
+        with self.__lock:
+            self.__paused_until = max(self.__paused_until, time.monotonic() + delay)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Класс RetryPolicy описывает повторы запросов: отдельный бюджет повторов
+        для каждого класса ошибок (429, 5xx, сетевые ошибки и таймауты),
+        экспоненциальную задержку со случайным разбросом (full jitter)
+        и ее верхнюю границу.
+    Метод classify возвращает класс ошибки по коду ответа или None,
+        если запрос повторять не нужно.
+    Метод backoff возвращает задержку перед повтором номер attempt.
+    """
+
+    budgets: dict[str, int] = field(
+        default_factory=lambda: {THROTTLE: 8, SERVER: 3, NETWORK: 3}
+    )
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    @staticmethod
+    def classify(status_code: int) -> str | None:
+        if status_code == 429:
+            return THROTTLE
+        if status_code >= 500 and status_code not in (501, 507):
+            return SERVER
+        return None
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def request_sent(error: Exception) -> bool:
+    """
+    Функция request_sent возвращает False, если сетевая ошибка error
+        произошла до отправки запроса (соединение не установлено).
+    """
+
+    if isinstance(error, ConnectTimeout):
+        return False
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return not isinstance(reason, NewConnectionError)
+
+
+class RetrySession(requests.Session):
+    """
+    Класс RetrySession представляет собой requests.Session, повторяющий
+        запросы по политике RetryPolicy. Заголовок Retry-After имеет
+        приоритет над расчетной задержкой, но не больше max_delay, а ответ
+        429 приостанавливает общий TokenBucket для всех потоков. Тело
+        запроса из файла перед повтором перематывается на исходную позицию.
+        Неидемпотентные запросы (например, POST перемещения) после сетевой
+        ошибки повторяются, только если запрос не был отправлен.
+        Ожидание перед повтором прерывается событием stop_event: тогда
+        возвращается последний ответ или выбрасывается последняя ошибка.
+        Счетчики calls и retries содержат общее число отправленных запросов
+        (включая повторы) и выполненных повторов.
+        После каждой попытки вызывается observer с ее длительностью (при
+        timed = False - None) и классом ошибки, например для подстройки
+        AdaptiveConcurrency (см. cloud_storage.throttle).
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        bucket: TokenBucket | None = None,
+        observer: Observer | None = None,
+        timed: bool = True,
+        stop_event: threading.Event | None = None,
+    ):
+        super().__init__()
+        self.policy: RetryPolicy = policy
+        self.bucket: TokenBucket | None = bucket
+        self.observer: Observer | None = observer
+        self.timed: bool = timed
+        self.stop_event: threading.Event = stop_event or threading.Event()
+        self.calls: int = 0
+        self.retries: int = 0
+        self.__lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        attempts: dict[str, int] = {}
+        body = kwargs.get("data")
+        position = body.tell() if hasattr(body, "seek") else None
+
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            with self.__lock:
+                self.calls += 1
+
+            error: Exception | None = None
+            retry_after: float | None = None
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (ConnectionError, Timeout) as err:
+                error_class, error = NETWORK, err
+            else:
+                error_class = self.policy.classify(response.status_code)
+
+            if self.observer is not None:
+                seconds = time.perf_counter() - start if self.timed else None
+                self.observer(seconds, error_class)
+            if error is None:
+                if error_class is None:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            attempt = attempts.get(error_class, 0)
+            exhausted = attempt >= self.policy.budgets.get(error_class, 0)
+            # Отправленный POST мог быть выполнен сервером, и повтор
+            # перемещения или копирования вернул бы ошибку.
+            unsafe = (
+                error is not None
+                and method.upper() not in IDEMPOTENT_METHODS
+                and request_sent(error)
+            )
+            if exhausted or unsafe:
+                if error is not None:
+                    raise error
+                return response
+
+            attempts[error_class] = attempt + 1
+            delay = (
+                min(retry_after, self.policy.max_delay)
+                if retry_after is not None
+                else self.policy.backoff(attempt)
+            )
+
+            if error_class == THROTTLE and self.bucket is not None:
+                self.bucket.pause(delay)
+
+            logger.warning(
+                f"Повтор запроса {method} через {delay:.2f} сек. "
+                f"({error_class}, попытка {attempt + 1})"
+            )
+            if self.stop_event.wait(delay):
+                if error is not None:
+                    raise error
+                return response
+
+            if error is None:
+                response.close()
+            if position is not None:
+                body.seek(position)
+
+            with self.__lock:
+                self.retries += 1
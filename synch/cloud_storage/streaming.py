@@ -0,0 +1,85 @@
+import time
+from typing import BinaryIO, Callable
+
+from requests.exceptions import Timeout
+
+from cloud_storage.throttle import BandwidthLimiter
+
+Progress = Callable[[str, int, int, float], None]
+
+
+class UploadStalledError(Timeout):
+    """Очередной блок файла не передан за stall_timeout секунд."""
+
+
+class UploadStream:
+    """
+    Класс UploadStream представляет собой тело PUT-запроса для потоковой
+        загрузки файла: файл читается блоками по chunk_size байт, поэтому
+        в памяти находится не больше одного блока. Передается не больше
+        size байт - размера файла на момент открытия, указанного
+        в Content-Length.
+    После каждого блока вызывается progress(file_name, sent, size, seconds).
+        Если с чтения предыдущего блока прошло больше stall_timeout секунд
+        (0 - без ограничения), то есть соединение передает данные слишком
+        медленно, загрузка прерывается UploadStalledError.
+    Если задан bandwidth, чтение блока ждет, пока скорость загрузки
+        не опустится до общего лимита; это ожидание не считается
+        остановкой загрузки.
+    Методы tell и seek позволяют RetrySession повторить загрузку
+        с начала файла.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        file_name: str,
+        size: int,
+        chunk_size: int = 1 << 20,
+        progress: Progress | None = None,
+        stall_timeout: float = 0,
+        bandwidth: BandwidthLimiter | None = None,
+    ):
+        self.file: BinaryIO = file
+        self.file_name: str = file_name
+        self.size: int = size
+        self.chunk_size: int = chunk_size
+        self.progress: Progress | None = progress
+        self.stall_timeout: float = stall_timeout
+        self.bandwidth: BandwidthLimiter | None = bandwidth
+        self.sent: int = 0
+        self.started: float = time.monotonic()
+        self.__last_read: float = self.started
+
+    def __len__(self) -> int:
+        return self.size
+
+    def tell(self) -> int:
+        return self.sent
+
+    def seek(self, position: int, whence: int = 0) -> int:
+        self.sent = self.file.seek(position, whence)
+        self.started = self.__last_read = time.monotonic()
+        return self.sent
+
+    def read(self, size: int = -1) -> bytes:
+        now = time.monotonic()
+        if self.stall_timeout and now - self.__last_read > self.stall_timeout:
+            raise UploadStalledError(
+                f"Загрузка файла {self.file_name} остановилась "
+                f"на {self.sent} из {self.size} байт"
+            )
+        self.__last_read = now
+
+        limit = self.size - self.sent
+        if limit <= 0:
+            return b""
+
+        chunk = self.file.read(min(self.chunk_size, limit))
+        if self.bandwidth is not None:
+            self.bandwidth.consume(len(chunk))
+            self.__last_read = time.monotonic()
+        self.sent += len(chunk)
+        if self.progress is not None:
+            self.progress(self.file_name, self.sent, self.size, now - self.started)
+        return chunk
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from core.log_config import logger
+
+# Период расписания: начало и конец в минутах от полуночи и лимит (байт/с).
+Period = tuple[int, int, float]
+
+
+def parse_time(value: str) -> int:
+    hours, minutes = value.strip().split(":")
+    if not (0 <= int(hours) <= 24 and 0 <= int(minutes) < 60):
+        raise ValueError(f"Неверное время {value!r}")
+    return min(int(hours) * 60 + int(minutes), 24 * 60)
+
+
+def parse_schedule(value: str) -> list[Period]:
+    """
+    Функция parse_schedule разбирает расписание ограничения скорости
+        вида "09:00-18:00=1048576, 22:00-06:00=0": периоды через запятую,
+        лимит в байтах в секунду (0 - без ограничения). Период, конец
+        которого раньше начала, переходит через полночь.
+    """
+
+    periods: list[Period] = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        try:
+            interval, rate = item.split("=")
+            start, end = interval.split("-")
+            period = (parse_time(start), parse_time(end), float(rate))
+        except ValueError as err:
+            raise ValueError(f"Неверный период расписания {item!r}: {err}") from err
+        if period[2] < 0:
+            raise ValueError(f"Неверный период расписания {item!r}")
+        periods.append(period)
+    return periods
+
+
+class BandwidthLimiter:
+    """
+    Класс BandwidthLimiter представляет собой общее для всех потоков
+        ограничение скорости загрузки: не более rate байт в секунду
+        (0 - без ограничения) со всплесками до одной секунды передачи.
+        В периоды расписания schedule (см. parse_schedule) действует
+        лимит периода.
+    Метод current_rate возвращает лимит на момент now (по умолчанию -
+        текущее локальное время).
+    Метод consume учитывает size переданных байт и ждет, пока средняя
+        скорость не опустится до лимита.
+    """
+
+    def __init__(self, rate: float = 0, schedule: list[Period] | None = None):
+        self.rate: float = rate
+        self.schedule: list[Period] = schedule or []
+        self.__tokens: float = 0.0
+        self.__updated: float = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def current_rate(self, now: datetime | None = None) -> float:
+        if not self.schedule:
+            return self.rate
+
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.schedule:
+            if start <= minute < end or (
+                end < start and (minute >= start or minute < end)
+            ):
+                return rate
+        return self.rate
+
+    def consume(self, size: int):
+        rate = self.current_rate()
+        with self.__lock:
+            now = time.monotonic()
+            if rate <= 0:
+                self.__tokens, self.__updated = 0.0, now
+                return
+
+            self.__tokens = min(rate, self.__tokens + (now - self.__updated) * rate)
+            self.__updated = now
+            # Байты списываются сразу, поэтому каждый поток ждет, пока
+            # не будет погашен общий долг, включая байты других потоков.
+            self.__tokens -= size
+            delay = -self.__tokens / rate
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveConcurrency:
+    """
+    Класс AdaptiveConcurrency представляет собой ограничение числа
+        одновременных загрузок, подстраиваемое по алгоритму AIMD:
+        после limit успешных наблюдений подряд лимит растет на 1
+        (но не больше max_limit), а при ошибке (429, 5xx, сетевая ошибка
+        или таймаут) или задержке запроса к API больше tolerance
+        минимальной задержки из последних window запросов (но не меньше
+        min_latency секунд, чтобы не реагировать на разброс задержек
+        быстрого соединения) - уменьшается
+        в backoff раз (но не меньше min_limit). После уменьшения следующее
+        возможно не раньше, чем через limit наблюдений, чтобы одна
+        перегрузка не сбросила лимит до минимума.
+    Метод slot ждет свободного места и занимает его на время загрузки.
+    Метод observe учитывает результат запроса: seconds - задержка
+        (None, если длительность запроса зависит от размера файла
+        и не отражает перегрузку), error_class - класс ошибки или None.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        initial: int | None = None,
+        tolerance: float = 2.0,
+        backoff: float = 0.5,
+        window: int = 100,
+        min_latency: float = 0.05,
+    ):
+        self.min_limit: int = max(1, min_limit)
+        self.max_limit: int = max(self.min_limit, max_limit)
+        self.limit: int = min(
+            self.max_limit, max(self.min_limit, initial or self.min_limit)
+        )
+        self.tolerance: float = tolerance
+        self.backoff: float = backoff
+        self.min_latency: float = min_latency
+        self.in_flight: int = 0
+        self.__latencies: deque[float] = deque(maxlen=window)
+        self.__successes: int = 0
+        self.__since_decrease: int = self.limit
+        self.__condition = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self.__condition:
+            while self.in_flight >= self.limit:
+                self.__condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.in_flight -= 1
+                self.__condition.notify()
+
+    def observe(self, seconds: float | None, error_class: str | None = None):
+        with self.__condition:
+            self.__since_decrease += 1
+            if error_class is not None:
+                self.__decrease(f"ошибка {error_class}")
+                return
+
+            if seconds is not None:
+                baseline = max(min(self.__latencies, default=seconds), self.min_latency)
+                self.__latencies.append(seconds)
+                if seconds > baseline * self.tolerance:
+                    self.__decrease(f"задержка {seconds:.2f} сек.")
+                    return
+
+            self.__successes += 1
+            if self.__successes >= self.limit and self.limit < self.max_limit:
+                self.__successes = 0
+                self.limit += 1
+                self.__condition.notify()
+                logger.debug(f"Число параллельных загрузок увеличено до {self.limit}")
+
+    def __decrease(self, reason: str):
+        self.__successes = 0
+        if self.__since_decrease < self.limit or self.limit == self.min_limit:
+            return
+
+        self.__since_decrease = 0
+        self.limit = max(self.min_limit, int(self.limit * self.backoff))
+        logger.info(f"Число параллельных загрузок уменьшено до {self.limit} ({reason})")
@@ -1,10 +1,26 @@
 import os
-import requests
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Iterator
+
 from requests import RequestException
+from requests.adapters import HTTPAdapter
 from urllib.parse import quote
 
 from core.log_config import logger
+from core.models import FileEntry
 from cloud_storage.handle_errors import handle_errors
+from cloud_storage.prefetch import UploadUrlPrefetcher
+from cloud_storage.retry import RetryPolicy, RetrySession, TokenBucket
+from cloud_storage.streaming import Progress, UploadStream
+from cloud_storage.throttle import AdaptiveConcurrency, BandwidthLimiter
+
+# Статус результата загрузки файла, измененного во время передачи.
+STATUS_CHANGED = "Changed"
+# Статус асинхронного удаления, принятого облаком, но еще не завершенного.
+STATUS_PENDING = "Pending"
 
 
 class YandexApiUrl:
@@ -12,13 +28,21 @@ class YandexApiUrl:
     Класс YandexApiUrl представляет собой класс,
         который содержит URL-адреса для различных операций с Yandex.Disk API.
     В методе __init__ инициализируются переменные,
-        такие как timeout, host, version, disk, resources, upload и fields.
+        такие как timeout, host (может быть переопределен, например,
+        адресом локального тестового сервера), version, disk, resources, upload и fields.
         Также создается перемен main_url, которая представляет собой основной
         URL-адрес для всех операций с Yandex.Disk API.
     Метод encode_path кодирует путь в URL-формат.
-    Метод get_info_url возвращает URL-адрес для получения информации файлах в облаке.
+    Метод get_info_url возвращает URL-адрес для получения информации файлах в облаке,
+        при заданном limit - URL-адрес страницы списка со смещением offset.
+    Метод get_stat_url возвращает URL-адрес для получения информации
+        об одном файле.
     Метод get_upload_url возвращает URL-адрес для загрузки файла в облако.
-    Метод get_delete_url возвращает URL-адрес для удаления файла из облака.
+    Метод get_move_url возвращает URL-адрес для перемещения (или, при
+        copy = True, копирования) файла внутри облака.
+    Метод get_create_dir_url возвращает URL-адрес для создания папки в облаке.
+    Метод get_delete_url возвращает URL-адрес для удаления файла из облака;
+        при force_async = True облако может выполнить удаление асинхронно.
     """
 
     timeout: int = 10
@@ -27,22 +51,42 @@ class YandexApiUrl:
     disk: str = "/disk"
     resources: str = "/resources"
     upload: str = "/upload"
+    move: str = "/move"
+    copy: str = "/copy"
     fields: str = (
         "_embedded.items.type,_embedded.items.name,"
-        "_embedded.items.path,_embedded.items.modified"
+        "_embedded.items.path,_embedded.items.modified,"
+        "_embedded.items.md5,_embedded.items.sha256,"
+        "_embedded.items.size,_embedded.items.revision,"
+        "_embedded.total,_embedded.limit,_embedded.offset"
     )
+    stat_fields: str = "type,name,path,modified,md5,sha256,size,revision"
     permanently: str = "false"
 
-    def __init__(self):
+    def __init__(self, host: str | None = None):
+        if host:
+            self.host = host
         self.main_url: str = f"{self.host}{self.version}{self.disk}{self.resources}"
 
     @staticmethod
     def encode_path(path: str | None) -> str:
         return quote(path) if path else ""
 
-    def get_info_url(self, remote_path: str) -> str:
+    def get_info_url(
+        self,
+        remote_path: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> str:
+        encoded_path = self.encode_path(remote_path)
+        url = f"{self.main_url}?path={encoded_path}&fields={self.fields}"
+        if limit:
+            url += f"&limit={limit}&offset={offset}"
+        return url
+
+    def get_stat_url(self, remote_path: str) -> str:
         encoded_path = self.encode_path(remote_path)
-        return f"{self.main_url}?path={encoded_path}&fields={self.fields}"
+        return f"{self.main_url}?path={encoded_path}&fields={self.stat_fields}"
 
     def get_upload_url(self, file_path: str, upload: bool = False) -> str:
         overwrite: str = "true" if upload else "false"
@@ -53,54 +97,280 @@ class YandexApiUrl:
             f"&overwrite={overwrite}"
         )
 
-    def get_delete_url(self, file_name: str, remote_path: str) -> str:
+    def get_move_url(self, from_path: str, file_path: str, copy: bool = False) -> str:
+        action: str = self.copy if copy else self.move
+        return (
+            f"{self.main_url}{action}"
+            f"?from={self.encode_path(from_path)}"
+            f"&path={self.encode_path(file_path)}"
+            f"&overwrite=false"
+        )
+
+    def get_create_dir_url(self, dir_path: str) -> str:
+        return f"{self.main_url}?path={self.encode_path(dir_path)}"
+
+    def get_delete_url(
+        self, file_name: str, remote_path: str, force_async: bool = False
+    ) -> str:
         full_path = os.path.join(remote_path, file_name)
         encoded_path = self.encode_path(full_path)
         return (
             f"{self.main_url}?path={encoded_path}"
-            f"&force_async=false&permanently={self.permanently}"
+            f"&force_async={str(force_async).lower()}&permanently={self.permanently}"
         )
 
 
+class DiskSessions:
+    """
+    Класс DiskSessions представляет собой пулы keep-alive соединений,
+        которые могут использоваться несколькими клиентами (например,
+        несколькими парами папок с разными токенами): api - для запросов
+        к API, upload - для хостов загрузки. Запросы к API ограничиваются
+        общим TokenBucket (rate_limit запросов в секунду, 0 - без
+        ограничения), а ответы 429, 5xx и сетевые ошибки повторяются
+        по политике retry_policy (см. cloud_storage.retry).
+        Токен в пулы не записывается и передается клиентом в каждом запросе.
+        Общими для всех клиентов также являются ограничение скорости
+        загрузки bandwidth и подстраиваемое число одновременных загрузок
+        concurrency (см. cloud_storage.throttle): concurrency учитывает
+        задержки и ошибки запросов к API и ошибки загрузок.
+        Событие stop_event прерывает ожидание перед повтором запроса.
+    Метод close закрывает пулы соединений.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        retry_policy: RetryPolicy | None = None,
+        rate_limit: float = 0,
+        bandwidth: BandwidthLimiter | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        stop_event: threading.Event | None = None,
+    ):
+        self.pool_size: int = pool_size
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.stop_event: threading.Event = stop_event or threading.Event()
+        self.rate_limiter: TokenBucket | None = (
+            TokenBucket(rate_limit) if rate_limit > 0 else None
+        )
+        self.bandwidth: BandwidthLimiter | None = bandwidth
+        self.concurrency: AdaptiveConcurrency | None = concurrency
+        self.api: RetrySession = self.__create_session(
+            pool_size, self.retry_policy, self.stop_event, self.rate_limiter
+        )
+        self.upload: RetrySession = self.__create_session(
+            pool_size, self.retry_policy, self.stop_event
+        )
+        if concurrency is not None:
+            self.api.observer = concurrency.observe
+            self.upload.observer = concurrency.observe
+            # Длительность загрузки зависит от размера файла.
+            self.upload.timed = False
+
+    @staticmethod
+    def __create_session(
+        pool_size: int,
+        policy: RetryPolicy,
+        stop_event: threading.Event,
+        bucket: TokenBucket | None = None,
+    ) -> RetrySession:
+        session = RetrySession(policy, bucket, stop_event=stop_event)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        self.api.close()
+        self.upload.close()
+
+
 class YandexDiskClient:
     """
-    Класс YandexDiskClient представляет собой клиент для работы с Yandex.Disk API.
+    Класс YandexDiskClient представляет собой клиент для работы с Yandex.Disk API,
+        реализующий протокол StorageBackend (см. cloud_storage.backend).
     В методе __init__ инициализируются переменные,
         такие как oauth_token, remote_path, local_path и headers.
+        Клиент использует два пула keep-alive соединений DiskSessions:
+        api_session для cloud-api.yandex.net и upload_session для хостов
+        загрузки. Если общие пулы sessions не переданы, клиент создает
+        собственные размером pool_size с политикой повторов retry_policy,
+        ограничением частоты запросов rate_limit, скорости загрузки
+        bandwidth и числа одновременных загрузок concurrency; событие
+        stop_event прерывает ожидание перед повтором запроса.
+    Свойства api_calls и retries возвращают число отправленных запросов
+        и выполненных повторов в пулах клиента.
+    Счетчик inconsistencies содержит число ответов, показывающих, что
+        облако расходится с ожидаемым состоянием: 409 при запросе URL
+        загрузки (файл уже есть или нет папки), 404 при удалении, 404
+        и 409 при перемещении и копировании. При расхождении сбрасывается
+        и кэш известных папок.
+    Метод close закрывает собственные пулы соединений.
     Метод request_upload_url возвращает URL для загрузки файла в облако.
-    Метод upload загружает файл в облако.
-    Метод reload заменяет файл в облаке.
-    Метод delete удаляет файл из облака.
-    Метод remove_dir удаляет директории из списка файлов.
+    Метод prefetch_upload_urls ставит файлы в очередь UploadUrlPrefetcher:
+        при prefetch_urls > 0 URL для следующих prefetch_urls файлов
+        запрашиваются заранее, пока передаются текущие. URL, полученный
+        более url_ttl секунд назад, не используется, а при ответе 404
+        или 410 на загрузку по полученному заранее URL запрашивается
+        новый. Метод clear_prefetch очищает очередь.
+    Методы upload и reload загружают файл в облако, reload - с заменой
+        существующего файла. Файл передается потоком UploadStream блоками
+        по chunk_size байт с вызовом progress после каждого блока
+        и прерыванием при передаче блока дольше stall_timeout секунд.
+        Скорость загрузки и число одновременных загрузок ограничиваются
+        общими для пулов sessions bandwidth и concurrency.
+        Если размер или время изменения файла изменились во время
+        передачи, возвращается статус STATUS_CHANGED: в облаке может
+        оказаться несогласованная копия, и файл нужно загрузить повторно.
+    Метод delete удаляет файл из облака. При async_delete = True облако
+        не ждет завершения удаления: если оно выполняется асинхронно,
+        возвращается статус STATUS_PENDING и адрес операции href.
+        Отсутствие файла считается расхождением с облаком, только если
+        missing_ok = False.
+    Метод wait_operations опрашивает статусы операций {имя файла: href}
+        раундами, параллельно в pool_size потоков, с интервалом от
+        poll_interval секунд, удваивающимся до 10 секунд, и возвращает
+        {имя файла: успех}. Операции, не завершившиеся за operation_timeout
+        секунд, считаются невыполненными.
+    Метод get_operation_status возвращает статус операции облака.
+    Метод move перемещает файл from_name в облаке под имя file_name.
+    Метод copy копирует файл from_name в облаке под имя file_name.
+        Если облако выполняет move или copy асинхронно, они, как и delete,
+        возвращают статус STATUS_PENDING и адрес операции href.
+    Метод remove_dir удаляет директории из списка файлов и преобразует
+        остальные элементы в FileEntry.
+    Метод iter_info постранично получает список файлов в облаке и отдает
+        их генератором; страницы размером page_size после первой
+        запрашиваются параллельно в listing_workers потоков. При
+        recursive = True обходятся и вложенные папки, а имена файлов
+        задаются относительно remote_path через "/".
+    Метод create_dir создает папку в облаке.
+    Метод ensure_dirs создает в облаке недостающие родительские папки
+        файла; созданные и найденные папки запоминаются.
     Метод get_info возвращает информацию о файлах в облаке.
+    Метод stat возвращает информацию об одном файле в облаке или None,
+        если файла нет.
     """
 
     api: YandexApiUrl = YandexApiUrl()
 
-    def __init__(self, local_folder: str, remote_folder: str, token: str):
+    def __init__(
+        self,
+        local_folder: str,
+        remote_folder: str,
+        token: str,
+        pool_size: int = 10,
+        timeout: float = YandexApiUrl.timeout,
+        upload_timeout: float = 60,
+        page_size: int = 1000,
+        listing_workers: int = 1,
+        api_host: str | None = None,
+        recursive: bool = False,
+        retry_policy: RetryPolicy | None = None,
+        rate_limit: float = 0,
+        sessions: DiskSessions | None = None,
+        prefetch_urls: int = 0,
+        url_ttl: float = 300,
+        chunk_size: int = 1 << 20,
+        stall_timeout: float = 0,
+        progress: Progress | None = None,
+        bandwidth: BandwidthLimiter | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        async_delete: bool = False,
+        poll_interval: float = 1,
+        operation_timeout: float = 300,
+        stop_event: threading.Event | None = None,
+    ):
+        if api_host:
+            self.api = YandexApiUrl(api_host)
         self.oauth_token: str = token
         self.remote_path: str = remote_folder
         self.local_path: str = local_folder
+        self.pool_size: int = pool_size
+        self.timeout: float = timeout
+        self.upload_timeout: float = upload_timeout
+        self.chunk_size: int = chunk_size
+        self.stall_timeout: float = stall_timeout
+        self.progress: Progress | None = progress
+        self.page_size: int = page_size
+        self.listing_workers: int = listing_workers
+        self.recursive: bool = recursive
+        self.async_delete: bool = async_delete
+        self.poll_interval: float = poll_interval
+        self.operation_timeout: float = operation_timeout
+        self.__known_dirs: set[str] = set()
+        self.__lock = threading.Lock()
+        self.inconsistencies: int = 0
         self.headers: dict[str, str] = {
             "Content-Type": "application/json",
             "Accept": "application/json",
             "Authorization": f"OAuth {token}",
         }
+        self.__own_sessions: bool = sessions is None
+        self.sessions: DiskSessions = sessions or DiskSessions(
+            pool_size, retry_policy, rate_limit, bandwidth, concurrency, stop_event
+        )
+        self.retry_policy: RetryPolicy = self.sessions.retry_policy
+        self.rate_limiter: TokenBucket | None = self.sessions.rate_limiter
+        self.api_session: RetrySession = self.sessions.api
+        self.upload_session: RetrySession = self.sessions.upload
+        if self.__own_sessions:
+            self.api_session.headers.update(self.headers)
+        self.prefetcher: UploadUrlPrefetcher | None = (
+            UploadUrlPrefetcher(
+                self.__prefetch_url,
+                prefetch_urls,
+                url_ttl,
+                workers=min(prefetch_urls, pool_size),
+            )
+            if prefetch_urls > 0
+            else None
+        )
+
+    def __mark_inconsistent(self):
+        with self.__lock:
+            self.inconsistencies += 1
+            self.__known_dirs.clear()
+
+    @property
+    def api_calls(self) -> int:
+        return self.api_session.calls + self.upload_session.calls
+
+    @property
+    def retries(self) -> int:
+        return self.api_session.retries + self.upload_session.retries
+
+    @property
+    def prefetch_hits(self) -> int:
+        return self.prefetcher.hits if self.prefetcher is not None else 0
+
+    def close(self):
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+        if self.__own_sessions:
+            self.sessions.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     @handle_errors
     def request_upload_url(self, file_name: str, upload: bool = False) -> str | None:
         file_path = os.path.join(self.remote_path, file_name)
-        response = requests.get(
+        response = self.api_session.get(
             self.api.get_upload_url(file_path, upload),
+            timeout=self.timeout,
             headers=self.headers,
-            timeout=self.api.timeout,
         )
 
         if response.status_code == 200:
-            logger.info(f"URL для загрузки успешно получен")
+            logger.throttled("upload_url", "URL для загрузки успешно получен")
             return response.json()["href"]
 
         if response.status_code == 409:
+            self.__mark_inconsistent()
             logger.error(
                 f"Файл уже существует, ответ сервера: {response.json()["message"]}"
             )
@@ -108,10 +378,44 @@ class YandexDiskClient:
 
         response.raise_for_status()
 
-    @handle_errors
-    def upload(self, file_name: str) -> dict[str, str]:
+    def __prefetch_url(self, file_name: str, overwrite: bool) -> str | None:
+        self.ensure_dirs(file_name)
+        return self.request_upload_url(file_name, overwrite)
+
+    def prefetch_upload_urls(self, items: list[tuple[str, bool]]):
+        if self.prefetcher is not None:
+            self.prefetcher.queue(items)
+
+    def clear_prefetch(self):
+        if self.prefetcher is not None:
+            self.prefetcher.clear()
 
-        upload_url = self.request_upload_url(file_name=file_name)
+    def __send_file(self, upload_url: str, stream: UploadStream):
+        return self.upload_session.put(
+            upload_url,
+            data=stream,
+            timeout=self.upload_timeout,
+        )
+
+    def __put_file(self, file_name: str, overwrite: bool) -> bool:
+        if self.sessions.concurrency is None:
+            return self.__put_file_now(file_name, overwrite)
+        with self.sessions.concurrency.slot():
+            return self.__put_file_now(file_name, overwrite)
+
+    def __put_file_now(self, file_name: str, overwrite: bool) -> bool:
+        upload_url = (
+            self.prefetcher.take(file_name, overwrite)
+            if self.prefetcher is not None
+            else None
+        )
+        prefetched = upload_url is not None
+        if not prefetched:
+            self.ensure_dirs(file_name)
+            upload_url = self.request_upload_url(
+                file_name=file_name,
+                upload=overwrite,
+            )
 
         if not upload_url:
             raise RequestException("URL для загрузки не получен")
@@ -119,71 +423,293 @@ class YandexDiskClient:
         file_path = os.path.join(self.local_path, file_name)
 
         with open(file_path, "rb") as file:
-            response = requests.put(upload_url, data=file)
+            before = os.fstat(file.fileno())
+            stream = UploadStream(
+                file,
+                file_name,
+                before.st_size,
+                self.chunk_size,
+                self.progress,
+                self.stall_timeout,
+                self.sessions.bandwidth,
+            )
 
-        response.raise_for_status()
+            try:
+                response = self.__send_file(upload_url, stream)
+
+                if prefetched and response.status_code in (404, 410):
+                    # Полученный заранее URL мог устареть.
+                    logger.throttled(
+                        "upload_url", f"URL для загрузки файла {file_name} устарел"
+                    )
+                    upload_url = self.request_upload_url(
+                        file_name=file_name,
+                        upload=overwrite,
+                    )
+                    if not upload_url:
+                        raise RequestException("URL для загрузки не получен")
+                    stream.seek(0)
+                    response = self.__send_file(upload_url, stream)
+
+            except RequestException:
+                # Загрузка могла прерваться из-за того, что файл
+                # уменьшился во время передачи.
+                if self.__changed(file, before):
+                    return False
+                raise
+
+            response.raise_for_status()
+            return stream.sent == before.st_size and not self.__changed(file, before)
+
+    @staticmethod
+    def __changed(file: BinaryIO, before: os.stat_result) -> bool:
+        after = os.fstat(file.fileno())
+        return (
+            after.st_size != before.st_size or after.st_mtime_ns != before.st_mtime_ns
+        )
+
+    @handle_errors
+    def upload(self, file_name: str) -> dict[str, str]:
+        if not self.__put_file(file_name, overwrite=False):
+            logger.throttled(
+                "changed", f"Файл {file_name} изменился во время загрузки", "WARNING"
+            )
+            return {"status": STATUS_CHANGED}
 
-        logger.info(f"Файл {file_name} загружен успешно")
+        logger.throttled("upload", f"Файл {file_name} загружен успешно")
         return {"status": "Success"}
 
     @handle_errors
     def reload(self, file_name: str) -> dict[str, str]:
-        reload_url = self.request_upload_url(
-            file_name=file_name,
-            upload=True,
+        if not self.__put_file(file_name, overwrite=True):
+            logger.throttled(
+                "changed", f"Файл {file_name} изменился во время загрузки", "WARNING"
+            )
+            return {"status": STATUS_CHANGED}
+
+        logger.throttled("reload", f"Файл {file_name} заменен успешно")
+        return {"status": "Success"}
+
+    @handle_errors
+    def delete(self, file_name: str, missing_ok: bool = False):
+        delete_url = self.api.get_delete_url(
+            file_name, self.remote_path, self.async_delete
+        )
+        response = self.api_session.delete(
+            delete_url,
+            timeout=self.timeout,
+            headers=self.headers,
         )
 
-        if not reload_url:
-            raise RequestException("URL для загрузки не получен")
+        if response.status_code == 404:
+            if not missing_ok:
+                self.__mark_inconsistent()
+            logger.throttled("delete", f"Файл {file_name} в облаке уже отсутствует")
+            return {"status": "Success"}
 
-        file_path = os.path.join(self.local_path, file_name)
+        response.raise_for_status()
 
-        with open(file_path, "rb") as file:
-            response = requests.put(
-                reload_url,
-                data=file,
+        if self.async_delete and response.status_code == 202:
+            logger.throttled(
+                "delete", f"Удаление файла {file_name} выполняется в облаке"
             )
-        response.raise_for_status()
+            return {"status": STATUS_PENDING, "href": response.json()["href"]}
 
-        logger.info(f"Файл {file_name} заменен успешно")
+        logger.throttled("delete", f"Файл {file_name} удален")
         return {"status": "Success"}
 
     @handle_errors
-    def delete(self, file_name: str):
-        delete_url = self.api.get_delete_url(file_name, self.remote_path)
-        response = requests.delete(
-            delete_url,
+    def get_operation_status(self, href: str) -> str | None:
+        response = self.api_session.get(
+            href,
+            timeout=self.timeout,
             headers=self.headers,
-            timeout=self.api.timeout,
         )
-
+        if response.status_code == 404:
+            return "failed"
         response.raise_for_status()
+        return response.json()["status"]
+
+    def wait_operations(self, operations: dict[str, str]) -> dict[str, bool]:
+        results: dict[str, bool] = {}
+        pending = dict(operations)
+        deadline = time.monotonic() + self.operation_timeout
+        delay = self.poll_interval
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.pool_size, len(pending))),
+            thread_name_prefix="synch-operation",
+        ) as pool:
+            while pending:
+                statuses = pool.map(self.get_operation_status, pending.values())
+                for file_name, status in list(zip(pending, statuses)):
+                    # None - статус не получен, опрос повторяется.
+                    if status in ("success", "failed"):
+                        results[file_name] = status == "success"
+                        del pending[file_name]
+
+                if not pending or time.monotonic() + delay > deadline:
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 10)
+
+        for file_name in pending:
+            logger.throttled(
+                "operation",
+                f"Операция над файлом {file_name} не завершилась "
+                f"за {self.operation_timeout} сек.",
+                "WARNING",
+            )
+            results[file_name] = False
+        return results
+
+    def __move(self, file_name: str, from_name: str, copy: bool) -> dict[str, str]:
+        self.ensure_dirs(file_name)
+        response = self.api_session.post(
+            self.api.get_move_url(
+                os.path.join(self.remote_path, from_name),
+                os.path.join(self.remote_path, file_name),
+                copy,
+            ),
+            timeout=self.timeout,
+            headers=self.headers,
+        )
+        if response.status_code in (404, 409):
+            self.__mark_inconsistent()
+        response.raise_for_status()
+
+        # 202 - операция принята и будет завершена сервером асинхронно:
+        # ее результат проверяется через wait_operations.
+        if response.status_code == 202:
+            logger.throttled(
+                "move", f"Операция над файлом {file_name} выполняется в облаке"
+            )
+            return {"status": STATUS_PENDING, "href": response.json()["href"]}
 
-        logger.info(f"Файл {file_name} удален")
         return {"status": "Success"}
 
-    @staticmethod
-    def remove_dir(items: list[dict]) -> list[dict]:
-        return [{**item} for item in items if item["type"] == "file"]
+    @handle_errors
+    def move(self, file_name: str, from_name: str) -> dict[str, str]:
+        result = self.__move(file_name, from_name, copy=False)
+        if result["status"] == "Success":
+            logger.throttled("move", f"Файл {from_name} перемещен в {file_name}")
+        return result
 
     @handle_errors
-    def get_info(self) -> list[dict]:
-        # returns list[dict]:
-        # [
-        #     "name": "bar-2.sdf"
-        #     "modified": "2014-04-22T10:32:49+04:00"
-        #     "path": "disk:/foo/bar-2.sdf"
-        #     "type": "file"
-        # ]
-
-        response = requests.get(
-            self.api.get_info_url(self.remote_path),
+    def copy(self, file_name: str, from_name: str) -> dict[str, str]:
+        result = self.__move(file_name, from_name, copy=True)
+        if result["status"] == "Success":
+            logger.throttled("copy", f"Файл {from_name} скопирован в {file_name}")
+        return result
+
+    @staticmethod
+    def remove_dir(items: list[dict]) -> list[FileEntry]:
+        return [FileEntry.from_remote(item) for item in items if item["type"] == "file"]
+
+    def __get_page(self, folder: str, offset: int) -> dict:
+        response = self.api_session.get(
+            self.api.get_info_url(folder, self.page_size, offset),
+            timeout=self.timeout,
             headers=self.headers,
-            timeout=self.api.timeout,
         )
         response.raise_for_status()
 
-        data: list[dict] = response.json()["_embedded"]["items"]
+        return response.json()["_embedded"]
+
+    def __iter_folder(self, folder: str) -> Iterator[list[dict]]:
+        page = self.__get_page(folder, 0)
+        yield page["items"]
+
+        total: int = page.get("total", 0)
+        offsets = range(self.page_size, total, self.page_size)
+
+        if self.listing_workers > 1 and total:
+            # Окно из listing_workers запросов ограничивает число страниц,
+            # одновременно находящихся в памяти.
+            with ThreadPoolExecutor(max_workers=self.listing_workers) as executor:
+                pending: deque[Future] = deque()
+                for offset in offsets:
+                    if len(pending) >= self.listing_workers:
+                        yield pending.popleft().result()["items"]
+                    pending.append(executor.submit(self.__get_page, folder, offset))
+                while pending:
+                    yield pending.popleft().result()["items"]
+        else:
+            offset = self.page_size
+            while len(page["items"]) == self.page_size:
+                page = self.__get_page(folder, offset)
+                yield page["items"]
+                offset += self.page_size
+
+    def iter_info(self) -> Iterator[FileEntry]:
+        # Исключения requests не перехватываются: вызывающий код должен
+        # отличать прерванный список файлов от полного.
+        folders: deque[str] = deque([""])
+
+        while folders:
+            relative = folders.popleft()
+            folder = f"{self.remote_path}/{relative}" if relative else self.remote_path
+
+            for items in self.__iter_folder(folder):
+                for item in items:
+                    name = f"{relative}/{item["name"]}" if relative else item["name"]
+
+                    if item["type"] == "dir":
+                        if self.recursive:
+                            self.__known_dirs.add(name)
+                            folders.append(name)
+                        continue
+
+                    entry = FileEntry.from_remote(item)
+                    entry.name = name
+                    yield entry
+
         logger.info("Данные о файлах из облака получены")
 
-        return self.remove_dir(data)
+    @handle_errors
+    def create_dir(self, dir_name: str) -> dict[str, str]:
+        response = self.api_session.put(
+            self.api.get_create_dir_url(os.path.join(self.remote_path, dir_name)),
+            timeout=self.timeout,
+            headers=self.headers,
+        )
+
+        # 409 - папка уже существует.
+        if response.status_code != 409:
+            response.raise_for_status()
+            logger.throttled("create_dir", f"Папка {dir_name} создана в облаке")
+
+        self.__known_dirs.add(dir_name)
+        return {"status": "Success"}
+
+    def ensure_dirs(self, file_name: str):
+        parts = file_name.split("/")[:-1]
+
+        for depth in range(1, len(parts) + 1):
+            dir_name = "/".join(parts[:depth])
+            if dir_name not in self.__known_dirs:
+                if self.create_dir(dir_name) is None:
+                    raise RequestException(f"Папка {dir_name} не создана")
+
+    @handle_errors
+    def get_info(self) -> list[FileEntry]:
+        return list(self.iter_info())
+
+    @handle_errors
+    def stat(self, file_name: str) -> FileEntry | None:
+        response = self.api_session.get(
+            self.api.get_stat_url(os.path.join(self.remote_path, file_name)),
+            timeout=self.timeout,
+            headers=self.headers,
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+
+        item = response.json()
+        if item.get("type") != "file":
+            return None
+
+        entry = FileEntry.from_remote(item)
+        entry.name = file_name
+        return entry
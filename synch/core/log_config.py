@@ -1,6 +1,8 @@
 import datetime
 import os
 import sys
+import threading
+import time
 from loguru import logger as loguru_logger
 from pathlib import Path
 
@@ -19,22 +21,43 @@ class MyLogger:
     Метод warning записывает сообщение уровня WARNING в лог.
     Метод error записывает сообщение уровня ERROR в лог.
     Метод critical записывает сообщение уровня CRITICAL в лог.
+    Метод summary записывает число элементов списка и, в режиме summary,
+        не более sample из них вместо всего списка.
+    Метод throttled записывает сообщение об отдельном файле: сообщений
+        с одним ключом (например, типом операции) записывается не более
+        file_rate в секунду, число пропущенных сообщений записывается
+        при смене секунды или вызове flush_suppressed.
+    Метод complete дожидается записи сообщений из очереди.
+    Уровень сообщений задается отдельно для консоли и файла. При
+        enqueue = true запись в консоль и файл выполняется в отдельном
+        потоке и не задерживает синхронизацию.
     """
 
     def __init__(self):
         self.logger = loguru_logger
         self.logger.remove()
 
+        enqueue = str(config.get("synch_log_enqueue", "false")).lower() == "true"
+        self.summary_mode: bool = (
+            str(config.get("synch_log_summary", "true")).lower() == "true"
+        )
+        self.sample: int = int(str(config.get("synch_log_sample", "10")))
+        self.file_rate: int = int(str(config.get("synch_log_file_rate", "50")))
+        self.__lock = threading.Lock()
+        self.__windows: dict[str, list] = {}
+
         self.logger.add(
             sys.stderr,
             format="{extra[app_name]} {time:YYYY-MM-DD HH:mm:ss.SSS} {level} {message}",
-            level="DEBUG",
+            level=str(config.get("synch_log_console_level", "DEBUG")).upper(),
+            enqueue=enqueue,
         )
         self.logger.add(
             get_log_filename(),
             retention="15 days",
             format="{extra[app_name]} {time:YYYY-MM-DD HH:mm:ss.SSS} {level} {message}",
-            level="DEBUG",
+            level=str(config.get("synch_log_file_level", "DEBUG")).upper(),
+            enqueue=enqueue,
         )
 
         self.logger = self.logger.bind(app_name="synchronizer")
@@ -54,6 +77,49 @@ class MyLogger:
     def critical(self, message):
         self.logger.critical(message)
 
+    def summary(self, message: str, items: list[str], level: str = "INFO"):
+        if not self.summary_mode or len(items) <= self.sample:
+            self.logger.log(level, f"{message} ({len(items)}): {items}")
+            return
+
+        sample = ", ".join(items[: self.sample])
+        self.logger.log(
+            level, f"{message} ({len(items)}), первые {self.sample}: {sample}, ..."
+        )
+
+    def throttled(self, key: str, message: str, level: str = "INFO"):
+        if self.file_rate <= 0:
+            self.logger.log(level, message)
+            return
+
+        now = time.monotonic()
+        with self.__lock:
+            window = self.__windows.setdefault(key, [now, 0, 0, level])
+            suppressed = 0
+            if now - window[0] >= 1:
+                suppressed = window[2]
+                window[:] = [now, 0, 0, level]
+            window[1] += 1
+            allowed = window[1] <= self.file_rate
+            if not allowed:
+                window[2] += 1
+
+        if suppressed:
+            self.logger.log(level, f"Пропущено сообщений ({key}): {suppressed}")
+        if allowed:
+            self.logger.log(level, message)
+
+    def flush_suppressed(self):
+        with self.__lock:
+            windows, self.__windows = self.__windows, {}
+
+        for key, (_, _, suppressed, level) in windows.items():
+            if suppressed:
+                self.logger.log(level, f"Пропущено сообщений ({key}): {suppressed}")
+
+    def complete(self):
+        self.logger.complete()
+
 
 def get_log_filename():
     now = datetime.datetime.now()
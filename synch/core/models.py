@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import os
+
+NS_PER_SECOND = 1_000_000_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class FileEntry:
+    """
+    Класс FileEntry представляет собой компактную запись о файле,
+        общую для локальной папки и облака. Время изменения хранится
+        целым числом наносекунд с начала эпохи, поэтому сравнение файлов
+        не требует разбора строк.
+    Метод from_stat создает запись по результату os.stat.
+    Метод from_remote создает запись из элемента списка Yandex.Disk API,
+        разбирая время изменения один раз при получении.
+    Свойство modified возвращает время изменения в формате ISO 8601.
+    """
+
+    name: str
+    size: int
+    mtime_ns: int
+    path: str = ""
+    inode: int = 0
+    md5: str | None = None
+    sha256: str | None = None
+    revision: int | None = None
+
+    @classmethod
+    def from_stat(cls, name: str, path: str, file_stat: os.stat_result) -> "FileEntry":
+        return cls(
+            name,
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            path,
+            file_stat.st_ino,
+        )
+
+    @classmethod
+    def from_remote(cls, item: dict) -> "FileEntry":
+        # "modified": "2014-04-22T10:32:49+04:00"
+        modified = datetime.fromisoformat(item["modified"])
+        mtime_ns = (modified - EPOCH) // timedelta(microseconds=1) * 1000
+        return cls(
+            item["name"],
+            item.get("size", -1),
+            mtime_ns,
+            item.get("path", ""),
+            md5=item.get("md5"),
+            sha256=item.get("sha256"),
+            revision=item.get("revision"),
+        )
+
+    @property
+    def modified(self) -> str:
+        return datetime.fromtimestamp(
+            self.mtime_ns / NS_PER_SECOND, tz=timezone.utc
+        ).isoformat(timespec="seconds")
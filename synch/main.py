@@ -1,17 +1,48 @@
+import argparse
+
 from core.config import config
 from core.log_config import logger
+from utils.multi_synchronize import MultiSynchronizer
 from utils.synchronize import Synchronizer
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Синхронизация папки с Yandex.Disk")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="вывести план синхронизации без изменений в облаке",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="построить план по полному списку файлов в облаке",
+    )
+    args = parser.parse_args()
+
+    if config.get("synch_pairs_file"):
+        sync_files = MultiSynchronizer()
+    elif config.get("synch_engine", "threads") == "asyncio":
+        # aiohttp нужен только асинхронному движку.
+        from utils.async_synchronize import AsyncSynchronizer
+
+        sync_files = AsyncSynchronizer()
+    else:
+        sync_files = Synchronizer()
+
+    if args.dry_run:
+        try:
+            sync_files.print_plan(args.verify)
+        finally:
+            sync_files.close()
+        raise SystemExit
+
     logger.info("Начало работы программы синхронизации!!!")
     logger.info(
         "Запуск синхронизации директории "
         f"{config.get("path_local_folder", "директория не определена")}"
     )
 
-    sync_files = Synchronizer()
-
     try:
         sync_files.start_sync()
     except KeyboardInterrupt:
@@ -0,0 +1,209 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+import aiohttp
+
+from cloud_storage.async_yandex import AsyncYandexDiskClient
+from core.config import config
+from core.log_config import logger
+from core.models import FileEntry
+from utils.executor import OperationResult, log_results
+from utils.scanner import get_local_files_with_mtime
+from utils.synchronize import create_ignore_rules, create_retry_policy
+
+
+class AsyncSynchronizer:
+    """
+    Класс AsyncSynchronizer представляет собой асинхронный вариант
+        Synchronizer: все запросы к облаку выполняются в одном потоке
+        в цикле событий asyncio.
+    В методе __init__ инициализируются те же переменные, что и
+        в Synchronizer, включая правила исключения ignore, а также семафор,
+        ограничивающий число одновременно выполняемых операций значением
+        workers.
+    Метод plan возвращает список операций (тип, имя файла) по списку
+        файлов в облаке или None, если его не удалось получить.
+        Исключенные файлы, как и в Synchronizer, не загружаются в облако
+        и не удаляются из него.
+    Метод sync_files синхронизирует файлы между локальной папкой и облаком.
+    Метод print_plan выводит план синхронизации без изменений в облаке.
+    Метод close закрывает сессию клиента.
+    Метод run - корутина, выполняющая синхронизацию каждые delay секунд
+        до вызова stop_sync.
+    Метод stop_sync останавливает синхронизацию.
+    Метод start_sync запускает цикл событий с корутиной run.
+    """
+
+    def __init__(self):
+        self.local_path: str = str(config.get("path_local_folder", ""))
+        self.remote_path: str = str(config.get("path_cloud_folder", ""))
+        self.cloud_token: str = str(config.get("yandex_oauth_token", ""))
+        self.delay: int = int(str(config.get("synch_delay", "30")))
+        self.workers: int = int(str(config.get("synch_workers", "4")))
+        self.pool_size: int = int(str(config.get("synch_pool_size", self.workers)))
+        self.timeout: float = float(str(config.get("synch_timeout", "10")))
+        self.upload_timeout: float = float(
+            str(config.get("synch_upload_timeout", "60"))
+        )
+        self.ignore = create_ignore_rules()
+        self.running: bool = False
+        self.cloud_drive = AsyncYandexDiskClient(
+            local_folder=self.local_path,
+            remote_folder=self.remote_path,
+            token=self.cloud_token,
+            pool_size=self.pool_size,
+            timeout=self.timeout,
+            upload_timeout=self.upload_timeout,
+            page_size=int(str(config.get("synch_page_size", "1000"))),
+            api_host=config.get("yandex_api_host") or None,
+            retry_policy=create_retry_policy(),
+        )
+        self.semaphore = asyncio.Semaphore(self.workers)
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__stop_event: asyncio.Event | None = None
+        logger.info(f"remote_path: {self.remote_path}")
+
+    async def __run_operation(
+        self,
+        operation: str,
+        func: Callable[[str], Awaitable],
+        file_name: str,
+    ) -> OperationResult:
+        async with self.semaphore:
+            return OperationResult(operation, file_name, await func(file_name))
+
+    async def plan(self) -> list[tuple[str, str]] | None:
+        try:
+            local_files: list[FileEntry] = await asyncio.to_thread(
+                get_local_files_with_mtime, self.local_path, False, 1, self.ignore
+            )
+        except OSError as err:
+            logger.error(f"Локальная папка недоступна, цикл пропущен: {err}")
+            return None
+
+        now = time.time_ns()
+        filtered = {
+            file.name for file in local_files if self.ignore.filtered(file, now)
+        }
+        local_files = [file for file in local_files if file.name not in filtered]
+        logger.info(f"Локальных файлов для синхронизации: {len(local_files)}")
+
+        local_files_dict = {file.name: file for file in local_files}
+        operations: list[tuple[str, str]] = []
+        remote_count = 0
+
+        # Как и в Synchronizer, операции выполняются только после
+        # получения полного списка файлов в облаке.
+        try:
+            async for remote_file in self.cloud_drive.iter_info():
+                remote_count += 1
+                file_name: str = remote_file.name
+                if file_name in filtered or self.ignore.ignores(file_name):
+                    continue
+                file = local_files_dict.pop(file_name, None)
+
+                if file is None:
+                    operations.append(("delete", file_name))
+                elif file.mtime_ns > remote_file.mtime_ns:
+                    operations.append(("reload", file_name))
+
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            KeyError,
+            ValueError,
+            TypeError,
+        ) as err:
+            logger.error(f"данные из облака не получены: {err}")
+            return None
+
+        logger.info(f"Имеющихся файлов в облаке: {remote_count}")
+        operations.extend(("upload", file_name) for file_name in local_files_dict)
+        return operations
+
+    async def sync_files(self):
+        operations = await self.plan()
+        if operations is None:
+            return
+
+        funcs: dict[str, Callable[[str], Awaitable]] = {
+            "upload": self.cloud_drive.upload,
+            "reload": self.cloud_drive.reload,
+            "delete": self.cloud_drive.delete,
+        }
+        messages = {
+            "upload": "Загрузка файла {} в облако",
+            "reload": "Обновление файла {} в облаке",
+            "delete": "Удаление файла {} из облака",
+        }
+        tasks: list[asyncio.Task] = []
+
+        async with asyncio.TaskGroup() as group:
+            for operation, file_name in operations:
+                logger.throttled(operation, messages[operation].format(file_name))
+                tasks.append(
+                    group.create_task(
+                        self.__run_operation(operation, funcs[operation], file_name)
+                    )
+                )
+
+        log_results([task.result() for task in tasks])
+        logger.info("Синхронизация завершена")
+
+    def print_plan(self, verify: bool = False) -> list[tuple[str, str]] | None:
+        # План всегда строится по полному списку файлов в облаке.
+        async def build() -> list[tuple[str, str]] | None:
+            try:
+                return await self.plan()
+            finally:
+                await self.cloud_drive.close()
+
+        operations = asyncio.run(build())
+        if operations is None:
+            return None
+
+        for operation, file_name in operations:
+            print(f"{operation:<8}{file_name}")
+
+        counts = Counter(operation for operation, _ in operations)
+        summary = ", ".join(f"{kind}: {count}" for kind, count in counts.items())
+        print(f"Итого: {summary or 'изменений нет'}")
+        return operations
+
+    def close(self):
+        asyncio.run(self.cloud_drive.close())
+
+    async def run(self):
+        self.running = True
+        self.__loop = asyncio.get_running_loop()
+        self.__stop_event = asyncio.Event()
+
+        try:
+            while self.running:
+                logger.info("Синхронизация запущена")
+                await self.sync_files()
+
+                try:
+                    await asyncio.wait_for(self.__stop_event.wait(), self.delay)
+                except TimeoutError:
+                    pass
+
+        finally:
+            await self.cloud_drive.close()
+
+    def stop_sync(self):
+        logger.info("Синхронизация остановлена")
+        self.running = False
+
+        if self.__loop and self.__stop_event and not self.__loop.is_closed():
+            self.__loop.call_soon_threadsafe(self.__stop_event.set)
+
+    def start_sync(self):
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt:
+            self.stop_sync()
+        finally:
+            logger.complete()
@@ -0,0 +1,195 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from core.log_config import logger
+
+
+@dataclass
+class OperationResult:
+    operation: str
+    file_name: str
+    result: Any = None
+    cancelled: bool = False
+    args: tuple = ()
+    seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return (
+            not self.cancelled
+            and isinstance(self.result, dict)
+            and self.result.get("status") == "Success"
+        )
+
+    @property
+    def pending(self) -> bool:
+        return isinstance(self.result, dict) and self.result.get("status") == "Pending"
+
+
+def log_results(results: list[OperationResult], cancelled: int = 0):
+    failed = [
+        item
+        for item in results
+        if not item.success and not item.cancelled and not item.pending
+    ]
+    cancelled += sum(item.cancelled for item in results)
+    succeeded = sum(item.success for item in results)
+    pending = sum(item.pending for item in results)
+
+    logger.info(
+        f"Операций выполнено: {succeeded}, с ошибкой: {len(failed)}, "
+        f"отменено: {cancelled}"
+        + (f", выполняется в облаке: {pending}" if pending else "")
+    )
+    if failed:
+        logger.summary(
+            "Не выполнены операции",
+            [f"{item.operation} {item.file_name}" for item in failed],
+            "ERROR",
+        )
+    logger.flush_suppressed()
+
+
+class TransferExecutor:
+    """
+    Класс TransferExecutor представляет собой ограниченный пул потоков
+        для параллельного выполнения операций с файлами в облаке.
+    В методе __init__ создается пул из workers потоков.
+    Метод submit ставит операцию в очередь. Операции над одним и тем же
+        файлом выполняются строго в порядке постановки в очередь.
+        Функция on_done вызывается с результатом операции в том же потоке
+        до завершения Future, поэтому к возврату из wait все вызовы
+        on_done уже выполнены (в отличие от Future.add_done_callback).
+    Метод wait дожидается завершения всех операций, логирует итог
+        и возвращает список результатов.
+        Длительность каждой операции сохраняется в OperationResult.seconds.
+    Свойство pending возвращает число незавершенных операций, а атрибут
+        peak_pending - наибольшее их число с последнего вызова reset_peak.
+    Метод cancel отменяет еще не начатые операции.
+    Метод shutdown останавливает пул потоков.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers: int = max(1, workers)
+        self.pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="transfer",
+        )
+        self.cancelled = threading.Event()
+        self.__lock = threading.Lock()
+        self.__futures: list[Future] = []
+        self.__last_by_name: dict[str, Future] = {}
+        self.__pending: int = 0
+        self.peak_pending: int = 0
+
+    def __run(
+        self,
+        previous: Future | None,
+        operation: str,
+        file_name: str,
+        func: Callable,
+        args: tuple,
+        on_done: Callable[[OperationResult], None] | None,
+    ) -> OperationResult:
+        # Пул выбирает задачи в порядке очереди, поэтому предыдущая операция
+        # над тем же файлом уже выполняется или будет выбрана раньше.
+        if previous is not None:
+            wait([previous])
+
+        try:
+            if self.cancelled.is_set():
+                return OperationResult(operation, file_name, cancelled=True, args=args)
+
+            start = time.perf_counter()
+            try:
+                result = func(file_name, *args)
+            except Exception as err:
+                logger.throttled(
+                    "operation_error",
+                    f"Ошибка операции {operation} для файла {file_name}: {err}",
+                    "ERROR",
+                )
+                result = None
+            operation_result = OperationResult(
+                operation,
+                file_name,
+                result,
+                args=args,
+                seconds=time.perf_counter() - start,
+            )
+            if on_done is not None:
+                try:
+                    on_done(operation_result)
+                except Exception as err:
+                    logger.error(
+                        f"Ошибка обработки результата {operation} "
+                        f"для файла {file_name}: {err}"
+                    )
+            return operation_result
+
+        finally:
+            with self.__lock:
+                self.__pending -= 1
+
+    def submit(
+        self,
+        operation: str,
+        func: Callable,
+        file_name: str,
+        *args,
+        on_done: Callable[[OperationResult], None] | None = None,
+    ) -> Future | None:
+        if self.cancelled.is_set():
+            return None
+
+        with self.__lock:
+            previous = self.__last_by_name.get(file_name)
+            future = self.pool.submit(
+                self.__run, previous, operation, file_name, func, args, on_done
+            )
+            self.__last_by_name[file_name] = future
+            self.__futures.append(future)
+            self.__pending += 1
+            self.peak_pending = max(self.peak_pending, self.__pending)
+
+        return future
+
+    def wait(self) -> list[OperationResult]:
+        with self.__lock:
+            futures, self.__futures = self.__futures, []
+            self.__last_by_name = {}
+
+        wait(futures)
+
+        results: list[OperationResult] = [
+            future.result() for future in futures if not future.cancelled()
+        ]
+        log_results(results, len(futures) - len(results))
+
+        return results
+
+    @property
+    def pending(self) -> int:
+        return self.__pending
+
+    def reset_peak(self):
+        with self.__lock:
+            self.peak_pending = self.__pending
+
+    def cancel(self):
+        self.cancelled.set()
+
+        with self.__lock:
+            for future in self.__futures:
+                if future.cancel():
+                    self.__pending -= 1
+
+    def reset(self):
+        self.cancelled.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import threading
+from typing import Iterable
+
+from utils.state import SyncState
+
+
+class HashCache:
+    """
+    Класс HashCache представляет собой кэш хэшей MD5 локальных файлов.
+        Запись действительна, пока у файла не изменились inode, размер
+        и время изменения в наносекундах, поэтому неизмененные файлы
+        повторно не читаются.
+    В методе __init__ загружаются сохраненные хэши из SyncState,
+        если хранилище состояния передано.
+    Метод lookup возвращает хэш из кэша или None.
+    Метод get возвращает хэш файла, вычисляя его потоковым чтением
+        блоками по chunk_size байт, если в кэше его нет. Метод безопасен
+        для вызова из нескольких потоков.
+    Метод flush сохраняет новые хэши в SyncState. Если передан paths -
+        пути файлов текущего сканирования, записи об остальных путях
+        (удаленных или переименованных файлах) удаляются из кэша.
+    """
+
+    def __init__(self, state: SyncState | None = None, chunk_size: int = 1 << 20):
+        self.state: SyncState | None = state
+        self.chunk_size: int = chunk_size
+        self.__lock = threading.Lock()
+        self.__entries: dict[str, tuple[int, int, int, str]] = (
+            state.load_hashes() if state is not None else {}
+        )
+        self.__dirty: set[str] = set()
+
+    def lookup(self, path: str, inode: int, size: int, mtime_ns: int) -> str | None:
+        entry = self.__entries.get(path)
+        if entry is not None and entry[:3] == (inode, size, mtime_ns):
+            return entry[3]
+        return None
+
+    def get(self, path: str) -> str:
+        file_stat = os.stat(path)
+        key = (file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+        md5 = self.lookup(path, *key)
+        if md5 is not None:
+            return md5
+
+        hasher = hashlib.md5()
+        with open(path, "rb") as file:
+            while chunk := file.read(self.chunk_size):
+                hasher.update(chunk)
+        md5 = hasher.hexdigest()
+
+        # Файл мог измениться во время чтения: такой хэш не кэшируется.
+        if os.stat(path).st_mtime_ns == file_stat.st_mtime_ns:
+            with self.__lock:
+                self.__entries[path] = (*key, md5)
+                self.__dirty.add(path)
+
+        return md5
+
+    def flush(self, paths: Iterable[str] | None = None):
+        with self.__lock:
+            stale: set[str] = set()
+            if paths is not None:
+                stale = self.__entries.keys() - set(paths)
+                for path in stale:
+                    del self.__entries[path]
+
+            dirty, self.__dirty = self.__dirty - stale, set()
+            rows = [(path, *self.__entries[path]) for path in dirty]
+
+        if self.state is None:
+            return
+
+        self.state.remove_hashes(stale)
+        self.state.save_hashes(rows)
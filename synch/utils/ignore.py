@@ -0,0 +1,159 @@
+import re
+from dataclasses import dataclass
+
+from core.models import NS_PER_SECOND, FileEntry
+
+
+@dataclass
+class IgnoreRule:
+    pattern: str
+    regex: re.Pattern
+    negate: bool = False
+    dir_only: bool = False
+
+
+def translate(pattern: str) -> str:
+    """
+    Функция translate преобразует шаблон в стиле .gitignore (без "!"
+        и завершающего "/") в регулярное выражение для пути относительно
+        корня папки: "*" и "?" не совпадают с "/", "**" совпадает с любым
+        числом папок. Шаблон без "/" в начале или середине совпадает
+        с именем на любой глубине.
+    """
+
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts: list[str] = []
+    index = 0
+
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            parts.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            parts.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and (end := pattern.find("]", index + 2)) != -1:
+            chars = pattern[index + 1 : end]
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            parts.append(f"[{chars}]")
+            index = end + 1
+        else:
+            if pattern[index] == "\\" and index + 1 < len(pattern):
+                index += 1
+            parts.append(re.escape(pattern[index]))
+            index += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    return f"{prefix}{''.join(parts)}"
+
+
+def load_rules(filename: str) -> list[str]:
+    """
+    Функция load_rules читает шаблоны из файла в формате .gitignore;
+        пустая строка имени файла - без шаблонов.
+    """
+
+    if not filename:
+        return []
+    with open(filename, encoding="utf-8") as file:
+        return file.read().splitlines()
+
+
+class IgnoreRules:
+    """
+    Класс IgnoreRules представляет собой правила исключения файлов
+        из синхронизации в стиле .gitignore: шаблоны patterns проверяются
+        по порядку, и действует последний совпавший; шаблон с "!"
+        в начале возвращает ранее исключенный файл, с "/" в конце -
+        совпадает только с папками, строки с "#" в начале пропускаются.
+        Содержимое исключенной папки не обходится, и вернуть из нее
+        отдельные файлы нельзя, как и в git.
+    Шаблоны компилируются один раз, а общее регулярное выражение всех
+        шаблонов позволяет сразу отбросить большинство не совпадающих
+        имен.
+    Метод match проверяет один элемент (файл или папку при is_dir = True)
+        без учета родительских папок, например при обходе папки.
+    Метод ignores проверяет путь с учетом родительских папок, например
+        для файлов в облаке, чтобы исключенные файлы не удалялись.
+    Метод filtered проверяет ограничения по размеру (больше max_size
+        байт) и возрасту (изменен более max_age секунд назад) файла;
+        0 - без ограничения.
+    """
+
+    def __init__(
+        self,
+        patterns: list[str] | None = None,
+        max_size: int = 0,
+        max_age: float = 0,
+    ):
+        self.rules: list[IgnoreRule] = []
+        for line in patterns or []:
+            pattern = line.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            negate = pattern.startswith("!")
+            pattern = pattern.removeprefix("!")
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if pattern:
+                self.rules.append(
+                    IgnoreRule(line, re.compile(translate(pattern)), negate, dir_only)
+                )
+
+        self.max_size: int = max_size
+        self.max_age: float = max_age
+        self.__any: re.Pattern | None = (
+            re.compile("|".join(f"(?:{rule.regex.pattern})" for rule in self.rules))
+            if self.rules
+            else None
+        )
+        self.__dirs: dict[str, bool] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules) or self.max_size > 0 or self.max_age > 0
+
+    def match(self, name: str, is_dir: bool = False) -> bool:
+        if self.__any is None or self.__any.fullmatch(name) is None:
+            return False
+
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.fullmatch(name):
+                return not rule.negate
+        return False
+
+    def ignores(self, path: str) -> bool:
+        if self.__any is None:
+            return False
+
+        parent, _, _ = path.rpartition("/")
+        if parent and self.__ignores_dir(parent):
+            return True
+        return self.match(path)
+
+    def __ignores_dir(self, path: str) -> bool:
+        ignored = self.__dirs.get(path)
+        if ignored is None:
+            parent, _, _ = path.rpartition("/")
+            ignored = bool(parent and self.__ignores_dir(parent)) or self.match(
+                path, True
+            )
+            self.__dirs[path] = ignored
+        return ignored
+
+    def filtered(self, file: FileEntry, now_ns: int) -> bool:
+        if self.max_size and file.size > self.max_size:
+            return True
+        return bool(
+            self.max_age and file.mtime_ns < now_ns - self.max_age * NS_PER_SECOND
+        )
@@ -0,0 +1,325 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Iterator, Sequence
+
+from core.log_config import logger
+from utils.executor import OperationResult
+
+
+class SyncMetrics:
+    """
+    Класс SyncMetrics представляет собой сборщик метрик циклов синхронизации:
+        время фаз (scan, listing, diff, hash, transfer, state), число
+        и время операций, переданные байты, запросы к API, повторы
+        и пиковую длину очереди операций.
+    Метод begin_cycle начинает новый цикл, counters - текущие значения
+        накопительных счетчиков клиента (запросы, повторы).
+    Метод phase - контекстный менеджер, измеряющий время фазы. Время
+        вложенных фаз не учитывается во внешней, поэтому сумма фаз
+        равна времени цикла.
+    Метод timed_iter учитывает время получения элементов итератора
+        как отдельную фазу, например время ожидания страниц списка
+        файлов в облаке внутри фазы diff.
+    Метод record_operations учитывает результаты операций, sizes - размеры
+        файлов для подсчета переданных байт.
+    Метод end_cycle завершает цикл: пишет в лог итог цикла одной строкой
+        JSON, обновляет накопительные метрики и файл textfile.
+    Метод collect возвращает метрики списком (имя, тип, описание, значения),
+        к меткам значений добавляются labels (например, имя пары папок).
+    Метод render возвращает метрики в текстовом формате Prometheus:
+        собственные либо, если заданы children, метрики children
+        (например, метрики всех пар папок одного процесса).
+    Методы serve и stop запускают и останавливают HTTP-сервер,
+        отдающий метрики по адресу /metrics.
+    """
+
+    def __init__(
+        self,
+        textfile: str | None = None,
+        labels: dict[str, str] | None = None,
+        children: list["SyncMetrics"] | None = None,
+    ):
+        self.textfile: str | None = textfile
+        self.labels: dict[str, str] = dict(labels or {})
+        self.children: list[SyncMetrics] = list(children or [])
+        self.__lock = threading.Lock()
+        self.__stack: list[list] = []
+        self.__server: ThreadingHTTPServer | None = None
+        self.cycle: dict = {}
+        self.last_cycle: dict = {}
+        self.__counters_start: dict[str, int] = {}
+        self.cycles: dict[str, int] = {}
+        self.phase_seconds: dict[str, float] = {}
+        self.operations: dict[tuple[str, str], int] = {}
+        self.operation_seconds: dict[str, float] = {}
+        self.counters: dict[str, int] = {"transferred_bytes": 0}
+
+    def begin_cycle(self, mode: str, counters: dict[str, int] | None = None):
+        self.__counters_start = dict(counters or {})
+        self.cycle = {
+            "mode": mode,
+            "started_at": time.time(),
+            "start": time.perf_counter(),
+            "phases": {},
+            "operations": {},
+            "failed": 0,
+            "transferred_bytes": 0,
+            "queue_peak": 0,
+        }
+
+    def __add_phase(self, name: str, seconds: float):
+        phases = self.cycle.setdefault("phases", {})
+        phases[name] = phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        frame = [name, time.perf_counter(), 0.0]
+        self.__stack.append(frame)
+        try:
+            yield
+        finally:
+            self.__stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self.__add_phase(name, elapsed - frame[2])
+            if self.__stack:
+                self.__stack[-1][2] += elapsed
+
+    def timed_iter(self, iterable: Iterable, name: str) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def record_operations(
+        self,
+        results: list[OperationResult],
+        sizes: dict[str, int] | None = None,
+    ):
+        sizes = sizes or {}
+        operations = self.cycle.setdefault("operations", {})
+
+        with self.__lock:
+            for item in results:
+                status = (
+                    "success"
+                    if item.success
+                    else "cancelled" if item.cancelled else "failed"
+                )
+                key = (item.operation, status)
+                self.operations[key] = self.operations.get(key, 0) + 1
+                self.operation_seconds[item.operation] = (
+                    self.operation_seconds.get(item.operation, 0.0) + item.seconds
+                )
+
+                summary = operations.setdefault(
+                    item.operation, {"count": 0, "seconds": 0.0}
+                )
+                summary["count"] += 1
+                summary["seconds"] += item.seconds
+                if status == "failed":
+                    self.cycle["failed"] = self.cycle.get("failed", 0) + 1
+
+                if item.success and item.operation in ("upload", "reload"):
+                    transferred = max(sizes.get(item.file_name, 0), 0)
+                    self.cycle["transferred_bytes"] = (
+                        self.cycle.get("transferred_bytes", 0) + transferred
+                    )
+                    self.counters["transferred_bytes"] += transferred
+
+    def end_cycle(
+        self,
+        counters: dict[str, int] | None = None,
+        queue_peak: int = 0,
+    ) -> dict:
+        cycle, self.cycle = self.cycle, {}
+        summary = {
+            "mode": cycle.get("mode"),
+            "started_at": round(cycle.get("started_at", time.time()), 3),
+            "seconds": round(time.perf_counter() - cycle.get("start", 0), 6),
+            "phases": {
+                name: round(seconds, 6)
+                for name, seconds in cycle.get("phases", {}).items()
+            },
+            "operations": {
+                name: {"count": item["count"], "seconds": round(item["seconds"], 6)}
+                for name, item in cycle.get("operations", {}).items()
+            },
+            "failed": cycle.get("failed", 0),
+            "transferred_bytes": cycle.get("transferred_bytes", 0),
+            "queue_peak": queue_peak,
+        }
+
+        with self.__lock:
+            for name, value in (counters or {}).items():
+                delta = value - self.__counters_start.get(name, 0)
+                summary[name] = delta
+                self.counters[name] = self.counters.get(name, 0) + delta
+
+            mode = summary["mode"]
+            self.cycles[mode] = self.cycles.get(mode, 0) + 1
+            for name, seconds in summary["phases"].items():
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+            self.last_cycle = summary
+
+        logger.info(json.dumps(summary, ensure_ascii=False))
+        self.write_textfile()
+        return summary
+
+    def collect(self) -> list[tuple[str, str, str, list]]:
+        collected: list[tuple[str, str, str, list]] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list):
+            collected.append(
+                (
+                    name,
+                    kind,
+                    help_text,
+                    [(self.labels | labels, value) for labels, value in samples],
+                )
+            )
+
+        with self.__lock:
+            last = self.last_cycle
+            metric(
+                "synch_cycles_total",
+                "counter",
+                "Число выполненных циклов синхронизации",
+                [({"mode": mode}, count) for mode, count in self.cycles.items()],
+            )
+            metric(
+                "synch_phase_seconds_total",
+                "counter",
+                "Суммарное время фаз синхронизации",
+                [({"phase": name}, v) for name, v in self.phase_seconds.items()],
+            )
+            metric(
+                "synch_operations_total",
+                "counter",
+                "Число операций с файлами в облаке",
+                [
+                    ({"operation": operation, "status": status}, count)
+                    for (operation, status), count in self.operations.items()
+                ],
+            )
+            metric(
+                "synch_operation_seconds_total",
+                "counter",
+                "Суммарное время операций с файлами в облаке",
+                [({"operation": k}, v) for k, v in self.operation_seconds.items()],
+            )
+            for name, value in self.counters.items():
+                metric(
+                    f"synch_{name}_total",
+                    "counter",
+                    f"Накопительный счетчик {name}",
+                    [({}, value)],
+                )
+            if last:
+                metric(
+                    "synch_last_cycle_seconds",
+                    "gauge",
+                    "Длительность последнего цикла синхронизации",
+                    [({"mode": last["mode"]}, last["seconds"])],
+                )
+                metric(
+                    "synch_last_cycle_phase_seconds",
+                    "gauge",
+                    "Время фаз последнего цикла синхронизации",
+                    [({"phase": k}, v) for k, v in last["phases"].items()],
+                )
+                metric(
+                    "synch_last_cycle_timestamp_seconds",
+                    "gauge",
+                    "Время начала последнего цикла синхронизации",
+                    [({}, last["started_at"])],
+                )
+                metric(
+                    "synch_queue_depth_peak",
+                    "gauge",
+                    "Пиковая длина очереди операций в последнем цикле",
+                    [({}, last["queue_peak"])],
+                )
+
+        return collected
+
+    def render(self) -> str:
+        return render_metrics(self.children or [self])
+
+    def write_textfile(self):
+        if not self.textfile:
+            return
+
+        # Файл заменяется атомарно, чтобы сборщик не прочитал его частично.
+        temp_name = f"{self.textfile}.tmp"
+        try:
+            with open(temp_name, "w", encoding="utf-8") as file:
+                file.write(self.render())
+            os.replace(temp_name, self.textfile)
+        except OSError as err:
+            logger.error(f"Ошибка записи метрик в {self.textfile}: {err}")
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.__server = ThreadingHTTPServer((host, port), Handler)
+        self.__server.daemon_threads = True
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        logger.info(f"Метрики доступны по адресу http://{host}:{port}/metrics")
+
+    @property
+    def port(self) -> int | None:
+        return self.__server.server_address[1] if self.__server else None
+
+    def stop(self):
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+
+def render_metrics(sources: Sequence[SyncMetrics]) -> str:
+    """
+    Функция render_metrics объединяет метрики нескольких источников
+        в текстовом формате Prometheus: описание и тип каждой метрики
+        выводятся один раз, а значения различаются метками источников.
+    """
+
+    merged: dict[str, tuple[str, str, list]] = {}
+    for source in sources:
+        for name, kind, help_text, samples in source.collect():
+            merged.setdefault(name, (kind, help_text, []))[2].extend(samples)
+
+    lines: list[str] = []
+    for name, (kind, help_text, samples) in merged.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(
+                f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}"
+            )
+
+    return "\n".join(lines) + "\n"
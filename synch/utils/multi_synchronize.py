@@ -0,0 +1,252 @@
+import heapq
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from cloud_storage.yandex import DiskSessions
+from core.config import config
+from core.log_config import logger
+from utils.metrics import SyncMetrics
+from utils.synchronize import (
+    Synchronizer,
+    create_bandwidth_limiter,
+    create_concurrency,
+    create_retry_policy,
+)
+
+PAIR_NAME = re.compile(r"^[\w.-]+$")
+
+
+@dataclass
+class SyncPair:
+    """
+    Класс SyncPair представляет собой описание пары папок из файла
+        SYNCH_PAIRS_FILE: name - имя пары (используется в логах, метриках
+        и имени файла состояния), local - локальная папка, remote - папка
+        в облаке, token - токен аккаунта (по умолчанию YANDEX_OAUTH_TOKEN),
+        weight - доля пары в общем числе потоков SYNCH_WORKERS,
+        delay, min_delay, max_delay и recursive заменяют SYNCH_DELAY,
+        SYNCH_MIN_DELAY, SYNCH_MAX_DELAY и SYNCH_RECURSIVE; без min_delay
+        и max_delay общие границы расширяются до delay пары.
+    """
+
+    name: str
+    local: str
+    remote: str
+    token: str | None = None
+    weight: float = 1.0
+    delay: int | None = None
+    recursive: bool | None = None
+    min_delay: float | None = None
+    max_delay: float | None = None
+
+
+def load_pairs(filename: str) -> list[SyncPair]:
+    """
+    Функция load_pairs читает список пар папок из JSON-файла filename
+        (список объектов с полями SyncPair). Ошибки в описании пар
+        приводят к ValueError.
+    """
+
+    with open(filename, encoding="utf-8") as file:
+        items = json.load(file)
+
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"{filename}: ожидается непустой список пар папок")
+
+    pairs: list[SyncPair] = []
+    for item in items:
+        try:
+            pair = SyncPair(**item)
+        except TypeError as err:
+            raise ValueError(f"{filename}: неверное описание пары {item}: {err}")
+
+        if not PAIR_NAME.match(pair.name):
+            raise ValueError(f"{filename}: недопустимое имя пары {pair.name!r}")
+        if pair.weight <= 0:
+            raise ValueError(f"{filename}: вес пары {pair.name} должен быть больше 0")
+        pairs.append(pair)
+
+    names = [pair.name for pair in pairs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{filename}: имена пар папок должны быть уникальными")
+    return pairs
+
+
+def split_workers(total: int, weights: list[float]) -> list[int]:
+    """
+    Функция split_workers делит total потоков между парами пропорционально
+        весам weights методом наибольших остатков. Каждая пара получает
+        не менее одного потока, поэтому при числе пар больше total
+        потоков может быть больше total.
+    """
+
+    weight_sum = sum(weights)
+    shares = [total * weight / weight_sum for weight in weights]
+    workers = [max(1, int(share)) for share in shares]
+
+    remainder = max(total - sum(workers), 0)
+    by_fraction = sorted(
+        range(len(weights)),
+        key=lambda index: shares[index] - int(shares[index]),
+        reverse=True,
+    )
+    for index in by_fraction[:remainder]:
+        workers[index] += 1
+    return workers
+
+
+class MultiSynchronizer:
+    """
+    Класс MultiSynchronizer представляет собой синхронизатор нескольких
+        пар папок (возможно, разных аккаунтов) в одном процессе.
+    В методе __init__ для каждой пары SyncPair создается Synchronizer.
+        Пары используют общие пулы соединений DiskSessions (общие политика
+        повторов, ограничения SYNCH_RATE_LIMIT и SYNCH_BANDWIDTH_LIMIT
+        и подстройка числа загрузок), а общее число потоков
+        SYNCH_WORKERS делится между парами пропорционально весам.
+        Метрики пар отдаются одним HTTP-сервером и пишутся в один файл
+        с меткой pair.
+    Метод run_cycle выполняет один цикл синхронизации пары и возвращает
+        интервал до ее следующего цикла.
+    Метод sync_all выполняет по одному циклу для всех пар.
+    Метод print_plan выводит план синхронизации каждой пары.
+    Метод close освобождает ресурсы всех пар и общие пулы соединений.
+    Метод stop_sync останавливает синхронизацию.
+    Метод start_sync запускает общий планировщик: очередь пар упорядочена
+        по времени следующего цикла, циклы разных пар выполняются
+        параллельно в пуле потоков, а интервал каждой пары задается ее
+        AdaptiveScheduler.
+    """
+
+    def __init__(self, pairs: list[SyncPair] | None = None):
+        if pairs is None:
+            pairs = load_pairs(str(config.get("synch_pairs_file", "")))
+
+        workers = int(str(config.get("synch_workers", "4")))
+        shares = split_workers(workers, [pair.weight for pair in pairs])
+        self.sessions = DiskSessions(
+            pool_size=int(str(config.get("synch_pool_size", sum(shares)))),
+            retry_policy=create_retry_policy(),
+            rate_limit=float(str(config.get("synch_rate_limit", "0"))),
+            bandwidth=create_bandwidth_limiter(),
+            concurrency=create_concurrency(sum(shares)),
+        )
+        self.synchronizers: list[Synchronizer] = [
+            Synchronizer(
+                name=pair.name,
+                local_path=pair.local,
+                remote_path=pair.remote,
+                token=pair.token,
+                delay=pair.delay,
+                min_delay=pair.min_delay,
+                max_delay=pair.max_delay,
+                workers=share,
+                recursive=pair.recursive,
+                sessions=self.sessions,
+            )
+            for pair, share in zip(pairs, shares)
+        ]
+        self.metrics = SyncMetrics(
+            config.get("synch_metrics_file") or None,
+            children=[item.metrics for item in self.synchronizers],
+        )
+        self.metrics_port: int = int(str(config.get("synch_metrics_port", "0")))
+        self.metrics_host: str = str(config.get("synch_metrics_host", "127.0.0.1"))
+        self.running: bool = False
+        self.__wakeup = threading.Event()
+        self.__lock = threading.Lock()
+        self.__queue: list[tuple[float, int]] = []
+        logger.info(
+            "Пары папок: "
+            + ", ".join(
+                f"{item.name} ({item.workers} потоков)" for item in self.synchronizers
+            )
+        )
+
+    def run_cycle(self, synchronizer: Synchronizer) -> float:
+        logger.info(f"Синхронизация пары {synchronizer.name} запущена")
+        try:
+            changes = synchronizer.sync_files()
+        except Exception as err:
+            logger.error(f"Ошибка синхронизации пары {synchronizer.name}: {err}")
+            changes = 0
+        self.metrics.write_textfile()
+
+        delay = synchronizer.next_delay(changes)
+        logger.info(
+            f"Следующая синхронизация пары {synchronizer.name} через {delay:.0f} сек."
+        )
+        return delay
+
+    def sync_all(self):
+        with ThreadPoolExecutor(max_workers=len(self.synchronizers)) as pool:
+            list(pool.map(self.run_cycle, self.synchronizers))
+
+    def print_plan(self, verify: bool = False):
+        for synchronizer in self.synchronizers:
+            print(f"Пара {synchronizer.name}:")
+            synchronizer.print_plan(verify)
+
+    def close(self):
+        self.metrics.stop()
+        for synchronizer in self.synchronizers:
+            synchronizer.close()
+        self.sessions.close()
+
+    def __schedule(self, index: int, future: Future):
+        delay = future.result() if not future.cancelled() else 0
+        with self.__lock:
+            heapq.heappush(self.__queue, (time.monotonic() + delay, index))
+        self.__wakeup.set()
+
+    def stop_sync(self):
+        logger.info("Синхронизация остановлена")
+        self.running = False
+        self.__wakeup.set()
+        self.sessions.stop_event.set()
+        for synchronizer in self.synchronizers:
+            synchronizer.stop_sync()
+
+    def start_sync(self):
+        self.running = True
+        self.__wakeup.clear()
+        self.sessions.stop_event.clear()
+        now = time.monotonic()
+        self.__queue = [(now, index) for index in range(len(self.synchronizers))]
+
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_port, self.metrics_host)
+
+        pool = ThreadPoolExecutor(
+            max_workers=len(self.synchronizers), thread_name_prefix="synch-pair"
+        )
+        try:
+            while self.running:
+                with self.__lock:
+                    due: list[int] = []
+                    while self.__queue and self.__queue[0][0] <= time.monotonic():
+                        due.append(heapq.heappop(self.__queue)[1])
+                    timeout = (
+                        self.__queue[0][0] - time.monotonic() if self.__queue else None
+                    )
+                    self.__wakeup.clear()
+
+                for index in due:
+                    future = pool.submit(self.run_cycle, self.synchronizers[index])
+                    future.add_done_callback(
+                        lambda done, index=index: self.__schedule(index, done)
+                    )
+
+                self.__wakeup.wait(timeout)
+
+        except KeyboardInterrupt:
+            self.stop_sync()
+
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.close()
+            logger.complete()
@@ -0,0 +1,270 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from core.models import FileEntry
+from utils.state import FileState, JournalEntry
+
+UPLOAD = "upload"
+RELOAD = "reload"
+DELETE = "delete"
+MOVE = "move"
+COPY = "copy"
+
+# Серверные операции не передают данные и выполняются первыми,
+# удаления - последними.
+PRIORITIES: dict[str, int] = {MOVE: 0, COPY: 0, RELOAD: 1, UPLOAD: 1, DELETE: 2}
+
+HashFiles = Callable[[list[str]], dict[str, str]]
+
+
+@dataclass(slots=True)
+class Operation:
+    """
+    Класс Operation представляет собой одну запланированную операцию
+        с файлом в облаке: kind - тип операции (upload, reload, delete,
+        move, copy), size - размер локального файла, source - исходный
+        файл в облаке для move и copy. Для reload с заданным md5 файл
+        заменяется, только если MD5 локального файла отличается.
+        При missing_ok = True отсутствие файла в облаке при удалении
+        ожидаемо (например, удаление из журнала могло выполниться
+        до сбоя).
+    """
+
+    kind: str
+    file_name: str
+    size: int = 0
+    source: str | None = None
+    md5: str | None = None
+    missing_ok: bool = False
+
+
+@dataclass
+class SyncPlan:
+    """
+    Класс SyncPlan представляет собой результат планирования цикла
+        синхронизации: mode - способ планирования (reconcile - по списку
+        файлов в облаке, state - по сохраненному состоянию), operations -
+        список операций, local_files - снимок локальной папки, verified -
+        файлы, совпадение которых с облаком подтверждено списком файлов
+        в облаке (только для reconcile).
+    Метод counts возвращает число операций каждого типа.
+    """
+
+    mode: str
+    operations: list[Operation] = field(default_factory=list)
+    local_files: dict[str, FileEntry] = field(default_factory=dict)
+    verified: list[FileState] | None = None
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for operation in self.operations:
+            counts[operation.kind] = counts.get(operation.kind, 0) + 1
+        return counts
+
+
+def plan_transfers(
+    uploads: dict[str, FileEntry],
+    deletes: dict[str, tuple[int, str | None]],
+    sources: dict[tuple[int, str], str],
+    upload_kind: str = UPLOAD,
+    hash_files: HashFiles | None = None,
+) -> list[Operation]:
+    """
+    Функция plan_transfers планирует загрузку новых файлов и удаление
+        лишних. Новые файлы, совпадающие по размеру и MD5 с удаляемым
+        файлом, перемещаются в облаке, а совпадающие с оставшимся файлом
+        (sources) - копируются. Хэши вычисляются функцией hash_files только
+        для файлов подходящего размера; без hash_files совпадения
+        не ищутся.
+    """
+
+    moves: dict[tuple[int, str], list[str]] = {}
+    for file_name, (size, md5) in deletes.items():
+        if md5:
+            moves.setdefault((size, md5), []).append(file_name)
+
+    hashes: dict[str, str] = {}
+    if hash_files is not None and (moves or sources):
+        sizes = {size for size, _ in moves} | {size for size, _ in sources}
+        candidates = [name for name, file in uploads.items() if file.size in sizes]
+        if candidates:
+            hashes = hash_files(candidates)
+
+    remaining = dict(deletes)
+    operations: list[Operation] = []
+
+    for file_name, file in uploads.items():
+        key = (file.size, hashes.get(file_name))
+
+        if moves.get(key):
+            from_name = moves[key].pop()
+            remaining.pop(from_name)
+            operations.append(Operation(MOVE, file_name, file.size, from_name))
+
+        elif key in sources:
+            operations.append(Operation(COPY, file_name, file.size, sources[key]))
+
+        else:
+            operations.append(Operation(upload_kind, file_name, file.size))
+
+    operations.extend(
+        Operation(DELETE, file_name, size) for file_name, (size, _) in remaining.items()
+    )
+    return operations
+
+
+def plan_reconcile(
+    local_files: dict[str, FileEntry],
+    remote_files: Iterable[FileEntry],
+    hash_files: HashFiles | None = None,
+) -> SyncPlan:
+    """
+    Функция plan_reconcile планирует синхронизацию по списку файлов
+        в облаке remote_files. Файл, не измененный после загрузки в облако,
+        попадает в verified; измененный файл того же размера с известным
+        MD5 заменяется только при отличии содержимого.
+        Ошибки получения списка файлов в облаке не перехватываются.
+    """
+
+    pending = dict(local_files)
+    operations: list[Operation] = []
+    verified: list[FileState] = []
+    deletes: dict[str, tuple[int, str | None]] = {}
+    sources: dict[tuple[int, str], str] = {}
+
+    for remote_file in remote_files:
+        file_name: str = remote_file.name
+        file = pending.pop(file_name, None)
+
+        if file is None:
+            deletes[file_name] = (remote_file.size, remote_file.md5)
+
+        elif file.mtime_ns <= remote_file.mtime_ns:
+            if remote_file.md5:
+                sources[(file.size, remote_file.md5)] = file_name
+            verified.append(
+                FileState(
+                    file_name,
+                    file.size,
+                    file.mtime_ns,
+                    remote_file.md5,
+                    remote_file.revision,
+                )
+            )
+
+        elif remote_file.md5 and remote_file.size == file.size:
+            # Файл мог быть только "тронут" или скопирован
+            # с сохранением содержимого: решение принимается по MD5.
+            operations.append(
+                Operation(RELOAD, file_name, file.size, md5=remote_file.md5)
+            )
+
+        else:
+            operations.append(Operation(RELOAD, file_name, file.size))
+
+    operations.extend(plan_transfers(pending, deletes, sources, UPLOAD, hash_files))
+    return SyncPlan("reconcile", operations, local_files, verified)
+
+
+def plan_from_state(
+    local_files: dict[str, FileEntry],
+    known_files: dict[str, FileState],
+    hash_files: HashFiles | None = None,
+) -> SyncPlan:
+    """
+    Функция plan_from_state планирует синхронизацию по сохраненному
+        состоянию known_files без обращения к облаку. Отсутствие файла
+        в состоянии не гарантирует его отсутствие в облаке, поэтому новые
+        файлы загружаются с перезаписью (reload).
+    """
+
+    pending: dict[str, FileEntry] = {}
+    operations: list[Operation] = []
+    sources: dict[tuple[int, str], str] = {}
+    deletes: dict[str, tuple[int, str | None]] = {
+        name: (known.size, known.hash)
+        for name, known in known_files.items()
+        if name not in local_files
+    }
+
+    for file_name, file in local_files.items():
+        known = known_files.get(file_name)
+
+        if known is None:
+            pending[file_name] = file
+
+        elif known.size != file.size:
+            operations.append(Operation(RELOAD, file_name, file.size))
+
+        elif known.mtime_ns != file.mtime_ns:
+            operations.append(Operation(RELOAD, file_name, file.size, md5=known.hash))
+
+        elif known.hash:
+            sources[(known.size, known.hash)] = file_name
+
+    operations.extend(plan_transfers(pending, deletes, sources, RELOAD, hash_files))
+    return SyncPlan("state", operations, local_files)
+
+
+def resume_journal(plan: SyncPlan, entries: Iterable[JournalEntry]) -> SyncPlan:
+    """
+    Функция resume_journal дополняет план по сохраненному состоянию
+        невыполненными операциями прерванного цикла из журнала. Операция
+        возобновляется, только если локальный файл не изменился после
+        ее планирования (иначе план по состоянию уже учитывает изменение),
+        а удаление - только если файл так и не появился локально.
+        Загрузка возобновляется с перезаписью: до сбоя файл мог успеть
+        загрузиться.
+    """
+
+    planned: dict[str, int] = {
+        operation.file_name: index for index, operation in enumerate(plan.operations)
+    }
+
+    for entry in entries:
+        index = planned.get(entry.file_name)
+
+        if entry.kind == DELETE:
+            if entry.file_name not in plan.local_files and index is None:
+                plan.operations.append(
+                    Operation(DELETE, entry.file_name, entry.size, missing_ok=True)
+                )
+                planned[entry.file_name] = len(plan.operations) - 1
+            continue
+
+        file = plan.local_files.get(entry.file_name)
+        if file is None or (file.size, file.mtime_ns) != (entry.size, entry.mtime_ns):
+            continue
+
+        if entry.kind in (MOVE, COPY):
+            operation = Operation(entry.kind, entry.file_name, file.size, entry.source)
+        else:
+            operation = Operation(RELOAD, entry.file_name, file.size, md5=entry.md5)
+
+        if index is None:
+            plan.operations.append(operation)
+            planned[entry.file_name] = len(plan.operations) - 1
+        else:
+            plan.operations[index] = operation
+
+    return plan
+
+
+def prioritize(
+    operations: Iterable[Operation],
+    small_first: bool = True,
+) -> list[Operation]:
+    """
+    Функция prioritize упорядочивает операции: сначала перемещения
+        и копирования внутри облака, затем передача файлов (при
+        small_first = True - от меньших к большим, чтобы большинство
+        файлов синхронизировалось быстрее), удаления - в конце.
+        Сортировка устойчивая, порядок равных операций сохраняется.
+    """
+
+    if small_first:
+        return sorted(
+            operations,
+            key=lambda operation: (PRIORITIES[operation.kind], operation.size),
+        )
+    return sorted(operations, key=lambda operation: PRIORITIES[operation.kind])
@@ -0,0 +1,160 @@
+import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from core.log_config import logger
+from core.models import FileEntry
+from utils.ignore import IgnoreRules
+
+
+def get_file_info(local_path: str, name: str) -> FileEntry | None:
+    """
+    Функция get_file_info возвращает FileEntry для одного файла
+        в папке local_path или None, если это не обычный файл.
+    """
+
+    full_path = os.path.join(local_path, name)
+    try:
+        file_stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+
+    return FileEntry.from_stat(name, full_path, file_stat)
+
+
+def scan_dir(
+    local_path: str,
+    relative: str = "",
+    rules: IgnoreRules | None = None,
+    skipped: set[str] | None = None,
+) -> tuple[list[FileEntry], list[str]]:
+    """
+    Функция scan_dir за один проход os.scandir возвращает файлы папки
+        local_path/relative и имена вложенных папок. Имена задаются
+        относительно local_path через "/". Результаты stat берутся
+        из DirEntry, поэтому на каждый файл приходится не более одного
+        системного вызова. Файлы и папки, исключенные правилами rules,
+        пропускаются до вызова stat. Файлы, которые не удалось прочитать
+        (кроме удаленных во время обхода), добавляются в skipped.
+        Ошибка чтения самой папки не перехватывается.
+    """
+
+    files: list[FileEntry] = []
+    dirs: list[str] = []
+
+    with os.scandir(os.path.join(local_path, relative)) as entries:
+        for entry in entries:
+            name = f"{relative}/{entry.name}" if relative else entry.name
+            try:
+                if entry.is_file():
+                    if rules is None or not rules.match(name):
+                        files.append(
+                            FileEntry.from_stat(name, entry.path, entry.stat())
+                        )
+                elif entry.is_dir(follow_symlinks=False):
+                    if rules is None or not rules.match(name, True):
+                        dirs.append(name)
+            except FileNotFoundError:
+                continue
+            except OSError as err:
+                logger.warning(f"Файл {name} пропущен: {err}")
+                if skipped is not None:
+                    skipped.add(name)
+
+    return files, dirs
+
+
+def scan_subdir(
+    local_path: str,
+    relative: str,
+    rules: IgnoreRules | None = None,
+    skipped: set[str] | None = None,
+) -> tuple[list[FileEntry], list[str]]:
+    """
+    Функция scan_subdir сканирует вложенную папку как scan_dir, но при
+        ошибке чтения (нет доступа, папка удалена во время обхода)
+        пропускает ее, логирует ошибку и добавляет папку в skipped:
+        по ее содержимому нельзя судить об удалении файлов.
+    """
+
+    try:
+        return scan_dir(local_path, relative, rules, skipped)
+    except OSError as err:
+        logger.warning(f"Папка {relative} пропущена: {err}")
+        if skipped is not None:
+            skipped.add(relative)
+        return [], []
+
+
+def walk(
+    local_path: str,
+    workers: int = 1,
+    rules: IgnoreRules | None = None,
+    skipped: set[str] | None = None,
+) -> list[FileEntry]:
+    """
+    Функция walk рекурсивно обходит папку local_path. При workers > 1
+        папки сканируются параллельно в пуле потоков, что ускоряет обход
+        сетевых файловых систем с большой задержкой stat. Папки,
+        исключенные правилами rules, не обходятся. Непрочитанные файлы
+        и вложенные папки пропускаются и добавляются в skipped, а ошибка
+        чтения самой папки local_path не перехватывается.
+    """
+
+    files, pending_dirs = scan_dir(local_path, "", rules, skipped)
+
+    if workers <= 1:
+        while pending_dirs:
+            dir_files, dirs = scan_subdir(
+                local_path, pending_dirs.pop(), rules, skipped
+            )
+            files.extend(dir_files)
+            pending_dirs.extend(dirs)
+        return files
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as pool:
+        pending: set[Future] = {
+            pool.submit(scan_subdir, local_path, relative, rules, skipped)
+            for relative in pending_dirs
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dir_files, dirs = future.result()
+                files.extend(dir_files)
+                pending.update(
+                    pool.submit(scan_subdir, local_path, relative, rules, skipped)
+                    for relative in dirs
+                )
+
+    return files
+
+
+def get_local_files_with_mtime(
+    local_path: str,
+    recursive: bool = False,
+    workers: int = 1,
+    rules: IgnoreRules | None = None,
+    skipped: set[str] | None = None,
+) -> list[FileEntry]:
+    """
+    Функция get_local_files_with_mtime возвращает список FileEntry
+        для файлов в папке local_path, при recursive = True - включая
+        вложенные папки. Файлы, исключенные шаблонами rules, пропускаются.
+        Непрочитанные файлы и вложенные папки добавляются в skipped.
+        Если папку local_path прочитать нельзя, ошибка логируется
+        и передается вызывающему: пустой список означал бы удаление
+        всех файлов в облаке.
+    """
+
+    try:
+        if recursive:
+            return walk(local_path, workers, rules, skipped)
+        return scan_dir(local_path, "", rules, skipped)[0]
+
+    except OSError as err:
+        logger.error(f"Ошибка при получении списка файлов {local_path}: {err}")
+        raise
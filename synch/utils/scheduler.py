@@ -0,0 +1,36 @@
+class AdaptiveScheduler:
+    """
+    Класс AdaptiveScheduler представляет собой планировщик интервала
+        между циклами синхронизации: после цикла с изменениями интервал
+        сокращается в speedup раз, после цикла без изменений - растет
+        в backoff раз, оставаясь в пределах от min_delay до max_delay.
+    В методе __init__ задается начальный интервал initial.
+    Метод next_delay возвращает интервал до следующего цикла
+        с учетом того, были ли изменения в прошедшем цикле.
+    """
+
+    def __init__(
+        self,
+        min_delay: float,
+        max_delay: float,
+        initial: float | None = None,
+        speedup: float = 2.0,
+        backoff: float = 1.5,
+    ):
+        self.min_delay: float = min(min_delay, max_delay)
+        self.max_delay: float = max(min_delay, max_delay)
+        self.speedup: float = speedup
+        self.backoff: float = backoff
+        self.interval: float = self.__clamp(
+            initial if initial is not None else self.max_delay
+        )
+
+    def __clamp(self, delay: float) -> float:
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def next_delay(self, changed: bool) -> float:
+        if changed:
+            self.interval = self.__clamp(self.interval / self.speedup)
+        else:
+            self.interval = self.__clamp(self.interval * self.backoff)
+        return self.interval
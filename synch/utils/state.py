@@ -0,0 +1,298 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from core.config import config
+from core.log_config import BASE_DIR
+
+
+@dataclass
+class FileState:
+    name: str
+    size: int
+    mtime_ns: int
+    hash: str | None = None
+    remote_revision: int | None = None
+
+
+@dataclass
+class JournalEntry:
+    """
+    Класс JournalEntry представляет собой незавершенную операцию из журнала
+        цикла синхронизации: kind, file_name, size, source и md5 - как
+        в utils.planner.Operation, mtime_ns - время изменения локального
+        файла на момент планирования.
+    """
+
+    kind: str
+    file_name: str
+    size: int
+    mtime_ns: int
+    source: str | None = None
+    md5: str | None = None
+
+
+class SyncState:
+    """
+    Класс SyncState представляет собой постоянное хранилище состояния
+        синхронизации в базе SQLite: для каждого файла хранятся размер,
+        время изменения (в наносекундах), хэш содержимого и ревизия в облаке
+        на момент последней успешной синхронизации.
+    В методе __init__ открывается (или создается) база по пути db_path.
+    Метод load возвращает словарь {имя файла: FileState}.
+    Метод get возвращает FileState одного файла или None.
+    Метод upsert добавляет или обновляет записи о файлах; ревизия
+        в облаке, не переданная в записи, сохраняется прежней.
+    Метод remove удаляет записи о файлах.
+    Метод replace_all заменяет все записи переданными.
+    Методы load_hashes, save_hashes и remove_hashes читают, записывают
+        и удаляют записи кэша хэшей локальных файлов
+        (см. utils.hashing.HashCache).
+    Методы get_meta и set_meta читают и записывают служебные значения,
+        например время последней сверки с облаком.
+    Методы journal_* ведут журнал операций цикла синхронизации, чтобы
+        после аварийного завершения продолжить прерванный цикл:
+        journal_begin одной транзакцией записывает запланированные
+        операции и, для цикла сверки, подтвержденные облаком файлы
+        verified, и возвращает номер цикла; journal_complete одной
+        транзакцией отмечает операцию seq цикла cycle выполненной
+        и обновляет запись о файле, а операцию другого цикла
+        пропускает; journal_pending возвращает невыполненные (прерванные
+        или завершившиеся ошибкой) операции последнего цикла.
+    Метод close закрывает соединение с базой.
+    Все методы безопасны для вызова из нескольких потоков.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path: str = db_path
+        # Циклы синхронизации пары папок MultiSynchronizer выполняются
+        # по очереди, но в разных потоках пула.
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.__lock = threading.Lock()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                name TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT,
+                remote_revision INTEGER,
+                synced_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT PRIMARY KEY,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                md5 TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                source TEXT,
+                md5 TEXT,
+                done INTEGER NOT NULL DEFAULT 0,
+                cycle INTEGER NOT NULL DEFAULT 0
+            );
+            """)
+        columns = [
+            row[1] for row in self.connection.execute("PRAGMA table_info(journal)")
+        ]
+        if "cycle" not in columns:
+            with self.connection:
+                self.connection.execute(
+                    "ALTER TABLE journal ADD COLUMN cycle INTEGER NOT NULL DEFAULT 0"
+                )
+
+    def load(self) -> dict[str, FileState]:
+        with self.__lock:
+            cursor = self.connection.execute(
+                "SELECT name, size, mtime_ns, hash, remote_revision FROM files"
+            )
+            return {row[0]: FileState(*row) for row in cursor}
+
+    def get(self, name: str) -> FileState | None:
+        with self.__lock:
+            row = self.connection.execute(
+                "SELECT name, size, mtime_ns, hash, remote_revision FROM files "
+                "WHERE name = ?",
+                (name,),
+            ).fetchone()
+        return FileState(*row) if row else None
+
+    def is_empty(self) -> bool:
+        with self.__lock:
+            row = self.connection.execute("SELECT 1 FROM files LIMIT 1").fetchone()
+        return row is None
+
+    def __insert(self, files: Iterable[FileState]):
+        now = time.time()
+        self.connection.executemany(
+            "INSERT INTO files "
+            "(name, size, mtime_ns, hash, remote_revision, synced_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET "
+            "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+            "hash = excluded.hash, "
+            "remote_revision = COALESCE(excluded.remote_revision, remote_revision), "
+            "synced_at = excluded.synced_at",
+            (
+                (
+                    item.name,
+                    item.size,
+                    item.mtime_ns,
+                    item.hash,
+                    item.remote_revision,
+                    now,
+                )
+                for item in files
+            ),
+        )
+
+    def upsert(self, files: Iterable[FileState]):
+        with self.__lock, self.connection:
+            self.__insert(files)
+
+    def remove(self, names: Iterable[str]):
+        with self.__lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM files WHERE name = ?", ((name,) for name in names)
+            )
+
+    def replace_all(self, files: Iterable[FileState]):
+        with self.__lock, self.connection:
+            self.connection.execute("DELETE FROM files")
+            self.__insert(files)
+
+    def load_hashes(self) -> dict[str, tuple[int, int, int, str]]:
+        with self.__lock:
+            cursor = self.connection.execute(
+                "SELECT path, inode, size, mtime_ns, md5 FROM hashes"
+            )
+            return {row[0]: row[1:] for row in cursor}
+
+    def save_hashes(self, rows: list[tuple[str, int, int, int, str]]):
+        with self.__lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes (path, inode, size, mtime_ns, md5) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def remove_hashes(self, paths: Iterable[str]):
+        with self.__lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM hashes WHERE path = ?",
+                ((path,) for path in paths),
+            )
+
+    def get_meta(self, key: str, default: str | None = None) -> str | None:
+        with self.__lock:
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str):
+        with self.__lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def journal_begin(
+        self,
+        entries: Iterable[JournalEntry],
+        verified: Iterable[FileState] | None = None,
+    ) -> int:
+        with self.__lock, self.connection:
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE key = 'journal_cycle'"
+            ).fetchone()
+            cycle = int(row[0]) + 1 if row else 1
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                ("journal_cycle", str(cycle)),
+            )
+            self.connection.execute("DELETE FROM journal")
+            self.connection.executemany(
+                "INSERT INTO journal "
+                "(seq, kind, name, size, mtime_ns, source, md5, cycle) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        seq,
+                        item.kind,
+                        item.file_name,
+                        item.size,
+                        item.mtime_ns,
+                        item.source,
+                        item.md5,
+                        cycle,
+                    )
+                    for seq, item in enumerate(entries)
+                ),
+            )
+            if verified is not None:
+                self.connection.execute("DELETE FROM files")
+                self.__insert(verified)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    ("verified_at", str(time.time())),
+                )
+        return cycle
+
+    def journal_complete(
+        self,
+        cycle: int,
+        seq: int,
+        file: FileState | None = None,
+        removed: Iterable[str] = (),
+    ):
+        with self.__lock, self.connection:
+            # Операция завершившегося цикла не должна отмечать выполненной
+            # операцию с тем же номером в журнале нового цикла.
+            cursor = self.connection.execute(
+                "UPDATE journal SET done = 1 WHERE seq = ? AND cycle = ?",
+                (seq, cycle),
+            )
+            if cursor.rowcount == 0:
+                return
+            if file is not None:
+                self.__insert([file])
+            self.connection.executemany(
+                "DELETE FROM files WHERE name = ?", ((name,) for name in removed)
+            )
+
+    def journal_pending(self) -> list[JournalEntry]:
+        with self.__lock:
+            cursor = self.connection.execute(
+                "SELECT kind, name, size, mtime_ns, source, md5 FROM journal "
+                "WHERE done = 0 ORDER BY seq"
+            )
+            return [JournalEntry(*row) for row in cursor]
+
+    def close(self):
+        with self.__lock:
+            self.connection.close()
+
+
+def get_state_filename(name: str = "") -> str:
+    state_path = config.get("path_local_state") or config.get("path_local_log", "")
+    dirname = f"{BASE_DIR}{state_path}"
+
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    return f"{dirname}/state_{name}.sqlite3" if name else f"{dirname}/state.sqlite3"
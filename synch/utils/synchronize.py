@@ -1,143 +1,841 @@
-from datetime import datetime
 import os
+import threading
 import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Callable
 
-from cloud_storage import YandexDiskClient
+from requests import RequestException
+
+from cloud_storage import LocalDirectoryBackend, StorageBackend, YandexDiskClient
+from cloud_storage.yandex import STATUS_CHANGED, DiskSessions
+from cloud_storage.retry import NETWORK, SERVER, THROTTLE, RetryPolicy
+from cloud_storage.throttle import (
+    AdaptiveConcurrency,
+    BandwidthLimiter,
+    parse_schedule,
+)
 from core.config import config
 from core.log_config import logger
+from core.models import NS_PER_SECOND, FileEntry
+from utils.executor import OperationResult, TransferExecutor
+from utils.hashing import HashCache
+from utils.ignore import IgnoreRules, load_rules
+from utils.metrics import SyncMetrics
+from utils.planner import (
+    COPY,
+    DELETE,
+    MOVE,
+    RELOAD,
+    UPLOAD,
+    Operation,
+    SyncPlan,
+    plan_from_state,
+    plan_reconcile,
+    prioritize,
+    resume_journal,
+)
+from utils.scheduler import AdaptiveScheduler
+from utils.scanner import get_file_info, get_local_files_with_mtime
+from utils.state import FileState, JournalEntry, SyncState, get_state_filename
+from utils.watcher import CHANGED, DELETED, InotifyWatcher
+
+# Прогресс загрузки пишется в лог только для файлов не меньше этого размера.
+PROGRESS_LOG_SIZE = 64 << 20
+
+
+def create_bandwidth_limiter() -> BandwidthLimiter | None:
+    rate = float(str(config.get("synch_bandwidth_limit", "0")))
+    schedule = parse_schedule(str(config.get("synch_bandwidth_schedule", "")))
+    if rate <= 0 and not schedule:
+        return None
+    return BandwidthLimiter(rate, schedule)
+
+
+def create_ignore_rules() -> IgnoreRules:
+    return IgnoreRules(
+        load_rules(str(config.get("synch_ignore_file", "")))
+        + str(config.get("synch_ignore", "")).split(","),
+        max_size=int(str(config.get("synch_max_file_size", "0"))),
+        max_age=float(str(config.get("synch_max_file_age", "0"))),
+    )
+
+
+def create_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        budgets={
+            THROTTLE: int(str(config.get("synch_retry_throttle", "8"))),
+            SERVER: int(str(config.get("synch_retry_server", "3"))),
+            NETWORK: int(str(config.get("synch_retry_network", "3"))),
+        },
+        base_delay=float(str(config.get("synch_retry_base_delay", "0.5"))),
+        max_delay=float(str(config.get("synch_retry_max_delay", "30"))),
+    )
+
+
+def create_concurrency(workers: int) -> AdaptiveConcurrency | None:
+    if str(config.get("synch_adaptive_workers", "false")).lower() != "true":
+        return None
+    return AdaptiveConcurrency(
+        min_limit=int(str(config.get("synch_min_workers", "1"))),
+        max_limit=workers,
+        tolerance=float(str(config.get("synch_latency_tolerance", "2"))),
+    )
 
 
 class Synchronizer:
     """
     Класс Synchronizer представляет собой синхронизатор файлов
-        между локальной папкой и облаком.
-    В методе __init__ инициализируются переменные,
-        такие как local_path, remote_path, cloud_token и delay.
-        Также создается экземпляр класса YandexClient.
-    Метод __get_mtime_iso8601 возвращает время последнего изменения файла
-        в формате ISO 8601.
-    Метод __get_local_files_with_mtime возвращает список словарей,
-        где каждый словарь содержит информацию о файле в локальной папке.
-    Метод __find_name_in_remote_files ищет файл с заданным именем
-        в списке файлов в облаке.
-    Метод __remove_remote_file_by_name удаляет файл с заданным именем
-        из списка файлов в облаке.
-    Метод sync_files синхронизирует файлы между локальной папкой и облаком.
-    Метод stop_sync останавливает синхронизацию.
-    Метод start_sync запускает синхронизацию.
+        между локальной папкой и облаком: план строится по сохраненному
+        состоянию SyncState или по списку файлов в облаке и выполняется
+        пулом потоков TransferExecutor.
+    Метод sync_files выполняет один цикл синхронизации, метод start_sync
+        запускает синхронизацию периодически или по событиям inotify.
     """
 
-    def __init__(self):
-        self.local_path: str = str(config.get("path_local_folder", ""))
-        self.remote_path: str = str(config.get("path_cloud_folder", ""))
-        self.cloud_token: str = str(config.get("yandex_oauth_token", ""))
-        self.delay: int = int(str(config.get("synch_delay", "30")))
+    def __init__(
+        self,
+        name: str = "",
+        local_path: str | None = None,
+        remote_path: str | None = None,
+        token: str | None = None,
+        delay: int | None = None,
+        workers: int | None = None,
+        recursive: bool | None = None,
+        sessions: DiskSessions | None = None,
+        backend: StorageBackend | None = None,
+        state_mode: str | None = None,
+        state_path: str | None = None,
+        stable_period: float | None = None,
+        min_delay: float | None = None,
+        max_delay: float | None = None,
+    ):
+        self.name: str = name
+        self.local_path: str = (
+            local_path
+            if local_path is not None
+            else str(config.get("path_local_folder", ""))
+        )
+        self.remote_path: str = (
+            remote_path
+            if remote_path is not None
+            else str(config.get("path_cloud_folder", ""))
+        )
+        self.cloud_token: str = (
+            token if token is not None else str(config.get("yandex_oauth_token", ""))
+        )
+        self.delay: int = (
+            delay if delay is not None else int(str(config.get("synch_delay", "30")))
+        )
+        self.workers: int = (
+            workers
+            if workers is not None
+            else int(str(config.get("synch_workers", "4")))
+        )
+        self.pool_size: int = int(str(config.get("synch_pool_size", self.workers)))
+        self.timeout: float = float(str(config.get("synch_timeout", "10")))
+        self.upload_timeout: float = float(
+            str(config.get("synch_upload_timeout", "60"))
+        )
+        self.recursive: bool = (
+            recursive
+            if recursive is not None
+            else str(config.get("synch_recursive", "false")).lower() == "true"
+        )
+        self.scan_workers: int = int(str(config.get("synch_scan_workers", "1")))
+        self.watch: bool = str(config.get("synch_watch", "false")).lower() == "true"
+        self.reconcile_delay: int = int(
+            str(config.get("synch_reconcile_delay", "3600"))
+        )
+        self.watch_quiet: float = float(str(config.get("synch_watch_quiet", "0.2")))
+        self.verify_delay: int = int(str(config.get("synch_verify_delay", "3600")))
+        self.small_first: bool = (
+            str(config.get("synch_small_first", "true")).lower() == "true"
+        )
+        # Границы SYNCH_MIN_DELAY и SYNCH_MAX_DELAY расширяются до
+        # заданного параметром delay интервала, иначе он был бы обрезан.
+        if min_delay is None:
+            min_delay = float(str(config.get("synch_min_delay", self.delay)))
+            if delay is not None:
+                min_delay = min(min_delay, delay)
+        if max_delay is None:
+            max_delay = float(str(config.get("synch_max_delay", self.delay)))
+            if delay is not None:
+                max_delay = max(max_delay, delay)
+        self.scheduler = AdaptiveScheduler(
+            min_delay=min_delay, max_delay=max_delay, initial=self.delay
+        )
+        self.stable_period: float = (
+            stable_period
+            if stable_period is not None
+            else float(str(config.get("synch_stable_period", "0")))
+        )
+        self.deferred: set[str] = set()
+        self.requeued: set[str] = set()
+        self.ignore = create_ignore_rules()
+        self.filtered: set[str] = set()
+        self.unreadable: set[str] = set()
+        self.__operations: dict[str, tuple[int, Operation]] = {}
+        self.__cycle: int = 0
+        self.__progress: dict[str, int] = {}
+        self.__wakeup = threading.Event()
+        self.state: SyncState | None = None
+        if state_mode is None:
+            state_mode = str(config.get("synch_state", "true")).lower()
+        if state_mode == "true":
+            self.state = SyncState(state_path or get_state_filename(name))
+        elif state_mode == "memory":
+            self.state = SyncState(":memory:")
+        self.hash_cache = HashCache(self.state)
+        if name:
+            self.metrics = SyncMetrics(labels={"pair": name})
+            self.metrics_port: int = 0
+        else:
+            self.metrics = SyncMetrics(config.get("synch_metrics_file") or None)
+            self.metrics_port = int(str(config.get("synch_metrics_port", "0")))
+        self.metrics_host: str = str(config.get("synch_metrics_host", "127.0.0.1"))
         self.running: bool = False
-        self.cloud_drive = YandexDiskClient(
+        self.executor = TransferExecutor(workers=self.workers)
+        self.cloud_drive: StorageBackend = backend or self.__create_backend(sessions)
+        logger.info(f"{name + ' ' if name else ''}remote_path: {self.remote_path}")
+
+    def __create_backend(self, sessions: DiskSessions | None) -> StorageBackend:
+        if str(config.get("synch_backend", "yandex")) == "local":
+            return LocalDirectoryBackend(
+                self.local_path, self.remote_path, self.recursive, self.scan_workers
+            )
+
+        return YandexDiskClient(
             local_folder=self.local_path,
             remote_folder=self.remote_path,
             token=self.cloud_token,
+            pool_size=self.pool_size,
+            timeout=self.timeout,
+            upload_timeout=self.upload_timeout,
+            page_size=int(str(config.get("synch_page_size", "1000"))),
+            listing_workers=int(str(config.get("synch_listing_workers", "1"))),
+            recursive=self.recursive,
+            api_host=config.get("yandex_api_host") or None,
+            retry_policy=create_retry_policy(),
+            rate_limit=float(str(config.get("synch_rate_limit", "0"))),
+            sessions=sessions,
+            prefetch_urls=int(str(config.get("synch_prefetch_urls", "0"))),
+            url_ttl=float(str(config.get("synch_upload_url_ttl", "300"))),
+            chunk_size=int(str(config.get("synch_upload_chunk_size", 1 << 20))),
+            stall_timeout=float(str(config.get("synch_upload_stall_timeout", "0"))),
+            progress=self.__report_progress,
+            bandwidth=create_bandwidth_limiter(),
+            concurrency=create_concurrency(self.workers),
+            async_delete=(
+                str(config.get("synch_async_delete", "false")).lower() == "true"
+            ),
+            poll_interval=float(str(config.get("synch_operation_poll", "1"))),
+            operation_timeout=float(str(config.get("synch_operation_timeout", "300"))),
+            # stop_sync прерывает ожидание перед повтором запроса.
+            stop_event=self.executor.cancelled,
         )
-        logger.info(f"remote_path: {self.remote_path}")
 
-    def __get_mtime_iso8601(self, file_name: str) -> str:
-        # 2014-04-22T10:32:49+04:00
+    def __get_local_files_with_mtime(self) -> list[FileEntry]:
+        with self.metrics.phase("scan"):
+            self.unreadable = set()
+            files = get_local_files_with_mtime(
+                self.local_path,
+                self.recursive,
+                self.scan_workers,
+                self.ignore,
+                self.unreadable,
+            )
+            if not self.ignore.max_size and not self.ignore.max_age:
+                return files
 
-        full_path = os.path.join(self.local_path, file_name)
-        mtime_struct = time.gmtime(os.path.getmtime(full_path))
+            now = time.time_ns()
+            self.filtered = {
+                file.name for file in files if self.ignore.filtered(file, now)
+            }
+            return [file for file in files if file.name not in self.filtered]
+
+    def __excluded(self, file_name: str) -> bool:
+        if file_name in self.filtered or self.ignore.ignores(file_name):
+            return True
+        return bool(self.unreadable) and any(
+            file_name == path or file_name.startswith(f"{path}/")
+            for path in self.unreadable
+        )
 
-        return time.strftime("%Y-%m-%dT%H:%M:%S%z", mtime_struct)
+    def __report_progress(self, file_name: str, sent: int, total: int, seconds: float):
+        if total < PROGRESS_LOG_SIZE:
+            return
+
+        step = sent * 10 // total
+        if sent >= total:
+            self.__progress.pop(file_name, None)
+        elif step == self.__progress.get(file_name, 0):
+            return
+        else:
+            self.__progress[file_name] = step
+
+        speed = sent / max(seconds, 1e-6) / (1 << 20)
+        logger.throttled(
+            "progress",
+            f"Загрузка файла {file_name}: {sent * 100 // total}% ({speed:.1f} МБ/с)",
+        )
+
+    def __counters(self) -> dict[str, int]:
+        return {
+            "api_calls": self.cloud_drive.api_calls,
+            "retries": self.cloud_drive.retries,
+            "prefetch_hits": self.cloud_drive.prefetch_hits,
+            "inconsistencies": self.cloud_drive.inconsistencies,
+        }
+
+    def __wait(self, local_files: dict[str, FileEntry]) -> list[OperationResult]:
+        with self.metrics.phase("transfer"):
+            results = self.executor.wait()
+            self.__confirm_operations(results, local_files)
+
+        self.metrics.record_operations(
+            results,
+            {
+                item.file_name: local_files[item.file_name].size
+                for item in results
+                if item.file_name in local_files
+            },
+        )
+        return results
+
+    def __confirm_operations(
+        self,
+        results: list[OperationResult],
+        local_files: dict[str, FileEntry],
+    ):
+        pending = {
+            item.file_name: item.result["href"] for item in results if item.pending
+        }
+        journal, self.__operations = self.__operations, {}
+        if not pending:
+            return
+
+        logger.info(f"Ожидание завершения операций в облаке: {len(pending)}")
+        confirmed = self.cloud_drive.wait_operations(pending)
+
+        failed: list[str] = []
+        for item in results:
+            if not item.pending:
+                continue
+            if not confirmed.get(item.file_name):
+                item.result = None
+                failed.append(item.file_name)
+                continue
+
+            item.result = {"status": "Success"}
+            if self.state is not None and item.file_name in journal:
+                seq, operation = journal[item.file_name]
+                self.__journal_complete(self.__cycle, seq, operation, local_files, item)
+
+        if failed:
+            logger.summary(
+                "Операция не подтверждена облаком, будет повторена", failed, "WARNING"
+            )
+
+    def __verify_due(self) -> bool:
+        if self.state is None or self.state.is_empty():
+            return True
+
+        verified_at = float(self.state.get_meta("verified_at", "0"))
+        return time.time() - verified_at >= self.verify_delay
+
+    def __file_hash(self, file: FileEntry) -> str | None:
+        # Хэш загруженного файла, не вычисленный при планировании,
+        # вычисляется один раз после успешной загрузки.
+        key = (file.path, file.inode, file.size, file.mtime_ns)
+        md5 = self.hash_cache.lookup(*key)
+        if md5 is not None:
+            return md5
 
-    def __get_local_files_with_mtime(self) -> list[dict]:
         try:
-            list_dir = os.listdir(self.local_path)
-            return [
-                {
-                    "name": item,
-                    "modified": self.__get_mtime_iso8601(item),
-                    "path": os.path.join(self.local_path, item),
-                    "type": "file",
-                }
-                for item in list_dir
-                if os.path.isfile(os.path.join(self.local_path, item))
-            ]
+            self.hash_cache.get(file.path)
+        except OSError:
+            return None
+        # Файл, измененный после сканирования, получит хэш в следующем цикле.
+        return self.hash_cache.lookup(*key)
+
+    def __reload_if_changed(self, file_name: str, md5: str | None) -> dict | None:
+        try:
+            local_md5 = self.hash_cache.get(os.path.join(self.local_path, file_name))
+        except OSError as err:
+            logger.throttled(
+                "read_error", f"Ошибка чтения файла {file_name}: {err}", "ERROR"
+            )
+            return None
+
+        if local_md5 == md5:
+            logger.throttled("unchanged", f"Содержимое файла {file_name} не изменилось")
+            return {"status": "Success"}
+
+        logger.throttled(RELOAD, f"Обновление файла {file_name} в облаке")
+        return self.cloud_drive.reload(file_name)
+
+    def __hash_local_files(self, names: list[str]) -> dict[str, str]:
+        def get_hash(file_name: str) -> str | None:
+            try:
+                return self.hash_cache.get(os.path.join(self.local_path, file_name))
+            except OSError:
+                return None
+
+        hashes = zip(names, self.executor.pool.map(get_hash, names))
+        return {file_name: md5 for file_name, md5 in hashes if md5}
+
+    def __hash_candidates(self, names: list[str]) -> dict[str, str]:
+        with self.metrics.phase("hash"):
+            return self.__hash_local_files(names)
+
+    def __submit(
+        self,
+        operation: Operation,
+        on_done: Callable[[OperationResult], None] | None = None,
+    ) -> Future | None:
+        file_name = operation.file_name
+
+        if operation.kind == MOVE:
+            logger.throttled(
+                MOVE, f"Перемещение файла {operation.source} в {file_name} в облаке"
+            )
+            return self.executor.submit(
+                MOVE,
+                self.cloud_drive.move,
+                file_name,
+                operation.source,
+                on_done=on_done,
+            )
 
-        except FileNotFoundError as err:
-            logger.error(f"Путь {self.local_path} не найден: {err}")
+        elif operation.kind == COPY:
+            logger.throttled(
+                COPY, f"Копирование файла {operation.source} в {file_name} в облаке"
+            )
+            return self.executor.submit(
+                COPY,
+                self.cloud_drive.copy,
+                file_name,
+                operation.source,
+                on_done=on_done,
+            )
 
-        except Exception as e:
-            logger.error(f"Ошибка при получении списка файлов: {e}")
+        elif operation.kind == RELOAD and operation.md5:
+            return self.executor.submit(
+                RELOAD,
+                self.__reload_if_changed,
+                file_name,
+                operation.md5,
+                on_done=on_done,
+            )
 
-        return []
+        elif operation.kind == RELOAD:
+            logger.throttled(RELOAD, f"Обновление файла {file_name} в облаке")
+            return self.executor.submit(
+                RELOAD, self.cloud_drive.reload, file_name, on_done=on_done
+            )
 
-    @staticmethod
-    def __find_name_in_remote_files(
-        name: str,
-        remote_files: list[dict],
-    ) -> dict | None:
-        return next((item for item in remote_files if item.get("name") == name), None)
+        elif operation.kind == UPLOAD:
+            logger.throttled(UPLOAD, f"Загрузка файла {file_name} в облако")
+            return self.executor.submit(
+                UPLOAD, self.cloud_drive.upload, file_name, on_done=on_done
+            )
 
-    def sync_files(self):
+        elif operation.kind == DELETE:
+            logger.throttled(DELETE, f"Удаление файла {file_name} из облака")
+            return self.executor.submit(
+                DELETE,
+                self.cloud_drive.delete,
+                file_name,
+                operation.missing_ok,
+                on_done=on_done,
+            )
 
-        local_files: list[dict] = self.__get_local_files_with_mtime()
+    def plan(self, verify: bool = False) -> SyncPlan | None:
+        # Без списка локальных файлов нельзя отличить удаленные файлы
+        # от недоступных, поэтому цикл пропускается.
+        try:
+            if not verify and not self.__verify_due():
+                return self.__plan_from_state()
+            return self.__plan_reconcile()
+        except OSError as err:
+            logger.error(f"Локальная папка недоступна, цикл пропущен: {err}")
+            return None
+
+    def __plan_from_state(self) -> SyncPlan:
+        local_files: dict[str, FileEntry] = {
+            file.name: file for file in self.__get_local_files_with_mtime()
+        }
+        with self.metrics.phase("state"):
+            known_files: dict[str, FileState] = {
+                name: file
+                for name, file in self.state.load().items()
+                if not self.__excluded(name)
+            }
         logger.info(
-            "Локальные файлы для синхронизации: "
-            f"{[item["name"] for item in local_files]}"
+            f"Локальных файлов: {len(local_files)}, "
+            f"в сохраненном состоянии: {len(known_files)}"
+        )
+
+        with self.metrics.phase("diff"):
+            plan = plan_from_state(local_files, known_files, self.__hash_candidates)
+
+        pending = [
+            entry
+            for entry in self.state.journal_pending()
+            if not self.__excluded(entry.file_name)
+        ]
+        if pending:
+            logger.info(f"Невыполненных операций прошлого цикла: {len(pending)}")
+            resume_journal(plan, pending)
+        return plan
+
+    def __plan_reconcile(self) -> SyncPlan | None:
+        local_files: dict[str, FileEntry] = {
+            file.name: file for file in self.__get_local_files_with_mtime()
+        }
+        logger.summary("Локальные файлы для синхронизации", list(local_files))
+
+        # Список файлов в облаке разбирается постранично по мере получения,
+        # а операции выполняются только после получения полного списка,
+        # чтобы прерванный список не привел к повторной загрузке уже
+        # имеющихся в облаке файлов и чтобы переименования можно было
+        # выполнить перемещением.
+        try:
+            with self.metrics.phase("diff"):
+                plan = plan_reconcile(
+                    local_files,
+                    (
+                        file
+                        for file in self.metrics.timed_iter(
+                            self.cloud_drive.iter_info(), "listing"
+                        )
+                        if not self.__excluded(file.name)
+                    ),
+                    self.__hash_candidates,
+                )
+        except (RequestException, OSError, KeyError, ValueError, TypeError) as err:
+            logger.error(f"данные из облака не получены: {err}")
+            return None
+
+        logger.info(f"Подтверждено файлов в облаке: {len(plan.verified)}")
+        return plan
+
+    def __defer_unstable(self, plan: SyncPlan) -> list[Operation]:
+        # Файл, измененный менее stable_period секунд назад, может еще
+        # записываться: его передача откладывается до следующего цикла.
+        if self.stable_period <= 0:
+            self.deferred = set()
+            return plan.operations
+
+        threshold = time.time_ns() - int(self.stable_period * NS_PER_SECOND)
+        self.deferred = {
+            operation.file_name
+            for operation in plan.operations
+            if operation.kind != DELETE
+            and (file := plan.local_files.get(operation.file_name)) is not None
+            and file.mtime_ns > threshold
+        }
+        if not self.deferred:
+            return plan.operations
+
+        logger.summary(
+            "Файлы еще изменяются, синхронизация отложена", sorted(self.deferred)
+        )
+        return [
+            operation
+            for operation in plan.operations
+            if operation.file_name not in self.deferred
+        ]
+
+    def execute(self, plan: SyncPlan) -> list[OperationResult]:
+        # Файлы, изменившиеся во время загрузки в прошлом цикле,
+        # загружаются повторно, даже если список файлов в облаке
+        # считает их актуальными.
+        requeued, self.requeued = self.requeued, set()
+        planned = {operation.file_name for operation in plan.operations}
+        plan.operations.extend(
+            Operation(RELOAD, file_name, plan.local_files[file_name].size)
+            for file_name in requeued - planned
+            if file_name in plan.local_files
         )
 
-        remote_files: list[dict] = self.cloud_drive.get_info()
+        counts = ", ".join(f"{kind}: {count}" for kind, count in plan.counts().items())
+        logger.info(f"План синхронизации: {counts or 'изменений нет'}")
 
-        if remote_files is None:
-            logger.error("данные из облака не получены")
+        operations = prioritize(self.__defer_unstable(plan), self.small_first)
+        # URL для загрузки запрашиваются заранее в порядке очереди;
+        # для reload с MD5 передача может не понадобиться.
+        self.cloud_drive.prefetch_upload_urls(
+            [
+                (operation.file_name, operation.kind == RELOAD)
+                for operation in operations
+                if operation.kind == UPLOAD
+                or (operation.kind == RELOAD and not operation.md5)
+            ]
+        )
+        inconsistencies = self.cloud_drive.inconsistencies
+        self.__journal_begin(plan, operations)
+        self.__operations = {
+            operation.file_name: (seq, operation)
+            for seq, operation in enumerate(operations)
+        }
+        for seq, operation in enumerate(operations):
+            self.__submit(
+                operation,
+                (
+                    partial(
+                        self.__journal_complete,
+                        self.__cycle,
+                        seq,
+                        operation,
+                        plan.local_files,
+                    )
+                    if self.state is not None
+                    else None
+                ),
+            )
+
+        results = self.__wait(plan.local_files)
+        self.cloud_drive.clear_prefetch()
+
+        changed = [
+            item.file_name
+            for item in results
+            if isinstance(item.result, dict)
+            and item.result.get("status") == STATUS_CHANGED
+        ]
+        if changed:
+            logger.summary(
+                "Файлы изменились во время загрузки, загрузка будет повторена",
+                changed,
+                "WARNING",
+            )
+            self.requeued.update(changed)
+            self.deferred.update(changed)
+
+        # Записи о файлах обновляются журналом по мере выполнения операций
+        # (см. __journal_complete), здесь сохраняются только хэши.
+        with self.metrics.phase("state"):
+            self.hash_cache.flush(file.path for file in plan.local_files.values())
+        if self.cloud_drive.inconsistencies > inconsistencies:
+            self.__invalidate_state()
+        return results
+
+    def __invalidate_state(self):
+        # Облако изменено не через этот процесс: сохраненный снимок
+        # больше не описывает облако и сверяется в следующем цикле.
+        if self.state is None:
             return
+        self.state.set_meta("verified_at", "0")
+        logger.warning(
+            "Облако расходится с сохраненным состоянием, "
+            "при следующей синхронизации будет выполнена полная сверка"
+        )
 
-        logger.info(
-            f"Имеющиеся файлы в облаке: {[item["name"] for item in remote_files]}"
+    def __journal_begin(self, plan: SyncPlan, operations: list[Operation]):
+        if self.state is None:
+            return
+
+        # Подтвержденные облаком файлы сохраняются вместе с журналом
+        # до начала операций: после сбоя состояние и журнал вместе
+        # описывают облако, и повторная полная сверка не нужна.
+        entries: list[JournalEntry] = []
+        for operation in operations:
+            file = plan.local_files.get(operation.file_name)
+            entries.append(
+                JournalEntry(
+                    operation.kind,
+                    operation.file_name,
+                    operation.size,
+                    file.mtime_ns if file is not None else 0,
+                    operation.source,
+                    operation.md5,
+                )
+            )
+
+        with self.metrics.phase("state"):
+            self.__cycle = self.state.journal_begin(entries, plan.verified)
+
+    def __journal_complete(
+        self,
+        cycle: int,
+        seq: int,
+        operation: Operation,
+        local_files: dict[str, FileEntry],
+        result: OperationResult,
+    ):
+        # Вызывается в потоке операции до завершения ее Future.
+        # Асинхронная операция отмечается после подтверждения облаком
+        # (см. __confirm_operations).
+        if not result.success:
+            return
+
+        file = local_files.get(operation.file_name)
+        if operation.kind == DELETE:
+            self.state.journal_complete(cycle, seq, removed=[operation.file_name])
+            return
+        if file is None:
+            self.state.journal_complete(cycle, seq)
+            return
+
+        self.state.journal_complete(
+            cycle,
+            seq,
+            FileState(file.name, file.size, file.mtime_ns, self.__file_hash(file)),
+            [operation.source] if operation.kind == MOVE else [],
         )
 
-        remote_files_dict = {file["name"]: file for file in remote_files}
+    def sync_files(self, verify: bool = False) -> int:
+        self.executor.reset_peak()
+        verify = verify or self.__verify_due()
+        self.metrics.begin_cycle("reconcile" if verify else "state", self.__counters())
+
+        plan = self.plan(verify)
+        if plan is not None:
+            self.execute(plan)
+
+        self.metrics.end_cycle(self.__counters(), self.executor.peak_pending)
+        logger.info("Синхронизация завершена")
+        return len(plan.operations) if plan is not None else 0
+
+    def print_plan(self, verify: bool = False) -> SyncPlan | None:
+        plan = self.plan(verify)
+        if plan is None:
+            return None
+
+        for operation in prioritize(plan.operations, self.small_first):
+            source = f" <- {operation.source}" if operation.source else ""
+            print(
+                f"{operation.kind:<8}{operation.file_name}{source} ({operation.size} байт)"
+            )
+
+        counts = ", ".join(f"{kind}: {count}" for kind, count in plan.counts().items())
+        print(f"Итого: {counts or 'изменений нет'}")
+        return plan
+
+    def sync_changed(self, changes: dict[str, str]):
+        # Новые и измененные файлы загружаются с перезаписью, поэтому
+        # сведения о файлах в облаке не требуются.
+        self.executor.reset_peak()
+        self.metrics.begin_cycle("changed", self.__counters())
+        plan = SyncPlan("changed")
 
-        for file in local_files:
-            file_name: str = file.get("name", "")
-            if not file_name:
+        now = time.time_ns()
+        for file_name, change in changes.items():
+            if self.ignore.ignores(file_name):
+                continue
+            file = (
+                None if change == DELETED else get_file_info(self.local_path, file_name)
+            )
+            if file is not None and self.ignore.filtered(file, now):
                 continue
 
-            remote_file = remote_files_dict.pop(file_name, None)
-            mtime_local_file = datetime.fromisoformat(file["modified"])
+            if file is None:
+                if self.__known_remotely(file_name):
+                    plan.operations.append(Operation(DELETE, file_name))
+                continue
 
-            if remote_file:
-                mtime_remote_file = datetime.fromisoformat(remote_file["modified"])
+            plan.local_files[file_name] = file
+            known = self.state.get(file_name) if self.state is not None else None
+            plan.operations.append(
+                Operation(
+                    RELOAD,
+                    file_name,
+                    file.size,
+                    md5=known.hash if known and known.size == file.size else None,
+                )
+            )
 
-                if mtime_local_file > mtime_remote_file:
-                    logger.info(f"Обновление файла {file_name} в облаке")
-                    self.cloud_drive.reload(file_name)
+        self.execute(plan)
+        self.metrics.end_cycle(self.__counters(), self.executor.peak_pending)
 
-            else:
-                logger.info(f"Загрузка файла {file_name} в облако")
-                self.cloud_drive.upload(file_name)
+    def __known_remotely(self, file_name: str) -> bool:
+        # Файл, созданный и удаленный между синхронизациями, в облако
+        # не загружался, и запрос на удаление не нужен.
+        if self.state is not None:
+            return self.state.get(file_name) is not None
+        return self.cloud_drive.stat(file_name) is not None
 
-        for remote_file_name in remote_files_dict.keys():
-            logger.info(f"Удаление файла {remote_file_name} из облака")
-            self.cloud_drive.delete(remote_file_name)
+    def __watch(self, watcher: InotifyWatcher):
+        last_reconcile = time.monotonic()
+        deferred_at = 0.0
 
-        logger.info("Синхронизация завершена")
+        while self.running:
+            timeout = last_reconcile + self.reconcile_delay - time.monotonic()
+            # Ожидание ограничено секундой, чтобы stop_sync из другого
+            # потока останавливал цикл без задержки.
+            changes = watcher.wait_changes(min(max(timeout, 0), 1), self.watch_quiet)
+
+            # По отложенным файлам новых событий может не быть, поэтому
+            # они проверяются повторно через stable_period секунд.
+            if self.deferred and time.monotonic() - deferred_at >= self.stable_period:
+                changes = {name: CHANGED for name in self.deferred} | changes
+
+            if changes and not watcher.overflowed:
+                self.sync_changed(changes)
+                deferred_at = time.monotonic()
+
+            if watcher.overflowed or timeout <= 0:
+                watcher.overflowed = False
+                logger.info("Полная сверка с облаком")
+                self.sync_files(verify=True)
+                last_reconcile = time.monotonic()
+
+    def next_delay(self, changes: int) -> float:
+        delay = self.scheduler.next_delay(changes > 0)
+        if self.deferred:
+            delay = min(delay, max(self.stable_period, 1))
+        return delay
 
     def stop_sync(self):
         logger.info("Синхронизация остановлена")
         self.running = False
+        self.__wakeup.set()
+        self.executor.cancel()
+        self.cloud_drive.clear_prefetch()
+
+    def close(self):
+        self.metrics.stop()
+        self.executor.shutdown()
+        self.cloud_drive.close()
+        if self.state is not None:
+            self.state.close()
 
     def start_sync(self):
         self.running = True
-        counter = 0
+        self.__wakeup.clear()
+        self.executor.reset()
+        watcher: InotifyWatcher | None = None
+
+        if self.watch and InotifyWatcher.is_supported():
+            watcher = InotifyWatcher(self.local_path, self.recursive)
+            watcher.start()
+        elif self.watch:
+            logger.warning("inotify недоступен, используется периодическая проверка")
+
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_port, self.metrics_host)
+
         try:
-            while self.running:
-                counter += 1
+            if watcher is not None:
                 logger.info("Синхронизация запущена")
                 self.sync_files()
+                self.__watch(watcher)
+
+            while self.running:
+                logger.info("Синхронизация запущена")
+                changes = self.sync_files()
 
-                for remaining in range(self.delay, 0, -1):
-                    print(f"....ожидание {remaining} сек.", end="\r")
-                    time.sleep(1)
+                delay = self.next_delay(changes)
+                logger.info(f"Следующая синхронизация через {delay:.0f} сек.")
+                self.__wakeup.wait(delay)
 
         except KeyboardInterrupt:
             self.stop_sync()
+
+        finally:
+            if watcher is not None:
+                watcher.stop()
+            self.close()
+            logger.complete()
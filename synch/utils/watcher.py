@@ -0,0 +1,193 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from core.log_config import logger
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+CHANGED = "changed"
+DELETED = "deleted"
+
+
+class InotifyWatcher:
+    """
+    Класс InotifyWatcher представляет собой наблюдатель за изменениями
+        файлов в папке на основе inotify (только Linux).
+    В методе __init__ инициализируются переменные, такие как path и
+        словарь накопленных изменений changes. При recursive = True
+        отслеживаются и вложенные папки, а имена файлов задаются
+        относительно path через "/".
+    Метод is_supported проверяет, доступен ли inotify в системе.
+    Метод start добавляет отслеживание папок и запускает поток чтения событий.
+    Метод stop останавливает поток и закрывает дескриптор inotify.
+    Метод wait_changes ждет первое событие не дольше timeout секунд,
+        затем собирает события, пока они поступают чаще, чем раз в quiet
+        секунд, но не дольше timeout секунд всего, и возвращает словарь
+        {имя файла: "changed" | "deleted"}.
+        Флаг overflowed означает, что часть событий потеряна и нужна
+        полная синхронизация; он же выставляется при создании, удалении
+        и перемещении вложенных папок.
+    """
+
+    def __init__(self, path: str, recursive: bool = False):
+        self.path: str = path
+        self.recursive: bool = recursive
+        self.changes: dict[str, str] = {}
+        self.overflowed: bool = False
+        self.__condition = threading.Condition()
+        self.__last_event: float = 0.0
+        self.__fd: int = -1
+        self.__libc: ctypes.CDLL | None = None
+        self.__dirs: dict[int, str] = {}
+        self.__running = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        libc_name = ctypes.util.find_library("c")
+        return bool(libc_name) and hasattr(ctypes.CDLL(libc_name), "inotify_init1")
+
+    def __add_watch(self, relative: str):
+        path = os.path.join(self.path, relative)
+        wd = self.__libc.inotify_add_watch(self.__fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {path}")
+        self.__dirs[wd] = relative
+
+        if self.recursive:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = f"{relative}/{entry.name}" if relative else entry.name
+                        self.__add_watch(name)
+
+    def start(self):
+        self.__libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        self.__fd = self.__libc.inotify_init1(IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+
+        try:
+            self.__add_watch("")
+        except OSError:
+            os.close(self.__fd)
+            raise
+
+        self.__running.set()
+        self.__thread = threading.Thread(
+            target=self.__read_events, name="inotify", daemon=True
+        )
+        self.__thread.start()
+        logger.info(f"Отслеживание изменений в {self.path} запущено")
+
+    def stop(self):
+        self.__running.clear()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
+
+    def __read_events(self):
+        while self.__running.is_set():
+            readable, _, _ = select.select([self.__fd], [], [], 0.5)
+            if not readable:
+                continue
+
+            buffer = os.read(self.__fd, 64 * 1024)
+            with self.__condition:
+                self.__parse(buffer)
+                self.__last_event = time.monotonic()
+                self.__condition.notify_all()
+
+    def __parse(self, buffer: bytes):
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                if mask & IN_IGNORED:
+                    self.__dirs.pop(wd, None)
+                self.overflowed = True
+                continue
+
+            if not name or wd not in self.__dirs:
+                continue
+
+            relative = self.__dirs[wd]
+            name = f"{relative}/{name}" if relative else name
+
+            if mask & IN_ISDIR:
+                # Файлы, созданные в новой папке до установки наблюдения,
+                # будут найдены полной синхронизацией.
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self.__add_watch(name)
+                    except OSError:
+                        pass
+                if self.recursive:
+                    self.overflowed = True
+                continue
+
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.changes[name] = DELETED
+            else:
+                self.changes[name] = CHANGED
+
+    def wait_changes(self, timeout: float, quiet: float = 0.2) -> dict[str, str]:
+        deadline = time.monotonic() + timeout
+        with self.__condition:
+            if not self.changes and not self.overflowed:
+                self.__condition.wait(timeout)
+
+            # При непрерывной записи события не затихают, поэтому общее
+            # ожидание ограничено timeout.
+            while self.changes:
+                now = time.monotonic()
+                remaining = min(self.__last_event + quiet, deadline) - now
+                if remaining <= 0:
+                    break
+                self.__condition.wait(remaining)
+
+            changes, self.changes = self.changes, {}
+
+        return changes
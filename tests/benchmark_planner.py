@@ -0,0 +1,81 @@
+"""
+Бенчмарк планировщика синхронизации (utils.planner) на синтетических
+снимках папок без обращения к диску и сети.
+
+Из n локальных файлов 1% новые, 1% изменены, еще 1% файлов есть только
+в облаке; остальные совпадают. Выводятся время построения плана
+и пиковая память, выделенная при планировании (tracemalloc).
+
+Запуск из корня репозитория:
+    PYTHONPATH=synch python -m tests.benchmark_planner --entries 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from synch.core.models import FileEntry
+from synch.utils.planner import plan_from_state, plan_reconcile, prioritize
+from synch.utils.state import FileState
+
+MTIME_NS = 1_700_000_000 * 1_000_000_000
+
+
+def make_snapshots(
+    entries: int,
+) -> tuple[dict[str, FileEntry], list[FileEntry], dict[str, FileState]]:
+    share = max(1, entries // 100)
+    local_files: dict[str, FileEntry] = {}
+    remote_files: list[FileEntry] = []
+    known_files: dict[str, FileState] = {}
+
+    for index in range(entries):
+        name = f"dir_{index // 1000:04d}/file_{index:07d}.bin"
+        size = 1024 + index % 4096
+        md5 = f"{index:032x}"
+        changed = share <= index < 2 * share
+        local_files[name] = FileEntry(
+            name, size, MTIME_NS + (1 if changed else 0), inode=index
+        )
+        if index >= share:
+            remote_files.append(FileEntry(name, size, MTIME_NS, md5=md5))
+            known_files[name] = FileState(name, size, MTIME_NS, md5)
+
+    for index in range(share):
+        name = f"removed/file_{index:07d}.bin"
+        remote_files.append(FileEntry(name, 1, MTIME_NS, md5=f"{index:031x}f"))
+        known_files[name] = FileState(name, 1, MTIME_NS, f"{index:031x}f")
+
+    return local_files, remote_files, known_files
+
+
+def measure(name: str, func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    plan = func(*args)
+    operations = prioritize(plan.operations)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    entries = len(args[0])
+    print(
+        f"{name:<10} entries: {entries}, operations: {len(operations)}, "
+        f"seconds: {elapsed:.3f}, entries/sec: {entries / elapsed:.0f}, "
+        f"peak MB: {peak / (1 << 20):.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    for entries in args.entries:
+        local_files, remote_files, known_files = make_snapshots(entries)
+        measure("reconcile", plan_reconcile, local_files, remote_files)
+        measure("state", plan_from_state, local_files, known_files)
+
+
+if __name__ == "__main__":
+    main()
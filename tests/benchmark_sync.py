@@ -0,0 +1,235 @@
+"""
+Бенчмарк пропускной способности Synchronizer на локальном FakeDiskServer.
+
+Для каждого размера папки создаются синтетические файлы смешанных размеров
+и выполняются циклы синхронизации:
+- initial - первая синхронизация, все файлы загружаются в облако;
+- unchanged - повторная синхронизация без изменений;
+- verify - полная сверка со списком файлов в облаке;
+- modified - синхронизация после изменения 1% файлов.
+Для каждого цикла выводятся время, файлов/с, МБ/с загрузки, число запросов
+к API и загрузок, а также пиковый RSS процесса (сервер работает в том же
+процессе, поэтому его память тоже учитывается).
+
+Запуск из корня репозитория:
+    PYTHONPATH=synch python -m tests.benchmark_sync --files 1000 10000 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from loguru import logger as loguru_logger
+
+from synch.cloud_storage.retry import RetryPolicy
+from synch.cloud_storage.yandex import YandexDiskClient
+from synch.utils.synchronize import Synchronizer
+from tests.fake_disk_server import FakeDiskServer
+
+# (размер в байтах, доля файлов)
+SIZE_MIX: tuple[tuple[int, float], ...] = (
+    (0, 0.10),
+    (1 << 10, 0.60),
+    (16 << 10, 0.27),
+    (256 << 10, 0.03),
+)
+REMOTE_FOLDER = "benchmark"
+
+
+def make_files(folder: str, count: int, rng: random.Random, scale: float = 1.0):
+    sizes, weights = zip(*SIZE_MIX)
+    per_dir = 1000
+
+    for index in range(count):
+        dirname = os.path.join(folder, f"dir_{index // per_dir:04d}")
+        if index % per_dir == 0:
+            os.makedirs(dirname, exist_ok=True)
+        size = int(rng.choices(sizes, weights)[0] * scale)
+        with open(os.path.join(dirname, f"file_{index:07d}.bin"), "wb") as file:
+            file.write(rng.randbytes(size))
+
+
+def modify_files(folder: str, share: float, rng: random.Random) -> int:
+    paths = [
+        os.path.join(root, name) for root, _, names in os.walk(folder) for name in names
+    ]
+    changed = rng.sample(paths, max(1, int(len(paths) * share)))
+    for path in changed:
+        with open(path, "ab") as file:
+            file.write(b"changed")
+    return len(changed)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss в Linux измеряется в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def create_synchronizer(
+    local_path: str,
+    state_path: str | None,
+    server: FakeDiskServer,
+    workers: int,
+    prefetch_urls: int = 0,
+) -> Synchronizer:
+    return Synchronizer(
+        local_path=local_path,
+        remote_path=REMOTE_FOLDER,
+        token="token",
+        workers=workers,
+        recursive=True,
+        backend=YandexDiskClient(
+            local_path,
+            REMOTE_FOLDER,
+            "token",
+            pool_size=workers,
+            api_host=server.url,
+            recursive=True,
+            retry_policy=RetryPolicy(base_delay=0.05, max_delay=1),
+            prefetch_urls=prefetch_urls,
+        ),
+        state_mode="true" if state_path else "false",
+        state_path=state_path,
+        stable_period=0,
+    )
+
+
+def run_cycle(
+    name: str,
+    synchronizer: Synchronizer,
+    server: FakeDiskServer,
+    files: int,
+    verify: bool = False,
+) -> dict:
+    api_calls, uploads = server.api_calls, server.uploaded
+    received, retries = server.received_bytes, synchronizer.cloud_drive.retries
+
+    start = time.perf_counter()
+    synchronizer.sync_files(verify=verify)
+    elapsed = time.perf_counter() - start
+
+    uploaded_mb = (server.received_bytes - received) / (1 << 20)
+    return {
+        "files": files,
+        "cycle": name,
+        "seconds": round(elapsed, 3),
+        "files_per_sec": round(files / elapsed, 1),
+        "mb_per_sec": round(uploaded_mb / elapsed, 2),
+        "uploaded_mb": round(uploaded_mb, 2),
+        "api_calls": server.api_calls - api_calls,
+        "uploads": server.uploaded - uploads,
+        "retries": synchronizer.cloud_drive.retries - retries,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "phases": synchronizer.metrics.last_cycle.get("phases", {}),
+    }
+
+
+def run_benchmark(
+    files: int,
+    workers: int = 8,
+    latency: float = 0.0,
+    bandwidth: int = 0,
+    error_rate: float = 0.0,
+    use_state: bool = True,
+    scale: float = 1.0,
+    seed: int = 0,
+    prefetch_urls: int = 0,
+) -> list[dict]:
+    rng = random.Random(seed)
+    workdir = tempfile.mkdtemp(prefix="synch_benchmark_")
+    local_path = os.path.join(workdir, "local")
+    state_path = os.path.join(workdir, "state.sqlite3") if use_state else None
+
+    try:
+        make_files(local_path, files, rng, scale)
+
+        with FakeDiskServer(
+            latency=latency,
+            bandwidth=bandwidth,
+            error_rate=error_rate,
+            keep_content=False,
+            seed=seed,
+        ) as server:
+            server.dirs.add(REMOTE_FOLDER)
+            synchronizer = create_synchronizer(
+                local_path, state_path, server, workers, prefetch_urls
+            )
+
+            try:
+                results = [
+                    run_cycle("initial", synchronizer, server, files),
+                    run_cycle("unchanged", synchronizer, server, files),
+                    run_cycle("verify", synchronizer, server, files, verify=True),
+                ]
+                modify_files(local_path, 0.01, rng)
+                results.append(run_cycle("modified", synchronizer, server, files))
+            finally:
+                synchronizer.close()
+
+        return results
+
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="секунд на запрос")
+    parser.add_argument("--bandwidth", type=int, default=0, help="байт/с загрузки")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель размеров")
+    parser.add_argument("--no-state", action="store_true")
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="URL для загрузки, запрашиваемых заранее",
+    )
+    parser.add_argument("--json", action="store_true", help="вывод строками JSON")
+    args = parser.parse_args()
+
+    # Логи каждой операции искажают замеры: выводятся только ошибки.
+    loguru_logger.remove()
+    loguru_logger.add(sys.stderr, level="ERROR")
+
+    columns = (
+        "files",
+        "cycle",
+        "seconds",
+        "files_per_sec",
+        "mb_per_sec",
+        "api_calls",
+        "uploads",
+        "retries",
+        "peak_rss_mb",
+    )
+    if not args.json:
+        print(" ".join(f"{column:>13}" for column in columns))
+
+    for files in args.files:
+        for row in run_benchmark(
+            files,
+            workers=args.workers,
+            latency=args.latency,
+            bandwidth=args.bandwidth,
+            error_rate=args.error_rate,
+            use_state=not args.no_state,
+            scale=args.scale,
+            prefetch_urls=args.prefetch,
+        ):
+            if args.json:
+                print(json.dumps(row))
+            else:
+                print(" ".join(f"{row[column]:>13}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import pytest
+
+from synch.cloud_storage.retry import RetryPolicy
+from synch.cloud_storage.yandex import YandexDiskClient
+from synch.utils.synchronize import Synchronizer
+from tests.fake_disk_server import FakeDiskServer
+
+REMOTE_FOLDER = "remote"
+
+
+@pytest.fixture
+def disk_server():
+    with FakeDiskServer() as server:
+        server.dirs.add(REMOTE_FOLDER)
+        yield server
+
+
+@pytest.fixture
+def local_folder(tmp_path):
+    local_folder = tmp_path / "local"
+    local_folder.mkdir()
+    return local_folder
+
+
+@pytest.fixture
+def make_server_synchronizer(disk_server, local_folder, tmp_path):
+    # Синхронизаторы с общим состоянием, например для проверки
+    # продолжения прерванного цикла новым процессом.
+    created: list[Synchronizer] = []
+
+    def make(workers: int = 2, state_mode: str = "true") -> Synchronizer:
+        synchronizer = Synchronizer(
+            local_path=str(local_folder),
+            remote_path=REMOTE_FOLDER,
+            token="token",
+            workers=workers,
+            recursive=True,
+            backend=YandexDiskClient(
+                str(local_folder),
+                REMOTE_FOLDER,
+                "token",
+                pool_size=workers,
+                api_host=disk_server.url,
+                recursive=True,
+                retry_policy=RetryPolicy(base_delay=0.05, max_delay=1),
+            ),
+            state_mode=state_mode,
+            state_path=str(tmp_path / "state.sqlite3"),
+            stable_period=0,
+        )
+        created.append(synchronizer)
+        return synchronizer
+
+    yield make
+    for synchronizer in created:
+        synchronizer.close()
+
+
+@pytest.fixture
+def server_synchronizer(make_server_synchronizer):
+    return make_server_synchronizer()
@@ -0,0 +1,421 @@
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeDiskServer:
+    """
+    Локальный HTTP-сервер, имитирующий используемые клиентом методы
+    Yandex.Disk API: постраничный список ресурсов, выдачу URL для загрузки,
+    PUT загрузку файла, создание папок, перемещение, копирование и удаление.
+    Файлы хранятся в памяти в словаре files,
+    ключ - путь вида "remote_folder/file_name".
+    При keep_content = False содержимое загруженных файлов не хранится
+    (только размер), что нужно для бенчмарков на больших папках.
+
+    Для измерений и проверки устойчивости клиента сервер умеет:
+    - задерживать каждый запрос на latency секунд;
+    - ограничивать скорость приема загружаемых файлов bandwidth байт/с;
+    - отвечать ошибкой error_status (с заголовком Retry-After, если
+      задан retry_after) на долю error_rate запросов к API;
+    - отвечать заданными ошибками на следующие запросы (fail_next);
+    - выполнять удаление с force_async=true асинхронно: ответ 202
+      с адресом операции, статус которой operation_polls раз равен
+      "in-progress", а затем "success" (файл удаляется) или "failed"
+      для путей из failed_deletes;
+    - при async_moves = True так же асинхронно выполнять перемещение
+      и копирование: файл перемещается после завершения операции.
+    Заголовки Authorization полученных запросов сохраняются в tokens.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: float | None = None,
+        keep_content: bool = True,
+        seed: int | None = None,
+    ):
+        self.files: dict[str, dict] = {}
+        self.dirs: set[str] = set()
+        self.uploads: dict[str, tuple[str, bool]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.tokens: set[str] = set()
+        self.latency: float = latency
+        self.bandwidth: int = bandwidth
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.retry_after: float | None = retry_after
+        self.keep_content: bool = keep_content
+        self.failures: list[int] = []
+        self.operations: dict[str, dict] = {}
+        self.operation_polls: int = 0
+        self.failed_deletes: set[str] = set()
+        self.async_moves: bool = False
+        self.injected: int = 0
+        self.uploaded: int = 0
+        self.received_bytes: int = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.__make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeDiskServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def api_calls(self) -> int:
+        with self.lock:
+            return sum(
+                1 for _, path in self.requests if not path.startswith("/upload/")
+            )
+
+    def fail_next(self, *statuses: int):
+        with self.lock:
+            self.failures.extend(statuses)
+
+    def next_error(self, path: str) -> int | None:
+        with self.lock:
+            if self.failures:
+                status = self.failures.pop(0)
+            elif (
+                self.error_rate
+                and not path.startswith("/upload/")
+                and self.random.random() < self.error_rate
+            ):
+                status = self.error_status
+            else:
+                return None
+            self.injected += 1
+            return status
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        return path.removeprefix("disk:").strip("/")
+
+    def add_file(
+        self,
+        path: str,
+        content: bytes = b"",
+        modified: str | None = None,
+        size: int | None = None,
+    ):
+        path = self.normalize(path)
+        self.files[path] = {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": f"disk:/{path}",
+            "modified": modified or datetime.now(timezone.utc).isoformat(),
+            "size": len(content) if size is None else size,
+            "content": content if self.keep_content else b"",
+        }
+
+    def add_operation(self, path: str, apply: Callable[[], None]) -> str:
+        # Вызывается под self.lock; apply выполняет операцию при ее успехе.
+        operation_id = uuid.uuid4().hex
+        self.operations[operation_id] = {
+            "path": path,
+            "polls": self.operation_polls,
+            "apply": apply,
+        }
+        return operation_id
+
+    def parent_exists(self, path: str) -> bool:
+        parent = path.rpartition("/")[0]
+        return "/" not in parent or parent in self.dirs
+
+    def __make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(
+                self,
+                status: int,
+                payload: dict | None = None,
+                headers: dict[str, str] | None = None,
+            ):
+                body = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def parse(self) -> tuple[str, dict[str, str]]:
+                url = urlparse(self.path)
+                query = {key: value[0] for key, value in parse_qs(url.query).items()}
+                with server.lock:
+                    server.requests.append((self.command, url.path))
+                    if self.headers.get("Authorization"):
+                        server.tokens.add(self.headers["Authorization"])
+                if server.latency:
+                    time.sleep(server.latency)
+                return url.path, query
+
+            def inject_error(self, path: str) -> bool:
+                status = server.next_error(path)
+                if status is None:
+                    return False
+
+                # Тело запроса нужно дочитать, иначе клиент получит
+                # обрыв соединения вместо ответа.
+                self.read_body()
+                headers = {}
+                if server.retry_after is not None:
+                    headers["Retry-After"] = str(server.retry_after)
+                self.send_json(status, {"error": "InjectedError"}, headers)
+                return True
+
+            def read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                if not server.bandwidth:
+                    return self.rfile.read(length)
+
+                chunks = []
+                chunk_size = max(1, server.bandwidth // 10)
+                while length > 0:
+                    chunk = self.rfile.read(min(chunk_size, length))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    length -= len(chunk)
+                    time.sleep(len(chunk) / server.bandwidth)
+                return b"".join(chunks)
+
+            def do_GET(self):
+                path, query = self.parse()
+                if self.inject_error(path):
+                    return
+
+                if path == "/v1/disk/resources":
+                    return self.list_resources(query)
+
+                if path == "/v1/disk/resources/upload":
+                    return self.issue_upload_url(query)
+
+                if path.startswith("/v1/disk/operations/"):
+                    return self.operation_status(path.rsplit("/", 1)[-1])
+
+                self.send_json(404, {"error": "NotFound"})
+
+            def list_resources(self, query: dict[str, str]):
+                folder = server.normalize(query.get("path", ""))
+                limit = int(query.get("limit", 20))
+                offset = int(query.get("offset", 0))
+
+                with server.lock:
+                    item = server.files.get(folder)
+                if item is not None:
+                    return self.send_json(
+                        200, {k: v for k, v in item.items() if k != "content"}
+                    )
+
+                with server.lock:
+                    items = [
+                        {"type": "dir", "name": path.rsplit("/", 1)[-1]}
+                        for path in sorted(server.dirs)
+                        if path.rpartition("/")[0] == folder
+                    ] + [
+                        {k: v for k, v in item.items() if k != "content"}
+                        for path, item in sorted(server.files.items())
+                        if path.rpartition("/")[0] == folder
+                    ]
+
+                self.send_json(
+                    200,
+                    {
+                        "_embedded": {
+                            "items": items[offset : offset + limit],
+                            "limit": limit,
+                            "offset": offset,
+                            "total": len(items),
+                        }
+                    },
+                )
+
+            def issue_upload_url(self, query: dict[str, str]):
+                path = server.normalize(query["path"])
+                overwrite = query.get("overwrite") == "true"
+
+                with server.lock:
+                    if not server.parent_exists(path):
+                        return self.send_json(
+                            409, {"error": "DiskPathDoesntExistsError"}
+                        )
+                    if path in server.files and not overwrite:
+                        return self.send_json(
+                            409,
+                            {
+                                "error": "DiskResourceAlreadyExistsError",
+                                "message": path,
+                            },
+                        )
+                    upload_id = uuid.uuid4().hex
+                    server.uploads[upload_id] = (path, overwrite)
+
+                self.send_json(
+                    200,
+                    {"href": f"{server.url}/upload/{upload_id}", "method": "PUT"},
+                )
+
+            def do_PUT(self):
+                path, query = self.parse()
+                if self.inject_error(path):
+                    return
+
+                if path == "/v1/disk/resources":
+                    return self.create_dir(server.normalize(query.get("path", "")))
+                upload_id = path.removeprefix("/upload/")
+                content = self.read_body()
+                if len(content) < int(self.headers.get("Content-Length") or 0):
+                    # Соединение оборвано клиентом: неполный файл не сохраняется.
+                    return
+
+                with server.lock:
+                    target = server.uploads.pop(upload_id, None)
+
+                if target is None:
+                    return self.send_json(404, {"error": "NotFound"})
+
+                with server.lock:
+                    server.uploaded += 1
+                    server.received_bytes += len(content)
+                server.add_file(target[0], content)
+                self.send_json(201)
+
+            def create_dir(self, path: str):
+                with server.lock:
+                    if path in server.dirs:
+                        return self.send_json(
+                            409, {"error": "DiskPathPointsToExistentDirectoryError"}
+                        )
+                    if not server.parent_exists(path):
+                        return self.send_json(
+                            409, {"error": "DiskPathDoesntExistsError"}
+                        )
+                    server.dirs.add(path)
+
+                self.send_json(201, {"href": f"{server.url}/v1/disk/resources"})
+
+            def do_POST(self):
+                path, query = self.parse()
+                if self.inject_error(path):
+                    return
+                action = path.removeprefix("/v1/disk/resources/")
+
+                if action not in ("move", "copy"):
+                    return self.send_json(404, {"error": "NotFound"})
+
+                source = server.normalize(query.get("from", ""))
+                target = server.normalize(query.get("path", ""))
+
+                with server.lock:
+                    if source not in server.files:
+                        return self.send_json(404, {"error": "DiskNotFoundError"})
+                    if target in server.files and query.get("overwrite") != "true":
+                        return self.send_json(
+                            409, {"error": "DiskResourceAlreadyExistsError"}
+                        )
+
+                    def apply():
+                        item = server.files[source]
+                        if action == "move":
+                            del server.files[source]
+                        server.add_file(
+                            target, item["content"], item["modified"], item["size"]
+                        )
+
+                    if server.async_moves:
+                        operation_id = server.add_operation(target, apply)
+                    else:
+                        apply()
+
+                if server.async_moves:
+                    return self.send_operation(operation_id)
+                self.send_json(201, {"href": f"{server.url}/v1/disk/resources"})
+
+            def do_DELETE(self):
+                path, query = self.parse()
+                if self.inject_error(path):
+                    return
+                target = server.normalize(query.get("path", ""))
+
+                force_async = query.get("force_async") == "true"
+                with server.lock:
+                    if force_async:
+                        # Файл удаляется после завершения операции.
+                        removed = server.files.get(target)
+                        if removed is not None:
+                            operation_id = server.add_operation(
+                                target, lambda: server.files.pop(target, None)
+                            )
+                    else:
+                        removed = server.files.pop(target, None)
+
+                if removed is None:
+                    return self.send_json(404, {"error": "DiskNotFoundError"})
+
+                if force_async:
+                    return self.send_operation(operation_id)
+
+                self.send_json(204)
+
+            def send_operation(self, operation_id: str):
+                self.send_json(
+                    202,
+                    {
+                        "href": f"{server.url}/v1/disk/operations/{operation_id}",
+                        "method": "GET",
+                        "templated": False,
+                    },
+                )
+
+            def operation_status(self, operation_id: str):
+                with server.lock:
+                    operation = server.operations.get(operation_id)
+                    if operation is None:
+                        status = None
+                    elif operation["polls"] > 0:
+                        operation["polls"] -= 1
+                        status = "in-progress"
+                    elif operation["path"] in server.failed_deletes:
+                        status = "failed"
+                    else:
+                        operation["apply"]()
+                        status = "success"
+
+                if status is None:
+                    return self.send_json(404, {"error": "NotFound"})
+                self.send_json(200, {"status": status})
+
+        return Handler
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from synch.cloud_storage.async_yandex import AsyncYandexDiskClient
+from synch.utils.async_synchronize import AsyncSynchronizer
+from tests.fake_disk_server import FakeDiskServer
+
+
+@pytest.fixture
+def server():
+    with FakeDiskServer() as server:
+        yield server
+
+
+@pytest.fixture
+def local_folder(tmp_path):
+    for name in ("new_file", "changed_file"):
+        (tmp_path / name).write_bytes(name.encode())
+    return tmp_path
+
+
+def make_client(server, local_folder, page_size=1000) -> AsyncYandexDiskClient:
+    return AsyncYandexDiskClient(
+        str(local_folder),
+        "remote",
+        "token",
+        page_size=page_size,
+        api_host=server.url,
+    )
+
+
+def test_async_client_iter_info_paginates(server, local_folder):
+    for i in range(25):
+        server.add_file(f"remote/file_{i:02}")
+
+    async def collect():
+        async with make_client(server, local_folder, page_size=10) as client:
+            return [item.name async for item in client.iter_info()]
+
+    assert asyncio.run(collect()) == [f"file_{i:02}" for i in range(25)]
+    assert len(server.requests) == 3
+
+
+def test_async_client_upload_conflict_returns_none(server, local_folder):
+    server.add_file("remote/new_file", b"old")
+
+    async def upload():
+        async with make_client(server, local_folder) as client:
+            return await client.upload("new_file")
+
+    assert asyncio.run(upload()) is None
+    assert server.files["remote/new_file"]["content"] == b"old"
+
+
+def test_async_client_delete_missing_file_succeeds(server, local_folder):
+    async def delete():
+        async with make_client(server, local_folder) as client:
+            return await client.delete("missing"), await client.delete(
+                "missing", missing_ok=True
+            )
+
+    assert asyncio.run(delete()) == ({"status": "Success"}, {"status": "Success"})
+
+
+def test_async_sync_files(server, local_folder):
+    server.add_file("remote/changed_file", b"old", "2000-01-01T00:00:00+00:00")
+    server.add_file("remote/stale_file", b"stale")
+
+    synchronizer = AsyncSynchronizer()
+    synchronizer.local_path = str(local_folder)
+    synchronizer.cloud_drive = make_client(server, local_folder)
+
+    async def sync():
+        await synchronizer.sync_files()
+        await synchronizer.cloud_drive.close()
+
+    asyncio.run(sync())
+
+    assert sorted(server.files) == ["remote/changed_file", "remote/new_file"]
+    assert server.files["remote/changed_file"]["content"] == b"changed_file"
+    assert server.files["remote/new_file"]["content"] == b"new_file"
+
+
+def test_async_sync_skips_ignored_files(server, local_folder):
+    from synch.utils.ignore import IgnoreRules
+
+    (local_folder / "new_file.swp").write_bytes(b"swap")
+    (local_folder / "big").write_bytes(b"x" * 100)
+    server.add_file("remote/old.swp", b"swap")
+    server.add_file("remote/big", b"y" * 100, "2000-01-01T00:00:00+00:00")
+    server.add_file("remote/stale_file", b"stale")
+
+    synchronizer = AsyncSynchronizer()
+    synchronizer.local_path = str(local_folder)
+    synchronizer.ignore = IgnoreRules(["*.swp"], max_size=50)
+    synchronizer.cloud_drive = make_client(server, local_folder)
+
+    async def sync():
+        await synchronizer.sync_files()
+        await synchronizer.cloud_drive.close()
+
+    asyncio.run(sync())
+
+    assert sorted(server.files) == [
+        "remote/big",
+        "remote/changed_file",
+        "remote/new_file",
+        "remote/old.swp",
+    ]
+    assert server.files["remote/big"]["content"] == b"y" * 100
+
+
+def test_async_client_retries_server_errors(server, local_folder):
+    from synch.cloud_storage.retry import RetryPolicy
+
+    server.add_file("remote/file")
+    server.fail_next(503, 429)
+
+    async def collect():
+        async with AsyncYandexDiskClient(
+            str(local_folder),
+            "remote",
+            "token",
+            api_host=server.url,
+            retry_policy=RetryPolicy(base_delay=0.01),
+        ) as client:
+            return [item.name async for item in client.iter_info()], client.retries
+
+    assert asyncio.run(collect()) == (["file"], 2)
+
+
+def test_async_print_plan_changes_nothing(server, local_folder, capsys):
+    server.add_file("remote/changed_file", b"old", "2000-01-01T00:00:00+00:00")
+    server.add_file("remote/stale_file", b"stale")
+
+    synchronizer = AsyncSynchronizer()
+    synchronizer.local_path = str(local_folder)
+    synchronizer.cloud_drive = make_client(server, local_folder)
+
+    try:
+        operations = synchronizer.print_plan()
+    finally:
+        synchronizer.close()
+
+    assert sorted(operations) == [
+        ("delete", "stale_file"),
+        ("reload", "changed_file"),
+        ("upload", "new_file"),
+    ]
+    assert "Итого: " in capsys.readouterr().out
+    assert sorted(server.files) == ["remote/changed_file", "remote/stale_file"]
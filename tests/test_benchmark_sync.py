@@ -0,0 +1,10 @@
+from tests.benchmark_sync import run_benchmark
+
+
+def test_benchmark_cycles_against_fake_server():
+    initial, unchanged, verify, modified = run_benchmark(30, workers=4)
+
+    assert initial["uploads"] == 30
+    assert unchanged["api_calls"] == 0
+    assert verify["uploads"] == 0
+    assert modified["uploads"] == 1
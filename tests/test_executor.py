@@ -0,0 +1,108 @@
+import threading
+import time
+
+from synch.utils.executor import TransferExecutor
+
+
+def test_operations_run_in_parallel():
+    executor = TransferExecutor(workers=4)
+    barrier = threading.Barrier(4, timeout=2)
+
+    def operation(file_name):
+        barrier.wait()
+        return {"status": "Success"}
+
+    for i in range(4):
+        executor.submit("upload", operation, f"file_{i}")
+
+    results = executor.wait()
+    executor.shutdown()
+
+    assert len(results) == 4
+    assert all(item.success for item in results)
+
+
+def test_same_file_operations_keep_order():
+    executor = TransferExecutor(workers=4)
+    calls = []
+
+    def slow_upload(file_name):
+        time.sleep(0.05)
+        calls.append(("upload", file_name))
+        return {"status": "Success"}
+
+    def delete(file_name):
+        calls.append(("delete", file_name))
+        return None
+
+    executor.submit("upload", slow_upload, "file1")
+    executor.submit("delete", delete, "file1")
+
+    results = executor.wait()
+    executor.shutdown()
+
+    assert calls == [("upload", "file1"), ("delete", "file1")]
+    assert [item.success for item in results] == [True, False]
+
+
+def test_cancel_skips_pending_operations():
+    executor = TransferExecutor(workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking(file_name):
+        started.set()
+        release.wait(2)
+        calls.append(file_name)
+        return {"status": "Success"}
+
+    executor.submit("upload", blocking, "file1")
+    executor.submit("upload", blocking, "file2")
+    started.wait(2)
+    executor.cancel()
+    release.set()
+
+    executor.wait()
+    executor.shutdown()
+
+    assert calls == ["file1"]
+    assert executor.submit("upload", blocking, "file3") is None
+
+
+def test_operation_timing_and_queue_peak():
+    executor = TransferExecutor(workers=1)
+    executor.reset_peak()
+
+    def operation(file_name):
+        time.sleep(0.02)
+        return {"status": "Success"}
+
+    for i in range(3):
+        executor.submit("upload", operation, f"file_{i}")
+
+    results = executor.wait()
+    executor.shutdown()
+
+    assert executor.peak_pending == 3
+    assert executor.pending == 0
+    assert all(item.seconds >= 0.02 for item in results)
+
+
+def test_on_done_runs_before_wait_returns():
+    executor = TransferExecutor(workers=4)
+    done = []
+
+    def on_done(result):
+        time.sleep(0.05)
+        done.append(result.file_name)
+
+    for i in range(4):
+        executor.submit(
+            "upload", lambda name: {"status": "Success"}, f"file_{i}", on_done=on_done
+        )
+
+    results = executor.wait()
+    executor.shutdown()
+
+    assert sorted(done) == sorted(item.file_name for item in results)
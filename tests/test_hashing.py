@@ -0,0 +1,69 @@
+import builtins
+import hashlib
+import os
+
+from synch.utils.hashing import HashCache
+from synch.utils.state import SyncState
+
+
+def test_hash_cache_does_not_reread_unchanged_file(tmp_path, monkeypatch):
+    path = tmp_path / "file1"
+    path.write_bytes(b"content" * 1000)
+    cache = HashCache(chunk_size=1024)
+
+    assert cache.get(str(path)) == hashlib.md5(b"content" * 1000).hexdigest()
+
+    def fail_open(*args, **kwargs):
+        raise AssertionError("файл не должен читаться повторно")
+
+    monkeypatch.setattr(builtins, "open", fail_open)
+    assert cache.get(str(path)) == hashlib.md5(b"content" * 1000).hexdigest()
+
+
+def test_hash_cache_invalidated_by_mtime(tmp_path):
+    path = tmp_path / "file1"
+    path.write_bytes(b"old")
+    cache = HashCache()
+    cache.get(str(path))
+
+    path.write_bytes(b"new")
+    os.utime(path, ns=(1, 1))
+
+    assert cache.get(str(path)) == hashlib.md5(b"new").hexdigest()
+
+
+def test_hash_cache_persists_in_state(tmp_path):
+    path = tmp_path / "file1"
+    path.write_bytes(b"content")
+    file_stat = os.stat(path)
+    state = SyncState(str(tmp_path / "state.sqlite3"))
+
+    cache = HashCache(state)
+    cache.get(str(path))
+    cache.flush()
+
+    assert (
+        HashCache(state).lookup(
+            str(path), file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
+        )
+        == hashlib.md5(b"content").hexdigest()
+    )
+    state.close()
+
+
+def test_hash_cache_flush_prunes_missing_paths(tmp_path):
+    kept = tmp_path / "kept"
+    removed = tmp_path / "removed"
+    kept.write_bytes(b"kept")
+    removed.write_bytes(b"removed")
+    state = SyncState(str(tmp_path / "state.sqlite3"))
+
+    cache = HashCache(state)
+    cache.get(str(kept))
+    cache.get(str(removed))
+    cache.flush()
+    removed.unlink()
+    cache.flush([str(kept)])
+
+    assert list(state.load_hashes()) == [str(kept)]
+    state.close()
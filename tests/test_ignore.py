@@ -0,0 +1,75 @@
+import pytest
+
+from synch.core.models import NS_PER_SECOND, FileEntry
+from synch.utils.ignore import IgnoreRules, load_rules
+
+RULES = IgnoreRules(
+    [
+        "# временные файлы",
+        "*.swp",
+        "*.part",
+        "~$*",
+        "build/",
+        "/cache",
+        "docs/**/*.tmp",
+        "*.log",
+        "!keep.log",
+        "",
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    "path, ignored",
+    [
+        ("file.txt", False),
+        (".file.txt.swp", True),
+        ("a/b/video.mp4.part", True),
+        ("~$report.docx", True),
+        ("a/~$report.docx", True),
+        ("build/out.o", True),
+        ("a/build/out.o", True),
+        ("build", False),
+        ("cache", True),
+        ("cache/file", True),
+        ("a/cache", False),
+        ("docs/x.tmp", True),
+        ("docs/a/b/x.tmp", True),
+        ("x.tmp", False),
+        ("error.log", True),
+        ("a/keep.log", False),
+    ],
+)
+def test_ignores(path, ignored):
+    assert RULES.ignores(path) is ignored
+
+
+def test_match_dir_only_rules():
+    assert RULES.match("build", is_dir=True)
+    assert not RULES.match("build")
+    assert not RULES.match("a/b/c.txt")
+
+
+def test_empty_rules():
+    rules = IgnoreRules(["", "  "])
+
+    assert not rules
+    assert not rules.ignores("a/b")
+    assert IgnoreRules(max_size=1)
+
+
+def test_size_and_age_filters():
+    rules = IgnoreRules(max_size=100, max_age=60)
+    now = 1000 * NS_PER_SECOND
+
+    assert not rules.filtered(FileEntry("a", 100, now), now)
+    assert rules.filtered(FileEntry("a", 101, now), now)
+    assert rules.filtered(FileEntry("a", 1, now - 61 * NS_PER_SECOND), now)
+
+
+def test_load_rules(tmp_path):
+    filename = tmp_path / ".synchignore"
+    filename.write_text("*.swp\n!a.swp\n")
+
+    assert load_rules(str(filename)) == ["*.swp", "!a.swp"]
+    assert load_rules("") == []
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from synch.cloud_storage import LocalDirectoryBackend, StorageBackend
+from synch.cloud_storage.local import copy_file_data
+from synch.utils.synchronize import Synchronizer
+
+
+@pytest.fixture
+def folders(tmp_path):
+    local_folder = tmp_path / "local"
+    target_folder = tmp_path / "target"
+    (local_folder / "a").mkdir(parents=True)
+    (local_folder / "file1").write_bytes(b"content")
+    (local_folder / "a" / "file2").write_bytes(b"nested")
+    return local_folder, target_folder
+
+
+def test_backend_implements_protocol(folders):
+    local_folder, target_folder = folders
+    backend = LocalDirectoryBackend(str(local_folder), str(target_folder))
+
+    assert isinstance(backend, StorageBackend)
+    assert target_folder.is_dir()
+
+
+def test_copy_file_data(tmp_path):
+    data = os.urandom(3 << 20)
+    (tmp_path / "source").write_bytes(data)
+
+    with open(tmp_path / "source", "rb") as source, open(
+        tmp_path / "target", "wb"
+    ) as target:
+        assert copy_file_data(source.fileno(), target.fileno(), len(data)) == len(data)
+
+    assert (tmp_path / "target").read_bytes() == data
+
+
+def test_upload_reload_and_stat(folders):
+    local_folder, target_folder = folders
+    backend = LocalDirectoryBackend(str(local_folder), str(target_folder), True)
+
+    assert backend.upload("file1") == {"status": "Success"}
+    assert backend.upload("a/file2") == {"status": "Success"}
+    assert backend.upload("file1") is None
+
+    (local_folder / "file1").write_bytes(b"changed content")
+    assert backend.reload("file1") == {"status": "Success"}
+    assert (target_folder / "file1").read_bytes() == b"changed content"
+
+    info = backend.stat("file1")
+    source = os.stat(local_folder / "file1")
+    assert (info.size, info.mtime_ns) == (source.st_size, source.st_mtime_ns)
+    assert backend.stat("missing") is None
+
+    assert sorted(file.name for file in backend.iter_info()) == ["a/file2", "file1"]
+    assert not [name for name in os.listdir(target_folder) if name.startswith(".")]
+    assert backend.api_calls == 7
+
+
+def test_move_copy_and_delete(folders):
+    local_folder, target_folder = folders
+    backend = LocalDirectoryBackend(str(local_folder), str(target_folder))
+    backend.upload("file1")
+
+    assert backend.move("moved", "file1") == {"status": "Success"}
+    assert backend.copy("copied", "moved") == {"status": "Success"}
+    assert backend.move("copied", "moved") is None
+    assert backend.move("other", "missing") is None
+    assert sorted(os.listdir(target_folder)) == ["copied", "moved"]
+
+    assert backend.delete("moved") == {"status": "Success"}
+    assert backend.delete("moved") == {"status": "Success"}
+    assert [file.name for file in backend.iter_info()] == ["copied"]
+
+
+def test_file_changed_during_copy_is_reported(folders, monkeypatch):
+    from synch.cloud_storage import local
+
+    local_folder, target_folder = folders
+    backend = LocalDirectoryBackend(str(local_folder), str(target_folder))
+    copy = local.copy_file_data
+
+    def copy_and_append(source_fd, target_fd, size):
+        with open(local_folder / "file1", "ab") as file:
+            file.write(b"appended")
+        return copy(source_fd, target_fd, size)
+
+    monkeypatch.setattr(local, "copy_file_data", copy_and_append)
+
+    assert backend.upload("file1") == {"status": "Changed"}
+    assert os.listdir(target_folder) == []
+
+
+def test_synchronizer_with_local_backend(folders, tmp_path):
+    local_folder, target_folder = folders
+    synchronizer = Synchronizer(
+        local_path=str(local_folder),
+        remote_path=str(target_folder),
+        recursive=True,
+        backend=LocalDirectoryBackend(str(local_folder), str(target_folder), True),
+        state_mode="true",
+        state_path=str(tmp_path / "state.sqlite3"),
+        stable_period=0,
+    )
+
+    synchronizer.sync_files()
+    assert (target_folder / "a" / "file2").read_bytes() == b"nested"
+
+    (local_folder / "file1").unlink()
+    (local_folder / "file3").write_bytes(b"new")
+    synchronizer.sync_files()
+    synchronizer.close()
+
+    assert sorted(
+        os.path.relpath(os.path.join(root, name), target_folder)
+        for root, _, names in os.walk(target_folder)
+        for name in names
+    ) == ["a/file2", "file3"]
+
+
+def test_inconsistencies_are_counted(folders):
+    local_folder, target_folder = folders
+    backend = LocalDirectoryBackend(str(local_folder), str(target_folder))
+    backend.upload("file1")
+
+    assert backend.upload("file1") is None
+    assert backend.delete("missing") == {"status": "Success"}
+    assert backend.move("other", "missing") is None
+    assert backend.copy("other", "missing") is None
+    assert backend.inconsistencies == 4
+
+    assert backend.delete("missing", missing_ok=True) == {"status": "Success"}
+    assert backend.inconsistencies == 4
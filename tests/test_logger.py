@@ -58,3 +58,40 @@ def test_logger_critical():
     with open(get_log_filename(), "r") as f:
         log_content = f.read()
         assert f"CRITICAL {test_message}" in log_content
+
+
+def test_logger_summary_caps_sample(monkeypatch):
+    messages = []
+    monkeypatch.setattr(logger, "sample", 3)
+    monkeypatch.setattr(logger, "summary_mode", True)
+    monkeypatch.setattr(
+        logger.logger, "log", lambda level, message: messages.append(message)
+    )
+
+    logger.summary("Файлы", [f"file_{i}" for i in range(1000)])
+    logger.summary("Файлы", ["a", "b"])
+
+    assert messages == [
+        "Файлы (1000), первые 3: file_0, file_1, file_2, ...",
+        "Файлы (2): ['a', 'b']",
+    ]
+
+
+def test_logger_throttled_reports_suppressed(monkeypatch):
+    messages = []
+    monkeypatch.setattr(logger, "file_rate", 2)
+    monkeypatch.setattr(
+        logger.logger, "log", lambda level, message: messages.append(message)
+    )
+
+    for i in range(5):
+        logger.throttled("upload", f"upload {i}")
+    logger.throttled("delete", "delete 0")
+    logger.flush_suppressed()
+
+    assert messages == [
+        "upload 0",
+        "upload 1",
+        "delete 0",
+        "Пропущено сообщений (upload): 3",
+    ]
@@ -0,0 +1,74 @@
+import json
+import time
+import urllib.request
+
+from synch.utils.executor import OperationResult
+from synch.utils.metrics import SyncMetrics
+
+
+def test_nested_phases_are_exclusive():
+    metrics = SyncMetrics()
+    metrics.begin_cycle("reconcile")
+
+    with metrics.phase("diff"):
+        for _ in metrics.timed_iter(iter(range(2)), "listing"):
+            time.sleep(0.02)
+        with metrics.phase("transfer"):
+            time.sleep(0.05)
+
+    summary = metrics.end_cycle()
+    phases = summary["phases"]
+
+    assert phases["transfer"] >= 0.05
+    assert 0.04 <= phases["diff"] < 0.05
+    assert phases["listing"] < 0.01
+    assert sum(phases.values()) <= summary["seconds"]
+
+
+def test_cycle_summary_and_prometheus_textfile(tmp_path):
+    textfile = tmp_path / "synch.prom"
+    metrics = SyncMetrics(str(textfile))
+
+    metrics.begin_cycle("state", {"api_calls": 10, "retries": 1})
+    metrics.record_operations(
+        [
+            OperationResult("upload", "a", {"status": "Success"}, seconds=0.5),
+            OperationResult("reload", "b", {"status": "Error"}, seconds=0.25),
+            OperationResult("delete", "c", cancelled=True),
+        ],
+        {"a": 100, "b": 200},
+    )
+    summary = metrics.end_cycle({"api_calls": 15, "retries": 3}, queue_peak=3)
+
+    assert summary["api_calls"] == 5
+    assert summary["retries"] == 2
+    assert summary["transferred_bytes"] == 100
+    assert summary["failed"] == 1
+    assert summary["queue_peak"] == 3
+    assert summary["operations"]["upload"] == {"count": 1, "seconds": 0.5}
+    json.dumps(summary)
+
+    text = textfile.read_text()
+    assert 'synch_cycles_total{mode="state"} 1' in text
+    assert 'synch_operations_total{operation="reload",status="failed"} 1' in text
+    assert 'synch_operations_total{operation="delete",status="cancelled"} 1' in text
+    assert "synch_transferred_bytes_total 100" in text
+    assert "synch_api_calls_total 5" in text
+    assert "synch_queue_depth_peak 3" in text
+
+
+def test_metrics_http_endpoint():
+    metrics = SyncMetrics()
+    metrics.begin_cycle("changed")
+    metrics.end_cycle()
+    metrics.serve(0)
+
+    try:
+        with urllib.request.urlopen(
+            f"http://127.0.0.1:{metrics.port}/metrics", timeout=5
+        ) as response:
+            body = response.read().decode()
+    finally:
+        metrics.stop()
+
+    assert 'synch_cycles_total{mode="changed"} 1' in body
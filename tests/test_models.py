@@ -0,0 +1,34 @@
+import os
+
+from synch.core.models import FileEntry
+
+
+def test_from_remote_parses_modified_once():
+    entry = FileEntry.from_remote(
+        {
+            "name": "file1",
+            "modified": "2014-04-22T10:32:49+04:00",
+            "path": "disk:/foo/file1",
+            "type": "file",
+            "size": 10,
+            "md5": "hash",
+        }
+    )
+
+    assert entry.mtime_ns == 1398148369 * 1_000_000_000
+    assert entry.size == 10
+    assert entry.md5 == "hash"
+    assert entry.modified == "2014-04-22T06:32:49+00:00"
+
+
+def test_from_stat(tmp_path):
+    path = tmp_path / "file1"
+    path.write_bytes(b"12345")
+    file_stat = os.stat(path)
+
+    entry = FileEntry.from_stat("file1", str(path), file_stat)
+
+    assert entry.size == 5
+    assert entry.mtime_ns == file_stat.st_mtime_ns
+    assert entry.inode == file_stat.st_ino
+    assert not hasattr(entry, "__dict__")
@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+
+import pytest
+
+from synch.utils import multi_synchronize
+from synch.utils.multi_synchronize import (
+    MultiSynchronizer,
+    SyncPair,
+    load_pairs,
+    split_workers,
+)
+from tests.fake_disk_server import FakeDiskServer
+
+
+def test_split_workers_by_weight():
+    assert split_workers(4, [1, 1]) == [2, 2]
+    assert split_workers(4, [2, 1]) == [3, 1]
+    assert split_workers(8, [5, 1]) == [7, 1]
+    assert split_workers(2, [1, 1, 1]) == [1, 1, 1]
+
+
+def test_load_pairs(tmp_path):
+    filename = tmp_path / "pairs.json"
+    filename.write_text(
+        json.dumps(
+            [
+                {"name": "docs", "local": "/docs", "remote": "docs", "weight": 2},
+                {"name": "photo", "local": "/photo", "remote": "photo", "token": "t"},
+            ]
+        )
+    )
+
+    pairs = load_pairs(str(filename))
+
+    assert pairs == [
+        SyncPair("docs", "/docs", "docs", weight=2),
+        SyncPair("photo", "/photo", "photo", token="t"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        [],
+        [{"name": "a b", "local": "/a", "remote": "a"}],
+        [{"name": "a", "local": "/a"}],
+        [{"name": "a", "local": "/a", "remote": "a", "unknown": 1}],
+        [{"name": "a", "local": "/a", "remote": "a", "weight": 0}],
+        [
+            {"name": "a", "local": "/a", "remote": "a"},
+            {"name": "a", "local": "/b", "remote": "b"},
+        ],
+    ],
+)
+def test_load_pairs_rejects_invalid(tmp_path, items):
+    filename = tmp_path / "pairs.json"
+    filename.write_text(json.dumps(items))
+
+    with pytest.raises(ValueError):
+        load_pairs(str(filename))
+
+
+def test_pairs_share_sessions_and_metrics(monkeypatch, tmp_path):
+    for name in ("docs", "photo"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.txt").write_bytes(name.encode())
+
+    with FakeDiskServer() as server:
+        monkeypatch.setitem(multi_synchronize.config, "yandex_api_host", server.url)
+        monkeypatch.setitem(multi_synchronize.config, "synch_state", "false")
+        monkeypatch.setitem(multi_synchronize.config, "synch_workers", "3")
+        monkeypatch.setitem(multi_synchronize.config, "synch_stable_period", "0")
+        synchronizer = MultiSynchronizer(
+            [
+                SyncPair("docs", str(tmp_path / "docs"), "docs", "token1", 2),
+                SyncPair("photo", str(tmp_path / "photo"), "photo", "token2"),
+            ]
+        )
+        docs, photo = synchronizer.synchronizers
+
+        synchronizer.sync_all()
+
+        assert [docs.workers, photo.workers] == [2, 1]
+        assert docs.cloud_drive.api_session is photo.cloud_drive.api_session
+        assert set(server.files) == {"docs/docs.txt", "photo/photo.txt"}
+        assert server.tokens == {"OAuth token1", "OAuth token2"}
+
+        text = synchronizer.metrics.render()
+        assert text.count("# TYPE synch_cycles_total counter") == 1
+        assert 'synch_cycles_total{pair="docs",mode="reconcile"} 1' in text
+        assert 'synch_cycles_total{pair="photo",mode="reconcile"} 1' in text
+
+        for item in synchronizer.synchronizers:
+            item.close()
+        synchronizer.sessions.close()
+
+
+def test_pair_delay_outside_global_range(monkeypatch, tmp_path):
+    monkeypatch.setitem(multi_synchronize.config, "synch_state", "false")
+    monkeypatch.setitem(multi_synchronize.config, "synch_min_delay", "30")
+    monkeypatch.setitem(multi_synchronize.config, "synch_max_delay", "300")
+    synchronizer = MultiSynchronizer(
+        [
+            SyncPair("slow", str(tmp_path), "slow", delay=600),
+            SyncPair("fast", str(tmp_path), "fast", delay=5),
+            SyncPair("bounded", str(tmp_path), "b", delay=600, max_delay=900),
+        ]
+    )
+    slow, fast, bounded = (item.scheduler for item in synchronizer.synchronizers)
+    synchronizer.close()
+
+    assert (slow.interval, slow.min_delay, slow.max_delay) == (600, 30, 600)
+    assert slow.next_delay(False) == 600
+    assert (fast.interval, fast.min_delay, fast.max_delay) == (5, 5, 300)
+    assert (bounded.interval, bounded.max_delay) == (600, 900)
+
+
+def test_print_plan_for_each_pair(monkeypatch, tmp_path, capsys):
+    for name in ("docs", "photo"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.txt").write_bytes(name.encode())
+
+    with FakeDiskServer() as server:
+        monkeypatch.setitem(multi_synchronize.config, "yandex_api_host", server.url)
+        monkeypatch.setitem(multi_synchronize.config, "synch_state", "false")
+        synchronizer = MultiSynchronizer(
+            [
+                SyncPair("docs", str(tmp_path / "docs"), "docs", "token1"),
+                SyncPair("photo", str(tmp_path / "photo"), "photo", "token2"),
+            ]
+        )
+        try:
+            synchronizer.print_plan()
+        finally:
+            synchronizer.close()
+
+        output = capsys.readouterr().out
+        assert "Пара docs:" in output and "docs.txt" in output
+        assert "Пара photo:" in output and "photo.txt" in output
+        assert server.files == {}
+
+
+def test_shared_scheduler_runs_pairs_until_stopped(monkeypatch, tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+
+    with FakeDiskServer() as server:
+        monkeypatch.setitem(multi_synchronize.config, "yandex_api_host", server.url)
+        monkeypatch.setitem(multi_synchronize.config, "synch_state", "false")
+        synchronizer = MultiSynchronizer(
+            [
+                SyncPair("a", str(tmp_path / "a"), "a", delay=0),
+                SyncPair("b", str(tmp_path / "b"), "b", delay=60),
+            ]
+        )
+        first, second = (item.metrics for item in synchronizer.synchronizers)
+        thread = threading.Thread(target=synchronizer.start_sync)
+        thread.start()
+
+        deadline = time.monotonic() + 5
+        while sum(first.cycles.values()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        synchronizer.stop_sync()
+        thread.join(5)
+
+        assert not thread.is_alive()
+        assert sum(first.cycles.values()) >= 3
+        assert sum(second.cycles.values()) == 1
@@ -0,0 +1,178 @@
+from synch.core.models import FileEntry
+from synch.utils.planner import (
+    COPY,
+    DELETE,
+    MOVE,
+    RELOAD,
+    UPLOAD,
+    Operation,
+    plan_from_state,
+    plan_reconcile,
+    prioritize,
+    resume_journal,
+)
+from synch.utils.state import FileState, JournalEntry
+
+
+def local(name, size=1, mtime_ns=100):
+    return FileEntry(name, size, mtime_ns)
+
+
+def remote(name, size=1, mtime_ns=100, md5=None):
+    return FileEntry(name, size, mtime_ns, md5=md5)
+
+
+def kinds(plan):
+    return sorted(
+        (operation.kind, operation.file_name, operation.source, operation.md5)
+        for operation in plan.operations
+    )
+
+
+def test_plan_reconcile():
+    local_files = {
+        "same": local("same"),
+        "newer": local("newer", size=2, mtime_ns=200),
+        "touched": local("touched", mtime_ns=200),
+        "new": local("new"),
+    }
+    plan = plan_reconcile(
+        local_files,
+        [
+            remote("same", md5="a"),
+            remote("newer"),
+            remote("touched", md5="b"),
+            remote("gone"),
+        ],
+    )
+
+    assert kinds(plan) == [
+        (DELETE, "gone", None, None),
+        (RELOAD, "newer", None, None),
+        (RELOAD, "touched", None, "b"),
+        (UPLOAD, "new", None, None),
+    ]
+    assert [item.name for item in plan.verified] == ["same"]
+    assert plan.local_files is local_files
+
+
+def test_plan_reconcile_detects_move_and_copy():
+    hashed = []
+
+    def hash_files(names):
+        hashed.extend(names)
+        return {"renamed": "moved", "duplicate": "copied", "other": "x"}
+
+    plan = plan_reconcile(
+        {
+            "renamed": local("renamed", size=5),
+            "original": local("original", size=6),
+            "duplicate": local("duplicate", size=6),
+            "other": local("other", size=7),
+        },
+        [
+            remote("old_name", size=5, md5="moved"),
+            remote("original", size=6, md5="copied"),
+        ],
+        hash_files,
+    )
+
+    assert kinds(plan) == [
+        (COPY, "duplicate", "original", None),
+        (MOVE, "renamed", "old_name", None),
+        (UPLOAD, "other", None, None),
+    ]
+    assert sorted(hashed) == ["duplicate", "renamed"]
+
+
+def test_plan_from_state():
+    plan = plan_from_state(
+        {
+            "same": local("same"),
+            "resized": local("resized", size=2),
+            "touched": local("touched", mtime_ns=200),
+            "new": local("new"),
+        },
+        {
+            "same": FileState("same", 1, 100, "a"),
+            "resized": FileState("resized", 1, 100, "b"),
+            "touched": FileState("touched", 1, 100, "c"),
+            "gone": FileState("gone", 1, 100, "d"),
+        },
+    )
+
+    assert kinds(plan) == [
+        (DELETE, "gone", None, None),
+        (RELOAD, "new", None, None),
+        (RELOAD, "resized", None, None),
+        (RELOAD, "touched", None, "c"),
+    ]
+    assert plan.verified is None
+
+
+def test_resume_journal():
+    plan = plan_from_state(
+        {
+            "renamed": local("renamed", size=5),
+            "uploaded": local("uploaded"),
+            "edited": local("edited", mtime_ns=300),
+        },
+        {"uploaded": FileState("uploaded", 1, 100)},
+    )
+
+    resume_journal(
+        plan,
+        [
+            JournalEntry(MOVE, "renamed", 5, 100, "old_name"),
+            JournalEntry(UPLOAD, "uploaded", 1, 100),
+            JournalEntry(UPLOAD, "edited", 1, 100),
+            JournalEntry(DELETE, "gone", 1, 0),
+            JournalEntry(DELETE, "renamed", 1, 0),
+        ],
+    )
+
+    assert kinds(plan) == [
+        (DELETE, "gone", None, None),
+        (MOVE, "renamed", "old_name", None),
+        (RELOAD, "edited", None, None),
+        (RELOAD, "uploaded", None, None),
+    ]
+
+
+def test_prioritize_small_files_first_and_deletes_last():
+    operations = [
+        Operation(DELETE, "d"),
+        Operation(UPLOAD, "big", 100),
+        Operation(RELOAD, "small", 1),
+        Operation(MOVE, "m", 50, "src"),
+    ]
+
+    assert [item.file_name for item in prioritize(operations)] == [
+        "m",
+        "small",
+        "big",
+        "d",
+    ]
+    assert [item.file_name for item in prioritize(operations, False)] == [
+        "m",
+        "big",
+        "small",
+        "d",
+    ]
+
+
+def test_planner_scales_linearly():
+    from tests.benchmark_planner import make_snapshots
+
+    local_files, remote_files, known_files = make_snapshots(10_000)
+
+    plan = plan_reconcile(local_files, remote_files)
+    counts = plan.counts()
+
+    assert counts[UPLOAD] == counts[DELETE] == 100
+    assert counts[RELOAD] == 100
+    assert len(plan.verified) == 9_800
+    assert plan_from_state(local_files, known_files).counts() == {
+        RELOAD: 200,
+        DELETE: 100,
+    }
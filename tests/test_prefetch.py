@@ -0,0 +1,50 @@
+import threading
+
+from synch.cloud_storage.prefetch import UploadUrlPrefetcher
+
+
+def make_prefetcher(depth, ttl=300):
+    requested = []
+    lock = threading.Lock()
+
+    def request(file_name, overwrite):
+        with lock:
+            requested.append(file_name)
+        return f"href/{file_name}/{overwrite}"
+
+    return UploadUrlPrefetcher(request, depth, ttl), requested
+
+
+def test_urls_are_requested_ahead_in_queue_order():
+    prefetcher, requested = make_prefetcher(depth=2)
+
+    prefetcher.queue([("a", False), ("b", True), ("c", False)])
+    assert prefetcher.take("a", False) == "href/a/False"
+    assert prefetcher.take("b", True) == "href/b/True"
+    assert prefetcher.take("c", False) == "href/c/False"
+
+    assert sorted(requested) == ["a", "b", "c"]
+    assert prefetcher.hits == 3
+    prefetcher.shutdown()
+
+
+def test_file_taken_out_of_order_is_not_requested():
+    prefetcher, requested = make_prefetcher(depth=1)
+
+    prefetcher.queue([("a", False), ("b", False), ("c", False)])
+    assert prefetcher.take("c", False) is None
+    assert prefetcher.take("a", False) == "href/a/False"
+    assert prefetcher.take("b", False) == "href/b/False"
+
+    assert sorted(requested) == ["a", "b"]
+    prefetcher.shutdown()
+
+
+def test_stale_urls_are_not_used():
+    prefetcher, _ = make_prefetcher(depth=2, ttl=0)
+
+    prefetcher.queue([("a", False)])
+
+    assert prefetcher.take("a", False) is None
+    assert prefetcher.stale == 1
+    prefetcher.shutdown()
@@ -0,0 +1,179 @@
+import io
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from synch.cloud_storage.retry import (
+    NETWORK,
+    SERVER,
+    THROTTLE,
+    RetryPolicy,
+    RetrySession,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Отдает заранее заданные ответы (код или исключение) по очереди."""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.bodies = []
+
+    def send(self, request, **kwargs):
+        body = request.body
+        self.bodies.append(body.read() if hasattr(body, "read") else body)
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step if isinstance(step, tuple) else (step, {})
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response.raw = io.BytesIO(b"")
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_session(script, **policy):
+    policy.setdefault("base_delay", 0)
+    session = RetrySession(RetryPolicy(**policy))
+    adapter = ScriptedAdapter(script)
+    session.mount("http://", adapter)
+    return session, adapter
+
+
+def test_retries_server_errors_until_success():
+    session, adapter = make_session([503, 500, 200])
+
+    response = session.get("http://disk/resource")
+
+    assert response.status_code == 200
+    assert session.retries == 2
+    assert adapter.script == []
+
+
+def test_budget_is_per_error_class():
+    session, adapter = make_session(
+        [503, 429, 503, 200],
+        budgets={THROTTLE: 1, SERVER: 1, NETWORK: 0},
+    )
+
+    response = session.get("http://disk/resource")
+
+    assert response.status_code == 503
+    assert adapter.script == [200]
+
+
+def test_client_errors_are_not_retried():
+    session, adapter = make_session([409, 200])
+
+    assert session.get("http://disk/resource").status_code == 409
+    assert session.retries == 0
+
+
+def test_network_error_is_raised_after_budget():
+    session, _ = make_session(
+        [requests.ConnectionError("reset"), requests.Timeout("slow")],
+        budgets={NETWORK: 1},
+    )
+
+    with pytest.raises(requests.Timeout):
+        session.get("http://disk/resource")
+    assert session.retries == 1
+
+
+def test_retry_after_overrides_backoff():
+    session, _ = make_session([(429, {"Retry-After": "0.2"}), 200], max_delay=5)
+    start = time.monotonic()
+
+    assert session.get("http://disk/resource").status_code == 200
+    assert time.monotonic() - start >= 0.2
+
+
+def test_retry_after_is_capped_by_max_delay():
+    session, _ = make_session([(429, {"Retry-After": "3600"}), 200], max_delay=0.1)
+    start = time.monotonic()
+
+    assert session.get("http://disk/resource").status_code == 200
+    assert time.monotonic() - start < 1
+
+
+def test_stop_event_interrupts_retry_wait():
+    session, adapter = make_session([503, 200], base_delay=60, max_delay=60)
+    session.stop_event.set()
+
+    assert session.get("http://disk/resource").status_code == 503
+    assert adapter.script == [200]
+
+
+def test_sent_post_is_not_retried_after_network_error():
+    session, adapter = make_session(
+        [requests.ConnectionError("reset"), 201], budgets={NETWORK: 3}
+    )
+
+    with pytest.raises(requests.ConnectionError):
+        session.post("http://disk/move")
+    assert session.retries == 0
+    assert adapter.script == [201]
+
+
+def test_unsent_post_is_retried():
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    error = requests.ConnectionError(
+        MaxRetryError(None, "/move", NewConnectionError(None, "refused"))
+    )
+    session, _ = make_session([error, requests.ConnectTimeout("slow"), 201])
+
+    assert session.post("http://disk/move").status_code == 201
+    assert session.retries == 2
+
+
+def test_file_body_is_rewound_before_retry():
+    session, adapter = make_session([500, 201])
+
+    response = session.put("http://upload/file", data=io.BytesIO(b"payload"))
+
+    assert response.status_code == 201
+    assert adapter.bodies == [b"payload", b"payload"]
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+
+    assert all(0 <= policy.backoff(attempt) <= 5 for attempt in range(20))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+def test_token_bucket_pause_blocks_all_callers():
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.1)
+
+    start = time.monotonic()
+    bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09
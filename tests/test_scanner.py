@@ -0,0 +1,71 @@
+import pytest
+
+from synch.utils.scanner import get_local_files_with_mtime
+
+
+@pytest.fixture
+def local_folder(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    for name in ("file1", "a/file2", "a/b/file3", "c/file4"):
+        (tmp_path / name).write_bytes(name.encode())
+    return tmp_path
+
+
+def test_scan_top_level_only(local_folder):
+    files = get_local_files_with_mtime(str(local_folder))
+
+    assert [file.name for file in files] == ["file1"]
+    assert files[0].size == len(b"file1")
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scan_recursive(local_folder, workers):
+    files = get_local_files_with_mtime(str(local_folder), True, workers)
+
+    assert sorted(file.name for file in files) == [
+        "a/b/file3",
+        "a/file2",
+        "c/file4",
+        "file1",
+    ]
+    assert all(file.path == str(local_folder / file.name) for file in files)
+
+
+def test_scan_missing_folder(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        get_local_files_with_mtime(str(tmp_path / "missing"))
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scan_skips_unreadable_subfolder(local_folder, monkeypatch, workers):
+    import os
+
+    from synch.utils import scanner
+
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if os.path.basename(path) == "a":
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", failing_scandir)
+    skipped: set[str] = set()
+
+    files = get_local_files_with_mtime(str(local_folder), True, workers, None, skipped)
+
+    assert sorted(file.name for file in files) == ["c/file4", "file1"]
+    assert skipped == {"a"}
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scan_skips_ignored(local_folder, workers):
+    from synch.utils.ignore import IgnoreRules
+
+    (local_folder / "a" / "file2.swp").write_bytes(b"swap")
+    rules = IgnoreRules(["*.swp", "b/", "c"])
+
+    files = get_local_files_with_mtime(str(local_folder), True, workers, rules)
+
+    assert sorted(file.name for file in files) == ["a/file2", "file1"]
@@ -0,0 +1,19 @@
+from synch.utils.scheduler import AdaptiveScheduler
+
+
+def test_interval_shrinks_on_changes_and_backs_off_when_idle():
+    scheduler = AdaptiveScheduler(min_delay=10, max_delay=100, initial=40)
+
+    assert scheduler.next_delay(changed=True) == 20
+    assert scheduler.next_delay(changed=True) == 10
+    assert scheduler.next_delay(changed=True) == 10
+    assert scheduler.next_delay(changed=False) == 15
+    for _ in range(10):
+        delay = scheduler.next_delay(changed=False)
+    assert delay == 100
+
+
+def test_equal_bounds_keep_fixed_interval():
+    scheduler = AdaptiveScheduler(min_delay=30, max_delay=30)
+
+    assert scheduler.next_delay(True) == scheduler.next_delay(False) == 30
@@ -0,0 +1,79 @@
+from synch.utils.state import FileState, JournalEntry, SyncState
+
+
+def test_state_upsert_and_load(tmp_path):
+    state = SyncState(str(tmp_path / "state.sqlite3"))
+    assert state.is_empty()
+
+    state.upsert([FileState("file1", 10, 100), FileState("file2", 20, 200, "md5")])
+    state.upsert([FileState("file1", 11, 110)])
+    state.remove(["file2"])
+
+    assert state.load() == {"file1": FileState("file1", 11, 110)}
+    state.close()
+
+
+def test_upsert_keeps_remote_revision(tmp_path):
+    state = SyncState(str(tmp_path / "state.sqlite3"))
+    state.replace_all([FileState("file1", 10, 100, "md5", 3)])
+    state.upsert([FileState("file1", 11, 110, "new")])
+
+    assert state.get("file1") == FileState("file1", 11, 110, "new", 3)
+    state.close()
+
+
+def test_state_persists_between_connections(tmp_path):
+    db_path = str(tmp_path / "state.sqlite3")
+    state = SyncState(db_path)
+    state.replace_all([FileState("file1", 10, 100, "md5", 3)])
+    state.set_meta("verified_at", "123.5")
+    state.close()
+
+    state = SyncState(db_path)
+    assert state.load() == {"file1": FileState("file1", 10, 100, "md5", 3)}
+    assert state.get_meta("verified_at") == "123.5"
+    assert state.get_meta("missing", "0") == "0"
+    state.close()
+
+
+def test_journal_survives_restart(tmp_path):
+    db_path = str(tmp_path / "state.sqlite3")
+    state = SyncState(db_path)
+    state.upsert([FileState("stale", 1, 1)])
+    cycle = state.journal_begin(
+        [
+            JournalEntry("upload", "new", 10, 100),
+            JournalEntry("move", "renamed", 20, 200, "old"),
+            JournalEntry("delete", "gone", 30, 0),
+        ],
+        verified=[FileState("same", 5, 50, "md5")],
+    )
+    state.journal_complete(cycle, 0, FileState("new", 10, 100))
+    state.close()
+
+    state = SyncState(db_path)
+    assert state.journal_pending() == [
+        JournalEntry("move", "renamed", 20, 200, "old"),
+        JournalEntry("delete", "gone", 30, 0),
+    ]
+    assert state.load() == {
+        "same": FileState("same", 5, 50, "md5"),
+        "new": FileState("new", 10, 100),
+    }
+    assert float(state.get_meta("verified_at", "0")) > 0
+
+    assert state.journal_begin([]) == cycle + 1
+    assert state.journal_pending() == []
+    state.close()
+
+
+def test_stale_journal_completion_is_ignored(tmp_path):
+    state = SyncState(str(tmp_path / "state.sqlite3"))
+    old_cycle = state.journal_begin([JournalEntry("upload", "old", 10, 100)])
+    state.journal_begin([JournalEntry("upload", "new", 20, 200)])
+
+    state.journal_complete(old_cycle, 0, FileState("old", 10, 100))
+
+    assert state.journal_pending() == [JournalEntry("upload", "new", 20, 200)]
+    assert state.load() == {}
+    state.close()
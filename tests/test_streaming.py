@@ -0,0 +1,31 @@
+import io
+import time
+
+import pytest
+
+from synch.cloud_storage.streaming import UploadStalledError, UploadStream
+
+
+def test_stream_reads_chunks_up_to_announced_size():
+    file = io.BytesIO(b"0123456789")
+    stream = UploadStream(file, "file1", 8, chunk_size=3)
+
+    assert len(stream) == 8
+    assert [stream.read(), stream.read(), stream.read(), stream.read()] == [
+        b"012",
+        b"345",
+        b"67",
+        b"",
+    ]
+    assert stream.seek(0) == 0
+    assert stream.read() == b"012"
+
+
+def test_slow_chunk_aborts_upload():
+    stream = UploadStream(io.BytesIO(b"0123"), "file1", 4, 2, stall_timeout=0.01)
+
+    stream.read()
+    time.sleep(0.02)
+
+    with pytest.raises(UploadStalledError):
+        stream.read()
@@ -1,15 +1,27 @@
+import hashlib
 import os
 import time
 import pytest
 from synch.cloud_storage.yandex import YandexDiskClient
 from synch.core.config import config
 from synch.core.log_config import logger
+from synch.core.models import FileEntry
+from synch.utils import scanner
+from synch.utils.ignore import IgnoreRules
+from synch.utils.planner import SyncPlan
+from synch.utils.state import FileState
 from synch.utils.synchronize import Synchronizer
 
 
 @pytest.fixture
-def synchronizer():
-    return Synchronizer()
+def synchronizer(tmp_path_factory):
+    # Состояние хранится отдельно от локальной папки тестов.
+    synchronizer = Synchronizer(
+        state_mode="true",
+        state_path=str(tmp_path_factory.mktemp("state") / "state.sqlite3"),
+    )
+    yield synchronizer
+    synchronizer.close()
 
 
 def test_init(synchronizer):
@@ -19,31 +31,6 @@ def test_init(synchronizer):
     assert synchronizer.delay == int(str(config.get("synch_delay", "30")))
 
 
-def test_find_name_in_remote_files(synchronizer):
-    remote_files = [
-        {
-            "name": "file1",
-            "modified": "2022-01-25T10:32:49+00:00",
-            "path": "full_path",
-            "type": "file",
-        },
-        {
-            "name": "file2",
-            "modified": "2022-11-25T10:32:49+00:00",
-            "path": "full_path",
-            "type": "file",
-        },
-    ]
-    assert synchronizer._Synchronizer__find_name_in_remote_files(
-        "file1", remote_files
-    ) == {
-        "name": "file1",
-        "modified": "2022-01-25T10:32:49+00:00",
-        "path": "full_path",
-        "type": "file",
-    }
-
-
 def test_remove_remote_file_by_name(synchronizer):
     remote_files = [
         {
@@ -74,12 +61,14 @@ def test_remove_remote_file_by_name(synchronizer):
 def test_sync_files(synchronizer, monkeypatch):
     def mock_get_info(*args):
         return [
-            {
-                "name": "file1",
-                "modified": "2022-01-25T10:32:49+00:00",
-                "path": "full_path",
-                "type": "file",
-            }
+            FileEntry.from_remote(
+                {
+                    "name": "file1",
+                    "modified": "2022-01-25T10:32:49+00:00",
+                    "path": "full_path",
+                    "type": "file",
+                }
+            )
         ]
 
     def mock_reload(*args):
@@ -92,9 +81,362 @@ def test_sync_files(synchronizer, monkeypatch):
         pass
 
     monkeypatch.setattr(synchronizer.cloud_drive, "get_info", mock_get_info)
+    monkeypatch.setattr(synchronizer.cloud_drive, "iter_info", mock_get_info)
     monkeypatch.setattr(synchronizer.cloud_drive, "reload", mock_reload)
     monkeypatch.setattr(synchronizer.cloud_drive, "upload", mock_upload)
     monkeypatch.setattr(synchronizer.cloud_drive, "delete", mock_delete)
 
     synchronizer.sync_files()
 
+
+def test_sync_changed(synchronizer, monkeypatch, tmp_path):
+    (tmp_path / "file1").write_bytes(b"1")
+    calls = []
+
+    def mock_reload(file_name):
+        calls.append(("reload", file_name))
+
+    def mock_delete(file_name, missing_ok=False):
+        calls.append(("delete", file_name))
+
+    synchronizer.local_path = str(tmp_path)
+    synchronizer.state.upsert([FileState("file2", 1, 1), FileState("file3", 1, 1)])
+    monkeypatch.setattr(synchronizer.cloud_drive, "reload", mock_reload)
+    monkeypatch.setattr(synchronizer.cloud_drive, "delete", mock_delete)
+
+    # file4 в облако не загружался, поэтому запрос на удаление не нужен.
+    synchronizer.sync_changed(
+        {"file1": "changed", "file2": "changed", "file3": "deleted", "file4": "deleted"}
+    )
+
+    assert sorted(calls) == [
+        ("delete", "file2"),
+        ("delete", "file3"),
+        ("reload", "file1"),
+    ]
+
+
+def test_sync_files_from_state(synchronizer, monkeypatch, tmp_path):
+    local_folder = tmp_path / "local"
+    local_folder.mkdir()
+    (local_folder / "unchanged").write_bytes(b"1")
+    (local_folder / "changed").write_bytes(b"2")
+    (local_folder / "new").write_bytes(b"3")
+    unchanged = os.stat(local_folder / "unchanged")
+
+    state = synchronizer.state
+    state.replace_all(
+        [
+            FileState("unchanged", unchanged.st_size, unchanged.st_mtime_ns),
+            FileState("changed", 1, 1),
+            FileState("removed", 1, 1),
+        ]
+    )
+    state.set_meta("verified_at", str(time.time()))
+
+    calls = []
+
+    def mock_reload(file_name):
+        calls.append(("reload", file_name))
+        return {"status": "Success"}
+
+    def mock_delete(file_name, missing_ok=False):
+        calls.append(("delete", file_name))
+        return {"status": "Success"}
+
+    def mock_iter_info():
+        raise AssertionError("список файлов в облаке не должен запрашиваться")
+
+    synchronizer.local_path = str(local_folder)
+    monkeypatch.setattr(synchronizer.cloud_drive, "reload", mock_reload)
+    monkeypatch.setattr(synchronizer.cloud_drive, "delete", mock_delete)
+    monkeypatch.setattr(synchronizer.cloud_drive, "iter_info", mock_iter_info)
+
+    synchronizer.sync_files()
+
+    assert sorted(calls) == [
+        ("delete", "removed"),
+        ("reload", "changed"),
+        ("reload", "new"),
+    ]
+    assert sorted(state.load()) == ["changed", "new", "unchanged"]
+    # Хэш загруженного файла сохраняется, чтобы его переименование
+    # распознавалось без повторной загрузки.
+    assert state.load()["new"].hash == hashlib.md5(b"3").hexdigest()
+
+
+def test_touched_file_is_not_reloaded(synchronizer, monkeypatch, tmp_path):
+    local_folder = tmp_path / "local"
+    local_folder.mkdir()
+    (local_folder / "touched").write_bytes(b"same")
+
+    state = synchronizer.state
+    state.replace_all([FileState("touched", 4, 1, hashlib.md5(b"same").hexdigest())])
+    state.set_meta("verified_at", str(time.time()))
+    calls = []
+
+    synchronizer.local_path = str(local_folder)
+    monkeypatch.setattr(
+        synchronizer.cloud_drive, "reload", lambda file_name: calls.append(file_name)
+    )
+
+    synchronizer.sync_files()
+
+    assert calls == []
+    assert (
+        state.load()["touched"].mtime_ns
+        == os.stat(local_folder / "touched").st_mtime_ns
+    )
+
+
+def test_rename_and_duplicate_use_server_side_operations(
+    synchronizer, monkeypatch, tmp_path
+):
+    (tmp_path / "renamed").write_bytes(b"moved content")
+    (tmp_path / "original").write_bytes(b"copied content")
+    (tmp_path / "duplicate").write_bytes(b"copied content")
+
+    def mock_iter_info():
+        for name, content in (
+            ("old_name", b"moved content"),
+            ("original", b"copied content"),
+        ):
+            yield FileEntry.from_remote(
+                {
+                    "name": name,
+                    "modified": "2100-01-01T00:00:00+00:00",
+                    "path": f"disk:/remote/{name}",
+                    "type": "file",
+                    "size": len(content),
+                    "md5": hashlib.md5(content).hexdigest(),
+                }
+            )
+
+    calls = []
+
+    def record(operation):
+        def mock(*args):
+            calls.append((operation, *args))
+            return {"status": "Success"}
+
+        return mock
+
+    synchronizer.local_path = str(tmp_path)
+    monkeypatch.setattr(synchronizer.cloud_drive, "iter_info", mock_iter_info)
+    for operation in ("upload", "reload", "delete", "move", "copy"):
+        monkeypatch.setattr(synchronizer.cloud_drive, operation, record(operation))
+
+    synchronizer.sync_files(verify=True)
+
+    assert sorted(calls) == [
+        ("copy", "duplicate", "original"),
+        ("move", "renamed", "old_name"),
+    ]
+
+
+def test_files_being_written_are_deferred(synchronizer, monkeypatch, tmp_path):
+    (tmp_path / "old").write_bytes(b"old")
+    (tmp_path / "writing").write_bytes(b"partial")
+    past = time.time() - 60
+    os.utime(tmp_path / "old", (past, past))
+    calls = []
+
+    def mock_reload(file_name):
+        calls.append(file_name)
+        return {"status": "Success"}
+
+    synchronizer.local_path = str(tmp_path)
+    synchronizer.stable_period = 30
+    monkeypatch.setattr(synchronizer.cloud_drive, "reload", mock_reload)
+
+    synchronizer.sync_changed({"old": "changed", "writing": "changed"})
+
+    assert calls == ["old"]
+    assert synchronizer.deferred == {"writing"}
+
+
+def test_file_changed_during_upload_is_requeued(synchronizer, monkeypatch, tmp_path):
+    (tmp_path / "file1").write_bytes(b"content")
+    statuses = iter(["Changed", "Success"])
+    calls = []
+
+    def mock_reload(file_name):
+        calls.append(file_name)
+        return {"status": next(statuses)}
+
+    synchronizer.local_path = str(tmp_path)
+    synchronizer.stable_period = 0
+    monkeypatch.setattr(synchronizer.cloud_drive, "reload", mock_reload)
+
+    synchronizer.sync_changed({"file1": "changed"})
+    assert synchronizer.requeued == {"file1"}
+
+    synchronizer.execute(
+        SyncPlan("state", [], {"file1": FileEntry("file1", 7, 1)}),
+    )
+    assert calls == ["file1", "file1"]
+    assert synchronizer.requeued == set()
+
+
+def test_interrupted_cycle_resumes_without_reconcile(
+    disk_server, local_folder, make_server_synchronizer
+):
+    for index in range(6):
+        (local_folder / f"file{index}").write_bytes(b"content")
+
+    first = make_server_synchronizer(workers=1)
+    upload = first.cloud_drive.upload
+
+    def upload_and_crash(file_name):
+        result = upload(file_name)
+        if disk_server.uploaded == 2:
+            first.executor.cancel()
+        return result
+
+    first.cloud_drive.upload = upload_and_crash
+    first.sync_files()
+    first.close()
+    assert disk_server.uploaded == 2
+
+    second = make_server_synchronizer(workers=1)
+    listings = disk_server.requests.count(("GET", "/v1/disk/resources"))
+    second.sync_files()
+
+    assert second.metrics.last_cycle["mode"] == "state"
+    assert disk_server.requests.count(("GET", "/v1/disk/resources")) == listings
+    assert disk_server.uploaded == 6
+    assert len(disk_server.files) == 6
+
+
+def test_unconfirmed_async_deletes_are_retried(
+    disk_server, local_folder, server_synchronizer
+):
+    remote_path = server_synchronizer.remote_path
+    for index in range(3):
+        (local_folder / f"file{index}").write_bytes(b"content")
+
+    server_synchronizer.cloud_drive.async_delete = True
+    server_synchronizer.cloud_drive.poll_interval = 0.01
+    server_synchronizer.sync_files()
+
+    for index in range(3):
+        (local_folder / f"file{index}").unlink()
+    disk_server.operation_polls = 1
+    disk_server.failed_deletes = {f"{remote_path}/file1"}
+    server_synchronizer.sync_files()
+
+    assert sorted(disk_server.files) == [f"{remote_path}/file1"]
+    assert list(server_synchronizer.state.load()) == ["file1"]
+
+    disk_server.failed_deletes = set()
+    assert server_synchronizer.sync_files() == 1
+
+    assert disk_server.files == {}
+    assert server_synchronizer.metrics.last_cycle["mode"] == "state"
+
+
+def test_idle_cycles_use_state_and_inconsistency_forces_reconcile(
+    disk_server, local_folder, make_server_synchronizer
+):
+    for index in range(3):
+        (local_folder / f"file{index}").write_bytes(b"content")
+
+    synchronizer = make_server_synchronizer(state_mode="memory")
+    assert synchronizer.state.db_path == ":memory:"
+
+    synchronizer.sync_files()
+    api_calls = disk_server.api_calls
+    assert synchronizer.sync_files() == 0
+    assert disk_server.api_calls == api_calls
+    assert synchronizer.metrics.last_cycle["mode"] == "state"
+
+    # Файл удален из облака не через синхронизатор.
+    del disk_server.files[f"{synchronizer.remote_path}/file1"]
+    (local_folder / "file1").unlink()
+    synchronizer.sync_files()
+    assert synchronizer.metrics.last_cycle["mode"] == "state"
+
+    synchronizer.sync_files()
+    assert synchronizer.metrics.last_cycle["mode"] == "reconcile"
+
+
+def test_ignored_files_are_neither_uploaded_nor_deleted(
+    disk_server, local_folder, server_synchronizer
+):
+    remote_path = server_synchronizer.remote_path
+    (local_folder / "build").mkdir()
+    (local_folder / "file1").write_bytes(b"content")
+    (local_folder / "file1.swp").write_bytes(b"swap")
+    (local_folder / "build" / "out.o").write_bytes(b"object")
+    (local_folder / "big").write_bytes(b"x" * 100)
+
+    disk_server.add_file(f"{remote_path}/old.swp", b"swap")
+    disk_server.add_file(f"{remote_path}/build/old.o", b"object")
+    disk_server.add_file(f"{remote_path}/big", b"y" * 100)
+    disk_server.add_file(f"{remote_path}/removed", b"content")
+
+    server_synchronizer.ignore = IgnoreRules(["*.swp", "build/"], max_size=50)
+    server_synchronizer.sync_files()
+
+    assert sorted(disk_server.files) == [
+        f"{remote_path}/big",
+        f"{remote_path}/build/old.o",
+        f"{remote_path}/file1",
+        f"{remote_path}/old.swp",
+    ]
+    assert disk_server.files[f"{remote_path}/big"]["content"] == b"y" * 100
+
+    (local_folder / "file1.swp").unlink()
+    server_synchronizer.sync_changed({"file1.swp": "deleted", "big": "changed"})
+
+    assert len(disk_server.files) == 4
+
+
+def test_unreadable_subfolder_is_not_deleted(
+    monkeypatch, disk_server, local_folder, server_synchronizer
+):
+    (local_folder / "a" / "b").mkdir(parents=True)
+    for name in ("file1", "a/file2", "a/b/file3"):
+        (local_folder / name).write_bytes(b"content")
+
+    server_synchronizer.sync_files()
+    assert len(disk_server.files) == 3
+
+    scandir = os.scandir
+    unreadable = {"a", "local"}
+
+    def failing_scandir(path):
+        if os.path.basename(path) in unreadable:
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", failing_scandir)
+    # Недоступна сама папка: цикл пропускается.
+    assert server_synchronizer.sync_files() == 0
+    assert server_synchronizer.sync_files(verify=True) == 0
+
+    unreadable.remove("local")
+    assert server_synchronizer.sync_files() == 0
+    assert server_synchronizer.sync_files(verify=True) == 0
+
+    assert len(disk_server.files) == 3
+    assert server_synchronizer.unreadable == {"a"}
+
+
+def test_async_move_is_confirmed_before_state_update(
+    disk_server, local_folder, server_synchronizer
+):
+    (local_folder / "file1").write_bytes(b"content")
+    server_synchronizer.cloud_drive.poll_interval = 0.01
+    server_synchronizer.sync_files()
+
+    (local_folder / "file1").rename(local_folder / "renamed")
+    disk_server.async_moves = True
+    disk_server.operation_polls = 1
+    server_synchronizer.sync_files()
+
+    assert sorted(disk_server.files) == [f"{server_synchronizer.remote_path}/renamed"]
+    assert disk_server.uploaded == 1
+    assert len(disk_server.operations) == 1
+    assert list(server_synchronizer.state.load()) == ["renamed"]
+    assert server_synchronizer.state.journal_pending() == []
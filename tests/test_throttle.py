@@ -0,0 +1,115 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from synch.cloud_storage.throttle import (
+    AdaptiveConcurrency,
+    BandwidthLimiter,
+    parse_schedule,
+)
+
+
+def test_parse_schedule():
+    assert parse_schedule("") == []
+    assert parse_schedule("09:00-18:00=1048576, 22:30-06:00=0") == [
+        (540, 1080, 1048576.0),
+        (1350, 360, 0.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "value", ["09:00=1", "09:00-18:00", "9-18=1", "25:00-18:00=1", "09:00-18:00=-1"]
+)
+def test_parse_schedule_errors(value):
+    with pytest.raises(ValueError):
+        parse_schedule(value)
+
+
+def test_scheduled_rate():
+    limiter = BandwidthLimiter(100, parse_schedule("09:00-18:00=10,22:00-06:00=0"))
+
+    assert limiter.current_rate(datetime(2024, 1, 1, 8, 59)) == 100
+    assert limiter.current_rate(datetime(2024, 1, 1, 9, 0)) == 10
+    assert limiter.current_rate(datetime(2024, 1, 1, 18, 0)) == 100
+    assert limiter.current_rate(datetime(2024, 1, 1, 23, 0)) == 0
+    assert limiter.current_rate(datetime(2024, 1, 1, 3, 0)) == 0
+
+
+def test_bandwidth_is_shared_between_threads():
+    limiter = BandwidthLimiter(1 << 20)
+
+    def send():
+        for _ in range(2):
+            limiter.consume(1 << 17)
+
+    threads = [threading.Thread(target=send) for _ in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 1 МБ при лимите 1 МБ/с и пустом запасе в начале
+    assert time.monotonic() - start >= 0.9
+
+
+def test_unlimited_bandwidth_does_not_wait():
+    limiter = BandwidthLimiter(0)
+    start = time.monotonic()
+    limiter.consume(1 << 30)
+    assert time.monotonic() - start < 0.1
+
+
+def test_concurrency_grows_additively():
+    concurrency = AdaptiveConcurrency(min_limit=1, max_limit=3)
+
+    for _ in range(1 + 2):
+        concurrency.observe(0.1)
+    assert concurrency.limit == 3
+
+    for _ in range(10):
+        concurrency.observe(None)
+    assert concurrency.limit == 3
+
+
+def test_concurrency_decreases_on_errors_and_latency():
+    concurrency = AdaptiveConcurrency(min_limit=1, max_limit=16, initial=8)
+
+    concurrency.observe(None, "throttle")
+    assert concurrency.limit == 4
+    # Следующее уменьшение - не раньше, чем через limit наблюдений.
+    concurrency.observe(None, "server")
+    assert concurrency.limit == 4
+
+    for _ in range(4):
+        concurrency.observe(0.1)
+    concurrency.observe(0.5)
+    assert concurrency.limit == 2
+
+    for _ in range(4):
+        concurrency.observe(0.12)
+    assert concurrency.limit == 3
+
+
+def test_slot_limits_in_flight():
+    concurrency = AdaptiveConcurrency(min_limit=2, max_limit=2)
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal peak
+        with concurrency.slot():
+            with lock:
+                peak = max(peak, concurrency.in_flight)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert concurrency.in_flight == 0
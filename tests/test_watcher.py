@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from synch.utils.watcher import CHANGED, DELETED, InotifyWatcher
+
+pytestmark = pytest.mark.skipif(
+    not InotifyWatcher.is_supported(), reason="inotify недоступен"
+)
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    watcher = InotifyWatcher(str(tmp_path))
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+
+def test_watcher_coalesces_burst(watcher, tmp_path):
+    path = tmp_path / "file1"
+    for i in range(10):
+        path.write_bytes(b"x" * i)
+
+    assert watcher.wait_changes(timeout=2, quiet=0.1) == {"file1": CHANGED}
+
+
+def test_watcher_returns_under_continuous_writes(watcher, tmp_path):
+    import threading
+    import time
+
+    stop = threading.Event()
+
+    def write():
+        with open(tmp_path / "file1", "wb") as file:
+            while not stop.is_set():
+                file.write(b"x")
+                file.flush()
+                time.sleep(0.01)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    start = time.monotonic()
+    try:
+        changes = watcher.wait_changes(timeout=0.5, quiet=0.2)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert changes == {"file1": CHANGED}
+    assert time.monotonic() - start < 1.5
+
+
+def test_watcher_reports_delete_and_move(watcher, tmp_path):
+    (tmp_path / "file1").write_bytes(b"1")
+    (tmp_path / "file2").write_bytes(b"2")
+    watcher.wait_changes(timeout=2, quiet=0.1)
+
+    os.remove(tmp_path / "file1")
+    os.rename(tmp_path / "file2", tmp_path / "file3")
+
+    assert watcher.wait_changes(timeout=2, quiet=0.1) == {
+        "file1": DELETED,
+        "file2": DELETED,
+        "file3": CHANGED,
+    }
+
+
+def test_watcher_ignores_directories(watcher, tmp_path):
+    (tmp_path / "folder").mkdir()
+
+    assert watcher.wait_changes(timeout=0.3, quiet=0.1) == {}
+
+
+def test_recursive_watcher_reports_nested_files(tmp_path):
+    (tmp_path / "folder").mkdir()
+    watcher = InotifyWatcher(str(tmp_path), recursive=True)
+    watcher.start()
+
+    (tmp_path / "folder" / "file1").write_bytes(b"1")
+    changes = watcher.wait_changes(timeout=2, quiet=0.1)
+
+    (tmp_path / "new_folder").mkdir()
+    watcher.wait_changes(timeout=2, quiet=0.1)
+    overflowed = watcher.overflowed
+    watcher.stop()
+
+    assert changes == {"folder/file1": CHANGED}
+    assert overflowed
@@ -1,4 +1,5 @@
 import os
+import time
 import logging
 from loguru import logger
 import pytest
@@ -74,3 +75,302 @@ def test_get_info(yandex_disk_client, monkeypatch):
     #         "path": "disk:/remote_folder/file_name",
     #     }
     # ]
+
+
+def test_sessions_are_pooled():
+    client = YandexDiskClient("local_folder", "remote_folder", "token", pool_size=4)
+
+    adapter = client.api_session.get_adapter("https://cloud-api.yandex.net")
+    assert adapter._pool_maxsize == 4
+    assert client.api_session.headers["Authorization"] == "OAuth token"
+    assert "Authorization" not in client.upload_session.headers
+    assert client.api_session is not client.upload_session
+
+    client.close()
+
+
+class FakeResponse:
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.status_code = 200
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        pass
+
+
+def make_pages(total: int):
+    items = [
+        {
+            "type": "file",
+            "name": f"file_{i}",
+            "modified": "2022-01-01T00:00:00+00:00",
+            "path": f"disk:/remote_folder/file_{i}",
+        }
+        for i in range(total)
+    ]
+
+    def mock_get(url, **kwargs):
+        query = dict(part.split("=") for part in url.split("?")[1].split("&"))
+        limit, offset = int(query["limit"]), int(query["offset"])
+        return FakeResponse(
+            {
+                "_embedded": {
+                    "items": items[offset : offset + limit],
+                    "limit": limit,
+                    "offset": offset,
+                    "total": total,
+                }
+            }
+        )
+
+    return mock_get
+
+
+@pytest.mark.parametrize("listing_workers", [1, 3])
+def test_iter_info_paginates(monkeypatch, listing_workers):
+    client = YandexDiskClient(
+        "local_folder",
+        "remote_folder",
+        "token",
+        page_size=10,
+        listing_workers=listing_workers,
+    )
+    monkeypatch.setattr(client.api_session, "get", make_pages(35))
+
+    names = [item.name for item in client.iter_info()]
+
+    assert names == [f"file_{i}" for i in range(35)]
+
+
+def test_move_and_copy(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    with FakeDiskServer() as server:
+        server.add_file("remote_folder/old_name", b"content")
+        client = YandexDiskClient(
+            str(tmp_path), "remote_folder", "token", api_host=server.url
+        )
+
+        assert client.move("new_name", "old_name") == {"status": "Success"}
+        assert client.copy("copy_name", "new_name") == {"status": "Success"}
+        assert client.move("other", "missing") is None
+
+        assert sorted(server.files) == [
+            "remote_folder/copy_name",
+            "remote_folder/new_name",
+        ]
+        client.close()
+
+
+def test_recursive_listing_and_upload_create_dirs(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "file1").write_bytes(b"content")
+
+    with FakeDiskServer() as server:
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            recursive=True,
+        )
+
+        assert client.upload("a/b/file1") == {"status": "Success"}
+        assert server.dirs == {"remote_folder/a", "remote_folder/a/b"}
+        assert [item.name for item in client.iter_info()] == ["a/b/file1"]
+        client.close()
+
+
+def test_injected_errors_are_retried(tmp_path):
+    from synch.cloud_storage.retry import RetryPolicy
+    from tests.fake_disk_server import FakeDiskServer
+
+    (tmp_path / "file1").write_bytes(b"content")
+
+    with FakeDiskServer(retry_after=0) as server:
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            retry_policy=RetryPolicy(base_delay=0),
+        )
+        server.fail_next(429, 503)
+
+        assert client.upload("file1") == {"status": "Success"}
+        assert client.retries == 2
+        assert server.files["remote_folder/file1"]["content"] == b"content"
+
+        server.fail_next(500, 500, 500, 500)
+        assert client.delete("file1") is None
+        client.close()
+
+
+def test_prefetched_upload_url_is_used_and_refreshed(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    for name in ("file1", "file2"):
+        (tmp_path / name).write_bytes(b"content")
+
+    with FakeDiskServer() as server:
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            prefetch_urls=2,
+        )
+        client.prefetch_upload_urls([("file1", False), ("file2", False)])
+
+        assert client.upload("file1") == {"status": "Success"}
+        while not server.uploads:
+            time.sleep(0.01)
+        # Полученный заранее URL для file2 устаревает на сервере.
+        server.uploads.clear()
+        assert client.upload("file2") == {"status": "Success"}
+
+        assert client.prefetch_hits == 2
+        assert ("PUT", "/v1/disk/resources") not in server.requests
+        assert server.requests.count(("GET", "/v1/disk/resources/upload")) == 3
+        assert sorted(server.files) == ["remote_folder/file1", "remote_folder/file2"]
+        client.close()
+
+
+def test_upload_streams_file_in_chunks(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    content = os.urandom(10_000)
+    (tmp_path / "file1").write_bytes(content)
+    progress = []
+
+    with FakeDiskServer() as server:
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            chunk_size=4096,
+            progress=lambda *args: progress.append(args[:3]),
+        )
+
+        assert client.upload("file1") == {"status": "Success"}
+
+        assert server.files["remote_folder/file1"]["content"] == content
+        assert progress == [
+            ("file1", 4096, 10_000),
+            ("file1", 8192, 10_000),
+            ("file1", 10_000, 10_000),
+        ]
+        client.close()
+
+
+def test_file_changed_during_upload_is_reported(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    (tmp_path / "file1").write_bytes(b"x" * 10_000)
+
+    def append(*args):
+        with open(tmp_path / "file1", "ab") as file:
+            file.write(b"more")
+
+    with FakeDiskServer() as server:
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            chunk_size=4096,
+            progress=append,
+        )
+
+        assert client.reload("file1") == {"status": "Changed"}
+        client.close()
+
+
+def test_stat(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    with FakeDiskServer() as server:
+        server.add_file("remote_folder/file1", b"content")
+        client = YandexDiskClient(
+            str(tmp_path), "remote_folder", "token", api_host=server.url
+        )
+
+        info = client.stat("file1")
+        assert (info.name, info.size) == ("file1", len(b"content"))
+        assert client.stat("missing") is None
+        client.close()
+
+
+def test_upload_bandwidth_and_concurrency(tmp_path):
+    from synch.cloud_storage.retry import RetryPolicy
+    from synch.cloud_storage.throttle import AdaptiveConcurrency, BandwidthLimiter
+    from tests.fake_disk_server import FakeDiskServer
+
+    (tmp_path / "file1").write_bytes(b"x" * 60_000)
+    concurrency = AdaptiveConcurrency(min_limit=1, max_limit=4, initial=4)
+
+    with FakeDiskServer(retry_after=0) as server:
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            retry_policy=RetryPolicy(base_delay=0),
+            chunk_size=10_000,
+            bandwidth=BandwidthLimiter(100_000),
+            concurrency=concurrency,
+        )
+        server.fail_next(503)
+
+        start = time.monotonic()
+        assert client.upload("file1") == {"status": "Success"}
+        assert time.monotonic() - start >= 0.5
+
+        assert concurrency.limit < 4
+        assert concurrency.in_flight == 0
+        client.close()
+
+
+def test_async_delete_operations_are_polled(tmp_path):
+    from tests.fake_disk_server import FakeDiskServer
+
+    with FakeDiskServer() as server:
+        for name in ("file1", "file2", "file3"):
+            server.add_file(f"remote_folder/{name}", b"content")
+        server.operation_polls = 2
+        server.failed_deletes = {"remote_folder/file2"}
+        client = YandexDiskClient(
+            str(tmp_path),
+            "remote_folder",
+            "token",
+            api_host=server.url,
+            async_delete=True,
+            poll_interval=0.01,
+        )
+
+        operations = {}
+        for name in ("file1", "file2", "file3"):
+            result = client.delete(name)
+            assert result["status"] == "Pending"
+            operations[name] = result["href"]
+        assert client.delete("missing") == {"status": "Success"}
+        assert len(server.files) == 3
+
+        assert client.wait_operations(operations) == {
+            "file1": True,
+            "file2": False,
+            "file3": True,
+        }
+        assert sorted(server.files) == ["remote_folder/file2"]
+
+        server.operation_polls = 100
+        client.operation_timeout = 0.05
+        href = client.delete("file2")["href"]
+        assert client.wait_operations({"file2": href}) == {"file2": False}
+        client.close()